@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy import and_, case, delete, event, func, insert, inspect, or_, select, tuple_
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+
+from .db_upsert import upsert_rows
+from .models import Booking, DailyServiceStat, ScheduleEvent, Service
+from .services.schedule_conflicts import wall_clock
+
+ROLLUP_COLUMNS = ["events", "capacity", "bookings", "cancelled_bookings", "confirmed_seats", "paid_amount"]
+ROLLUP_KEY_COLUMNS = ["service_id", "day"]
+ROLLUP_INSERT_BATCH = 1000
+# Keys per recount query: each key adds a (service, day range) predicate.
+ROLLUP_REFRESH_BATCH = 200
+
+_BOOKING_FIELDS = ("schedule_event_id", "status", "payment_status", "payment_amount")
+_EVENT_FIELDS = ("service_id", "start_time", "max_participants", "is_active")
+
+DayKey = tuple[int, date]
+
+
+def _empty_counters() -> dict[str, Any]:
+    return {column: Decimal("0") if column == "paid_amount" else 0 for column in ROLLUP_COLUMNS}
+
+
+def _day_of(value: datetime) -> date:
+    # ORM values are wall clock already (see schedule_conflicts._store_wall_clock), so incremental
+    # updates and rebuild_daily_stats bucket the same stored value; wall_clock covers Core inserts.
+    return wall_clock(value).date()
+
+
+def _day_bounds(day: date) -> tuple[datetime, datetime]:
+    start = datetime.combine(day, time.min)
+    return start, start + timedelta(days=1)
+
+
+def _booking_counters(status: str, payment_status: str, amount: Decimal | None) -> dict[str, Any]:
+    return {
+        "bookings": 1,
+        "cancelled_bookings": int(status == "cancelled"),
+        "confirmed_seats": int(status == "confirmed"),
+        "paid_amount": Decimal(amount or 0) if payment_status == "paid" else Decimal("0"),
+    }
+
+
+def _event_counters(max_participants: int, is_active: bool) -> dict[str, Any]:
+    return {"events": int(bool(is_active)), "capacity": int(max_participants or 0) if is_active else 0}
+
+
+def compute_rollups(connection: Connection, keys: Iterable[DayKey] | None = None) -> dict[DayKey, dict[str, Any]]:
+    """Absolute counters per (service, day) straight from schedule_events and bookings.
+
+    `keys=None` computes every day; otherwise only the given keys (missing ones come back zeroed).
+    """
+    wanted = set(keys) if keys is not None else None
+    query = select(
+        ScheduleEvent.id,
+        ScheduleEvent.service_id,
+        ScheduleEvent.start_time,
+        ScheduleEvent.max_participants,
+        ScheduleEvent.is_active,
+    )
+    if wanted is not None:
+        if not wanted:
+            return {}
+        query = query.where(
+            or_(
+                *[
+                    and_(
+                        ScheduleEvent.service_id == service_id,
+                        ScheduleEvent.start_time >= _day_bounds(day)[0],
+                        ScheduleEvent.start_time < _day_bounds(day)[1],
+                    )
+                    for service_id, day in wanted
+                ]
+            )
+        )
+
+    totals: dict[DayKey, dict[str, Any]] = defaultdict(_empty_counters)
+    event_keys: dict[int, DayKey] = {}
+    for event_id, service_id, start_time, max_participants, is_active in connection.execute(query):
+        key = (service_id, _day_of(start_time))
+        if wanted is not None and key not in wanted:
+            continue
+        event_keys[event_id] = key
+        for column, value in _event_counters(max_participants, is_active).items():
+            totals[key][column] += value
+
+    booking_query = select(
+        Booking.schedule_event_id,
+        func.count(Booking.id),
+        func.sum(case((Booking.status == "cancelled", 1), else_=0)),
+        func.sum(case((Booking.status == "confirmed", 1), else_=0)),
+        func.sum(case((Booking.payment_status == "paid", func.coalesce(Booking.payment_amount, 0)), else_=0)),
+    ).group_by(Booking.schedule_event_id)
+    if wanted is not None:
+        if not event_keys:
+            return {key: _empty_counters() for key in wanted}
+        booking_query = booking_query.where(Booking.schedule_event_id.in_(list(event_keys)))
+
+    for event_id, bookings, cancelled, confirmed, paid in connection.execute(booking_query):
+        key = event_keys.get(event_id)
+        if key is None:
+            continue
+        counters = totals[key]
+        counters["bookings"] += int(bookings or 0)
+        counters["cancelled_bookings"] += int(cancelled or 0)
+        counters["confirmed_seats"] += int(confirmed or 0)
+        counters["paid_amount"] += Decimal(str(paid or 0))
+
+    if wanted is not None:
+        return {key: totals[key] if key in totals else _empty_counters() for key in wanted}
+    return dict(totals)
+
+
+def _rollup_rows(counters: dict[DayKey, dict[str, Any]]) -> list[dict[str, Any]]:
+    return [{"service_id": service_id, "day": day, **values} for (service_id, day), values in counters.items()]
+
+
+def refresh_daily_stats(db: Session | Connection, keys: Iterable[DayKey]) -> None:
+    """Recompute the given days from source rows; used after bulk statements that bypass the flush hook."""
+    connection = db.connection() if isinstance(db, Session) else db
+    pending = list(set(keys))
+    for offset in range(0, len(pending), ROLLUP_REFRESH_BATCH):
+        _refresh_chunk(connection, pending[offset : offset + ROLLUP_REFRESH_BATCH])
+
+
+def _refresh_chunk(connection: Connection, keys: list[DayKey]) -> None:
+    computed = compute_rollups(connection, keys)
+    empty = {key for key, values in computed.items() if not values["events"] and not values["bookings"]}
+    if empty:
+        connection.execute(
+            delete(DailyServiceStat).where(tuple_(DailyServiceStat.service_id, DailyServiceStat.day).in_(list(empty)))
+        )
+    filled = {key: values for key, values in computed.items() if key not in empty}
+    upsert_rows(
+        connection,
+        DailyServiceStat,
+        _rollup_rows(filled),
+        key_columns=ROLLUP_KEY_COLUMNS,
+        update_columns=ROLLUP_COLUMNS,
+    )
+
+
+def _previous(row: Any, field: str) -> Any:
+    history = inspect(row).attrs[field].history
+    return history.deleted[0] if history.deleted else getattr(row, field)
+
+
+def _changed(row: Any, fields: tuple[str, ...]) -> bool:
+    attrs = inspect(row).attrs
+    return any(attrs[field].history.has_changes() for field in fields)
+
+
+class _Deltas:
+    def __init__(self) -> None:
+        self.counters: dict[DayKey, dict[str, Any]] = defaultdict(_empty_counters)
+        self.stale: set[DayKey] = set()
+
+    def add(self, key: DayKey | None, values: dict[str, Any], sign: int) -> None:
+        if key is None:
+            return
+        counters = self.counters[key]
+        for column, value in values.items():
+            counters[column] += value * sign
+
+
+def _event_key_resolver(session: Session, connection: Connection, event_ids: set[int]):
+    known: dict[int, DayKey] = {}
+    missing: set[int] = set()
+    for event_id in event_ids:
+        row = session.identity_map.get(identity_key(ScheduleEvent, event_id))
+        # Only trust loaded attributes: touching expired ones would lazy-load inside the flush.
+        if row is not None and {"service_id", "start_time"} <= inspect(row).dict.keys():
+            known[event_id] = (row.service_id, _day_of(row.start_time))
+        else:
+            missing.add(event_id)
+    if missing:
+        found = connection.execute(
+            select(ScheduleEvent.id, ScheduleEvent.service_id, ScheduleEvent.start_time).where(
+                ScheduleEvent.id.in_(missing)
+            )
+        )
+        for event_id, service_id, start_time in found:
+            known[event_id] = (service_id, _day_of(start_time))
+    return known.get
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_daily_stats(session: Session, flush_context) -> None:
+    events = [row for row in (*session.new, *session.dirty, *session.deleted) if isinstance(row, ScheduleEvent)]
+    bookings = [row for row in (*session.new, *session.dirty, *session.deleted) if isinstance(row, Booking)]
+    if not events and not bookings:
+        return
+
+    deltas = _Deltas()
+    for row in events:
+        if row in session.new:
+            deltas.add((row.service_id, _day_of(row.start_time)), _event_counters(row.max_participants, row.is_active), 1)
+            continue
+        if row not in session.deleted and not _changed(row, _EVENT_FIELDS):
+            continue
+        old_key = (_previous(row, "service_id"), _day_of(_previous(row, "start_time")))
+        old_values = _event_counters(_previous(row, "max_participants"), _previous(row, "is_active"))
+        if row in session.deleted:
+            deltas.add(old_key, old_values, -1)
+            continue
+        new_key = (row.service_id, _day_of(row.start_time))
+        if new_key != old_key:
+            # The event's bookings move with it; recount both days instead of tracking each booking.
+            deltas.stale.update({old_key, new_key})
+            continue
+        deltas.add(new_key, old_values, -1)
+        deltas.add(new_key, _event_counters(row.max_participants, row.is_active), 1)
+
+    changed_bookings = [row for row in bookings if row in session.new or row in session.deleted or _changed(row, _BOOKING_FIELDS)]
+    connection = session.connection()
+    if changed_bookings:
+        event_ids = {row.schedule_event_id for row in changed_bookings}
+        event_ids |= {_previous(row, "schedule_event_id") for row in changed_bookings if row not in session.new}
+        key_for = _event_key_resolver(session, connection, {event_id for event_id in event_ids if event_id})
+        for row in changed_bookings:
+            if row not in session.new:
+                deltas.add(
+                    key_for(_previous(row, "schedule_event_id")),
+                    _booking_counters(
+                        _previous(row, "status"), _previous(row, "payment_status"), _previous(row, "payment_amount")
+                    ),
+                    -1,
+                )
+            if row not in session.deleted:
+                deltas.add(
+                    key_for(row.schedule_event_id),
+                    _booking_counters(row.status, row.payment_status, row.payment_amount),
+                    1,
+                )
+
+    # Rollup rows of services deleted in this flush are removed by the foreign key cascade.
+    gone = {row.id for row in session.deleted if isinstance(row, Service)}
+    increments = {
+        key: values
+        for key, values in deltas.counters.items()
+        if key not in deltas.stale and key[0] not in gone and any(values.values())
+    }
+    upsert_rows(
+        connection,
+        DailyServiceStat,
+        _rollup_rows(increments),
+        key_columns=ROLLUP_KEY_COLUMNS,
+        update_columns=ROLLUP_COLUMNS,
+        increment=True,
+    )
+    stale = {key for key in deltas.stale if key[0] not in gone}
+    if stale:
+        refresh_daily_stats(connection, stale)
+
+
+def rebuild_daily_stats(db: Session) -> int:
+    """Drop and recompute every rollup row; returns the number of rows written."""
+    db.execute(delete(DailyServiceStat))
+    rows = _rollup_rows(compute_rollups(db.connection()))
+    for offset in range(0, len(rows), ROLLUP_INSERT_BATCH):
+        db.execute(insert(DailyServiceStat), rows[offset : offset + ROLLUP_INSERT_BATCH])
+    db.commit()
+    return len(rows)
+
+
+def ensure_daily_stats(db: Session) -> None:
+    """Build the rollup once for databases that predate it."""
+    if db.scalar(select(DailyServiceStat.id).limit(1)) is not None:
+        return
+    if db.scalar(select(ScheduleEvent.id).limit(1)) is not None:
+        rebuild_daily_stats(db)
+
+
+ANALYTICS_GROUP_PATTERN = "^(day|week|month)$"
+
+
+def period_start(day: date, group_by: str) -> date:
+    if group_by == "week":
+        return day - timedelta(days=day.weekday())
+    if group_by == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _with_fill_rate(values: dict[str, Any]) -> dict[str, Any]:
+    capacity = values["capacity"]
+    return {**values, "fill_rate": round(values["confirmed_seats"] / capacity, 4) if capacity else None}
+
+
+def summarize_daily_stats(
+    db: Session,
+    date_from: date,
+    date_to: date,
+    *,
+    group_by: str,
+    service_id: int | None = None,
+) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """Roll daily rows up to (period, service) buckets plus a grand total, both with fill rate."""
+    query = (
+        select(DailyServiceStat, Service.title)
+        .join(Service, Service.id == DailyServiceStat.service_id)
+        .where(DailyServiceStat.day >= date_from, DailyServiceStat.day <= date_to)
+        .order_by(DailyServiceStat.day.asc(), DailyServiceStat.service_id.asc())
+    )
+    if service_id is not None:
+        query = query.where(DailyServiceStat.service_id == service_id)
+
+    buckets: dict[tuple[date, int], dict[str, Any]] = {}
+    totals = _empty_counters()
+    for stat, title in db.execute(query):
+        key = (period_start(stat.day, group_by), stat.service_id)
+        bucket = buckets.setdefault(
+            key,
+            {"period": key[0], "service_id": stat.service_id, "service_title": title, **_empty_counters()},
+        )
+        for column in ROLLUP_COLUMNS:
+            value = getattr(stat, column) or 0
+            bucket[column] += value
+            totals[column] += value
+
+    rows = [_with_fill_rate(bucket) for bucket in buckets.values()]
+    total = _with_fill_rate({"period": date_from, "service_id": service_id, "service_title": None, **totals})
+    return rows, total
@@ -3,20 +3,38 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from pathlib import Path
 
-from fastapi import FastAPI, Query
+from fastapi import Depends, FastAPI, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, JSONResponse, RedirectResponse, Response
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy import select
 
+from .analytics import ensure_daily_stats
 from .config import settings
 from .db import Base, SessionLocal, engine
-from .db_migrations import backfill_gift_certificate_validity, ensure_gift_certificate_validity_schema
+from .db_migrations import (
+    backfill_gift_certificate_validity,
+    ensure_declared_indexes,
+    ensure_gift_certificate_validity_schema,
+    ensure_payment_log_storage_schema,
+    normalize_sqlite_datetimes,
+)
+from .deps import require_metrics_access
+from .idempotency import purge_expired_idempotency_keys
+from .load_shedding import LoadSheddingMiddleware
+from .metrics import MetricsMiddleware, collect_all_workers, render_prometheus
 from .models import Service
+from .pagination import PAGINATION_HEADERS
+from .profiling import PROFILE_ID_HEADER, ProfilingMiddleware
+from .query_stats import QueryStatsMiddleware
+from .rate_limit import RateLimitMiddleware
 from .routers.admin import router as admin_router
 from .routers.auth import router as auth_router
 from .routers.payments import router as payments_router
+from .routers.profiling import router as profiling_router
 from .routers.public import router as public_router
+from .sampling import SamplingProfilerMiddleware
+from .search_index import warn_if_search_index_stale
 from .security import ensure_bootstrap_admin
 
 
@@ -46,12 +64,28 @@ def create_app() -> FastAPI:
         description="Перенос сайта Атман: FastAPI + MySQL + ЮKassa + admin API.",
     )
 
+    if settings.profiling_enabled:
+        # Innermost, so the profile covers routing and the endpoint, and its SQL lands in the request stats.
+        app.add_middleware(ProfilingMiddleware)
+    # Inside the rate limiter, so over-limit requests get 429 without taking or waiting for a slot,
+    # and inside metrics and CORS, so shed requests are counted and still carry CORS headers.
+    app.add_middleware(LoadSheddingMiddleware)
+    if settings.rate_limit_store != "off":
+        # Added before CORS so that 429 responses still carry the CORS headers.
+        app.add_middleware(RateLimitMiddleware)
+    app.add_middleware(QueryStatsMiddleware)
+    if settings.metrics_enabled:
+        # Outside the rate limiter so rejected requests are counted too.
+        app.add_middleware(MetricsMiddleware)
+    if settings.sampling_profiler_enabled:
+        app.add_middleware(SamplingProfilerMiddleware)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.cors_origins_list,
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[*PAGINATION_HEADERS, "Content-Disposition", "Server-Timing", PROFILE_ID_HEADER],
     )
 
     media_root = _resolve_media_root(settings.media_root)
@@ -81,6 +115,17 @@ def create_app() -> FastAPI:
     app.include_router(payments_router)
     app.include_router(auth_router)
     app.include_router(admin_router)
+    if settings.profiling_enabled or settings.sampling_profiler_enabled:
+        app.include_router(profiling_router)
+
+    if settings.metrics_enabled:
+
+        @app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_access)])
+        def metrics() -> Response:
+            return Response(
+                content=render_prometheus(collect_all_workers()),
+                media_type="text/plain; version=0.0.4; charset=utf-8",
+            )
 
     @app.get("/robots.txt", include_in_schema=False)
     def robots_txt() -> Response:
@@ -158,10 +203,16 @@ def create_app() -> FastAPI:
     # Local DB bootstrap (SQLite or any DB URL): create tables if missing.
     Base.metadata.create_all(bind=engine)
     ensure_gift_certificate_validity_schema(engine)
+    ensure_payment_log_storage_schema(engine)
+    ensure_declared_indexes(engine)
+    normalize_sqlite_datetimes(engine)
     db = SessionLocal()
     try:
         ensure_bootstrap_admin(db)
         backfill_gift_certificate_validity(db)
+        purge_expired_idempotency_keys(db)
+        warn_if_search_index_stale(db)
+        ensure_daily_stats(db)
     finally:
         db.close()
     return app
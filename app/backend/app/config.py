@@ -42,14 +42,70 @@ class Settings:
     media_root: str = os.getenv("MEDIA_ROOT", "../../media_assets")
     site_url: str = os.getenv("SITE_URL", "https://spiritualst.ru")
 
+    yookassa_api_base: str = os.getenv("YOOKASSA_API_BASE", "https://api.yookassa.ru/v3")
+    yookassa_timeout_seconds: int = _env_int("YOOKASSA_TIMEOUT_SECONDS", 20)
     yookassa_shop_id: str | None = os.getenv("YOOKASSA_SHOP_ID")
     yookassa_secret_key: str | None = os.getenv("YOOKASSA_SECRET_KEY")
     yookassa_return_url: str = os.getenv("YOOKASSA_RETURN_URL", "http://localhost:5173/")
     yookassa_webhook_secret: str | None = os.getenv("YOOKASSA_WEBHOOK_SECRET")
 
+    schedule_timezone: str = os.getenv("SCHEDULE_TIMEZONE", "Europe/Moscow")
+    schedule_bulk_max_events: int = _env_int("SCHEDULE_BULK_MAX_EVENTS", 2000)
+    schedule_default_hall: str = os.getenv("SCHEDULE_DEFAULT_HALL", "")
+
+    admin_events_poll_ms: int = _env_int("ADMIN_EVENTS_POLL_MS", 1000)
+    admin_events_stream_seconds: int = _env_int("ADMIN_EVENTS_STREAM_SECONDS", 300)
+    admin_events_retention_hours: int = _env_int("ADMIN_EVENTS_RETENTION_HOURS", 24)
+    admin_events_max_streams: int = _env_int("ADMIN_EVENTS_MAX_STREAMS", 0)
+    admin_events_poll_retry_ms: int = _env_int("ADMIN_EVENTS_POLL_RETRY_MS", 5000)
+
+    idempotency_ttl_hours: int = _env_int("IDEMPOTENCY_TTL_HOURS", 24)
+
+    payment_log_retention_days: int = _env_int("PAYMENT_LOG_RETENTION_DAYS", 90)
+    payment_log_archive_dir: str = os.getenv("PAYMENT_LOG_ARCHIVE_DIR", (BASE_DIR / "data" / "archive").as_posix())
+
     admin_token: str | None = os.getenv("ADMIN_TOKEN")
     admin_jwt_secret: str = os.getenv("ADMIN_JWT_SECRET", os.getenv("ADMIN_TOKEN", "change_me_secret"))
     admin_access_ttl_minutes: int = _env_int("ADMIN_ACCESS_TTL_MINUTES", 720)
+    admin_principal_cache_seconds: int = _env_int("ADMIN_PRINCIPAL_CACHE_SECONDS", 30)
+    login_free_attempts_per_user: int = _env_int("LOGIN_FREE_ATTEMPTS_PER_USER", 5)
+    login_free_attempts_per_ip: int = _env_int("LOGIN_FREE_ATTEMPTS_PER_IP", 20)
+    login_lockout_base_seconds: int = _env_int("LOGIN_LOCKOUT_BASE_SECONDS", 30)
+    login_lockout_max_seconds: int = _env_int("LOGIN_LOCKOUT_MAX_SECONDS", 3600)
+    password_hash_workers: int = _env_int("PASSWORD_HASH_WORKERS", 2)
+    password_hash_queue: int = _env_int("PASSWORD_HASH_QUEUE", 8)
+    trust_forwarded_for: bool = _env_bool("TRUST_FORWARDED_FOR", False)
+    rate_limit_store: str = os.getenv("RATE_LIMIT_STORE", "sqlite").strip().lower()
+    rate_limit_db_path: str = os.getenv("RATE_LIMIT_DB_PATH", (BASE_DIR / "data" / "ratelimit.db").as_posix())
+    rate_limit_contacts_burst: int = _env_int("RATE_LIMIT_CONTACTS_BURST", 5)
+    rate_limit_contacts_per_hour: int = _env_int("RATE_LIMIT_CONTACTS_PER_HOUR", 20)
+    rate_limit_bookings_burst: int = _env_int("RATE_LIMIT_BOOKINGS_BURST", 10)
+    rate_limit_bookings_per_hour: int = _env_int("RATE_LIMIT_BOOKINGS_PER_HOUR", 60)
+    rate_limit_certificates_burst: int = _env_int("RATE_LIMIT_CERTIFICATES_BURST", 5)
+    rate_limit_certificates_per_hour: int = _env_int("RATE_LIMIT_CERTIFICATES_PER_HOUR", 20)
+    metrics_enabled: bool = _env_bool("METRICS_ENABLED", True)
+    metrics_token: str | None = os.getenv("METRICS_TOKEN")
+    metrics_dir: str = os.getenv("METRICS_DIR", (BASE_DIR / "data" / "metrics").as_posix())
+    metrics_flush_seconds: int = _env_int("METRICS_FLUSH_SECONDS", 5)
+    sql_slow_query_ms: int = _env_int("SQL_SLOW_QUERY_MS", 200)
+    sql_n_plus_one_threshold: int = _env_int("SQL_N_PLUS_ONE_THRESHOLD", 10)
+    sql_default_query_budget: int = _env_int("SQL_DEFAULT_QUERY_BUDGET", 0)
+    sql_query_budget_assert: bool = _env_bool("SQL_QUERY_BUDGET_ASSERT", os.getenv("APP_ENV") == "test")
+    profiling_enabled: bool = _env_bool("PROFILING_ENABLED", True)
+    profiling_dir: str = os.getenv("PROFILING_DIR", (BASE_DIR / "data" / "profiles").as_posix())
+    profiling_max_reports: int = _env_int("PROFILING_MAX_REPORTS", 50)
+    threadpool_size: int = _env_int("THREADPOOL_SIZE", 40)
+    load_shedding_enabled: bool = _env_bool("LOAD_SHEDDING_ENABLED", True)
+    load_shed_concurrency: int = _env_int("LOAD_SHED_CONCURRENCY", _env_int("THREADPOOL_SIZE", 40))
+    load_shed_queue_size: int = _env_int("LOAD_SHED_QUEUE_SIZE", 100)
+    load_shed_queue_timeout_seconds: int = _env_int("LOAD_SHED_QUEUE_TIMEOUT_SECONDS", 10)
+    load_shed_retry_after_seconds: int = _env_int("LOAD_SHED_RETRY_AFTER_SECONDS", 5)
+    load_shed_bypass_routes: str = os.getenv("LOAD_SHED_BYPASS_ROUTES", "/api/health,/metrics,/api/admin/events")
+    sampling_profiler_enabled: bool = _env_bool("SAMPLING_PROFILER_ENABLED", True)
+    sampling_profiler_hz: int = _env_int("SAMPLING_PROFILER_HZ", 20)
+    sampling_profiler_window_seconds: int = _env_int("SAMPLING_PROFILER_WINDOW_SECONDS", 600)
+    sampling_profiler_dir: str = os.getenv("SAMPLING_PROFILER_DIR", (BASE_DIR / "data" / "samples").as_posix())
+    sampling_profiler_include_idle: bool = _env_bool("SAMPLING_PROFILER_INCLUDE_IDLE", False)
     admin_bootstrap_username: str = os.getenv("ADMIN_BOOTSTRAP_USERNAME", "admin")
     admin_bootstrap_password: str = os.getenv("ADMIN_BOOTSTRAP_PASSWORD", "change_me_now")
     admin_bootstrap_role: str = os.getenv("ADMIN_BOOTSTRAP_ROLE", "admin")
@@ -60,6 +116,10 @@ class Settings:
             return ["*"]
         return [item.strip() for item in self.cors_origins.split(",") if item.strip()]
 
+    @property
+    def load_shed_bypass_routes_list(self) -> list[str]:
+        return [item.strip() for item in self.load_shed_bypass_routes.split(",") if item.strip()]
+
     @property
     def yookassa_enabled(self) -> bool:
         return bool(self.yookassa_shop_id and self.yookassa_secret_key)
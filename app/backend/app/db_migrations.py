@@ -5,7 +5,16 @@ from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 
 from .certificates import DEFAULT_VALIDITY_MODE, calculate_certificate_expires_at, normalize_certificate_validity
-from .models import GiftCertificate
+from .db import Base
+from .models import Booking, Contact, GiftCertificate, ScheduleEvent
+
+# DATETIME columns used as keyset sort keys; on SQLite they must all be stored in one text form.
+KEYSET_DATETIME_COLUMNS = (
+    Booking.__table__.c.created_at,
+    Contact.__table__.c.created_at,
+    GiftCertificate.__table__.c.created_at,
+    ScheduleEvent.__table__.c.start_time,
+)
 
 
 def ensure_gift_certificate_validity_schema(engine: Engine) -> None:
@@ -35,6 +44,57 @@ def ensure_gift_certificate_validity_schema(engine: Engine) -> None:
             connection.execute(text(statement))
 
 
+def ensure_payment_log_storage_schema(engine: Engine) -> None:
+    inspector = inspect(engine)
+    if "payment_logs" not in inspector.get_table_names():
+        return
+
+    existing_columns = {column["name"] for column in inspector.get_columns("payment_logs")}
+    if "payload_compressed" in existing_columns:
+        return
+
+    with engine.begin() as connection:
+        connection.execute(text("ALTER TABLE payment_logs ADD COLUMN payload_compressed BLOB"))
+
+
+def ensure_declared_indexes(engine: Engine) -> None:
+    """Create model-declared indexes missing on tables that predate them (create_all skips existing tables)."""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name and index.name not in existing_indexes:
+                index.create(bind=engine)
+
+
+def normalize_sqlite_datetimes(engine: Engine) -> None:
+    """Rewrite SQLite DATETIME text ("10:00:00", "10:00:00.5", "T" separator) to SQLAlchemy's "10:00:00.000000".
+
+    Text compares chronologically only in one shape, and keyset pagination compares the raw column.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    existing_tables = set(inspect(engine).get_table_names())
+    with engine.begin() as connection:
+        for column in KEYSET_DATETIME_COLUMNS:
+            if column.table.name not in existing_tables:
+                continue
+            name = f'"{column.name}"'
+            spaced = f"replace({name}, 'T', ' ')"
+            connection.execute(
+                text(
+                    f'UPDATE "{column.table.name}" '
+                    f"SET {name} = CASE WHEN length({name}) = 19 THEN {spaced} || '.000000' "
+                    f"ELSE substr({spaced} || '000000', 1, 26) END "
+                    f"WHERE length({name}) BETWEEN 19 AND 25 OR ({name} LIKE '%T%' AND length({name}) <= 26)"
+                )
+            )
+
+
 def backfill_gift_certificate_validity(db: Session) -> None:
     rows = db.query(GiftCertificate).all()
     changed = False
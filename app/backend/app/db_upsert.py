@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import and_, func, insert, select, tuple_, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+
+def _assigned(table, column: str, incoming: Any, increment: bool) -> Any:
+    return table.c[column] + incoming if increment else incoming
+
+
+def upsert_rows(
+    db: Session | Connection,
+    model: type,
+    rows: list[dict[str, Any]],
+    *,
+    key_columns: list[str],
+    update_columns: list[str],
+    increment: bool = False,
+) -> None:
+    """Insert `rows` or update `update_columns` on key conflict, in one statement where the dialect allows it.
+
+    With `increment=True` existing values are added to instead of overwritten (counter rollups).
+    """
+    if not rows:
+        return
+
+    table = model.__table__
+    touch = {"updated_at": func.now()} if "updated_at" in table.c else {}
+    # A Connection is accepted so flush hooks can upsert without re-entering the Session.
+    dialect = (db.get_bind() if isinstance(db, Session) else db).dialect.name
+
+    if dialect in {"sqlite", "postgresql"}:
+        insert_for_dialect = sqlite_insert if dialect == "sqlite" else postgresql_insert
+        statement = insert_for_dialect(table).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={
+                **{column: _assigned(table, column, statement.excluded[column], increment) for column in update_columns},
+                **touch,
+            },
+        )
+        db.execute(statement)
+        return
+
+    if dialect in {"mysql", "mariadb"}:
+        statement = mysql_insert(table).values(rows)
+        statement = statement.on_duplicate_key_update(
+            {
+                **{column: _assigned(table, column, statement.inserted[column], increment) for column in update_columns},
+                **touch,
+            }
+        )
+        db.execute(statement)
+        return
+
+    # Portable fallback: one SELECT for existing keys, then plain INSERT/UPDATE statements.
+    key_expr = tuple_(*[table.c[column] for column in key_columns])
+    wanted = [tuple(row[column] for column in key_columns) for row in rows]
+    found = db.execute(select(*[table.c[column] for column in key_columns]).where(key_expr.in_(wanted)))
+    existing = {tuple(row) for row in found}
+    fresh = [row for row, key in zip(rows, wanted) if key not in existing]
+    if fresh:
+        db.execute(insert(table), fresh)
+    for row, key in zip(rows, wanted):
+        if key in existing:
+            db.execute(
+                update(table)
+                .where(and_(*[table.c[column] == value for column, value in zip(key_columns, key)]))
+                .values({**{column: _assigned(table, column, row[column], increment) for column in update_columns}, **touch})
+            )
@@ -1,14 +1,18 @@
 from __future__ import annotations
 
 import hmac
+import threading
+import time
 from dataclasses import dataclass
 
 from fastapi import Depends, Header, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import event, inspect
 from sqlalchemy.orm import Session
 
 from .config import settings
 from .db import get_db
+from .models import AdminUser
 from .security import decode_access_token, get_admin_by_id
 
 bearer_scheme = HTTPBearer(auto_error=False)
@@ -22,6 +26,59 @@ class AdminPrincipal:
     auth_type: str
 
 
+class PrincipalCache:
+    """Short-lived map of (user id, token iat) to the resolved principal, so admin calls skip the user lookup.
+
+    Entries for a user are dropped as soon as this process flushes a change to the user's role or
+    active flag; other workers pick the change up when their entry expires.
+    """
+
+    def __init__(self, max_entries: int = 512) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[int, int], tuple[float, AdminPrincipal]] = {}
+        self._max_entries = max_entries
+
+    def get(self, key: tuple[int, int]) -> AdminPrincipal | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[1]
+
+    def put(self, key: tuple[int, int], principal: AdminPrincipal) -> None:
+        ttl = settings.admin_principal_cache_seconds
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            while len(self._entries) >= self._max_entries:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (time.monotonic() + ttl, principal)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+
+principal_cache = PrincipalCache()
+
+_PRINCIPAL_FIELDS = ("username", "role", "is_active")
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_changed_admins(session: Session, flush_context) -> None:
+    for row in (*session.dirty, *session.deleted):
+        if not isinstance(row, AdminUser):
+            continue
+        attrs = inspect(row).attrs
+        if row in session.deleted or any(attrs[field].history.has_changes() for field in _PRINCIPAL_FIELDS):
+            principal_cache.invalidate_user(row.id)
+
+
 def get_db_session(db: Session = Depends(get_db)) -> Session:
     return db
 
@@ -53,15 +110,22 @@ def get_current_admin(
         except ValueError as exc:
             raise HTTPException(status_code=401, detail="Сессия недействительна. Войдите снова.") from exc
 
+        cache_key = (payload.sub, payload.iat)
+        cached = principal_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         user = get_admin_by_id(db, payload.sub)
         if not user:
             raise HTTPException(status_code=401, detail="Сессия истекла. Войдите снова.")
-        return AdminPrincipal(
+        principal = AdminPrincipal(
             id=user.id,
             username=user.username,
             role=user.role,
             auth_type="jwt",
         )
+        principal_cache.put(cache_key, principal)
+        return principal
 
     legacy = _legacy_admin_principal(x_admin_token)
     if legacy:
@@ -85,3 +149,21 @@ def require_admin_role(*allowed_roles: str):
 
 def require_admin(principal: AdminPrincipal = Depends(require_admin_role("admin", "editor"))) -> AdminPrincipal:
     return principal
+
+
+def require_metrics_access(
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+    x_admin_token: str | None = Header(default=None),
+    db: Session = Depends(get_db_session),
+) -> None:
+    """Scrapers present METRICS_TOKEN as a bearer token; otherwise an admin session is required."""
+    if (
+        settings.metrics_token
+        and credentials
+        and credentials.scheme.lower() == "bearer"
+        and hmac.compare_digest(credentials.credentials.strip(), settings.metrics_token)
+    ):
+        return
+    principal = get_current_admin(credentials=credentials, x_admin_token=x_admin_token, db=db)
+    if principal.role.lower() != "admin":
+        raise HTTPException(status_code=403, detail="Недостаточно прав для выполнения действия.")
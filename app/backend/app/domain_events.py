@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, event, func, select
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .db import SessionLocal
+from .models import DomainEvent
+
+EVENT_BOOKING_CREATED = "booking.created"
+EVENT_BOOKING_PAYMENT = "booking.payment"
+EVENT_CONTACT_CREATED = "contact.created"
+
+REPLAY_LIMIT = 500
+SUBSCRIBER_QUEUE_SIZE = 256
+# Autoincrement ids can commit out of order; re-reading a short tail catches late arrivals.
+LOOKBACK_IDS = 50
+PURGE_INTERVAL_SECONDS = 3600
+SSE_HEARTBEAT_SECONDS = 15
+SSE_RETRY_MS = 3000
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PublishedEvent:
+    id: int
+    event_type: str
+    payload: dict[str, Any]
+    created_at: datetime | None
+
+    def as_sse(self) -> str:
+        data = json.dumps(
+            {"type": self.event_type, "payload": self.payload, "created_at": self.created_at},
+            ensure_ascii=False,
+            default=str,
+        )
+        return f"id: {self.id}\nevent: {self.event_type}\ndata: {data}\n\n"
+
+
+def _published(row: DomainEvent) -> PublishedEvent:
+    return PublishedEvent(id=row.id, event_type=row.event_type, payload=row.payload or {}, created_at=row.created_at)
+
+
+def record_event(db: Session, event_type: str, payload: dict[str, Any]) -> None:
+    """Add an event to the caller's transaction; subscribers see it only once that transaction commits."""
+    db.add(DomainEvent(event_type=event_type, payload=payload))
+    db.info["domain_events_pending"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_broker(session: Session) -> None:
+    if session.info.pop("domain_events_pending", False):
+        broker.wake()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_pending_events(session: Session, previous_transaction) -> None:
+    session.info.pop("domain_events_pending", None)
+
+
+def latest_event_id() -> int:
+    with SessionLocal() as db:
+        return int(db.scalar(select(func.max(DomainEvent.id))) or 0)
+
+
+def load_events_after(last_id: int, *, limit: int = REPLAY_LIMIT) -> list[PublishedEvent]:
+    with SessionLocal() as db:
+        rows = db.scalars(
+            select(DomainEvent).where(DomainEvent.id > last_id).order_by(DomainEvent.id.asc()).limit(limit)
+        ).all()
+        return [_published(row) for row in rows]
+
+
+def purge_old_domain_events(db: Session) -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.admin_events_retention_hours)
+    result = db.execute(delete(DomainEvent).where(DomainEvent.created_at < cutoff.replace(tzinfo=None)))
+    db.commit()
+    return result.rowcount or 0
+
+
+class Subscription:
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        # None is the overflow sentinel: the stream closes and the browser replays from Last-Event-ID.
+        self.queue: asyncio.Queue[PublishedEvent | None] = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def deliver(self, item: PublishedEvent) -> None:
+        """Runs on the subscriber's event loop."""
+        if self.overflowed:
+            return
+        if self.queue.full():
+            self.overflowed = True
+            self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return
+        self.queue.put_nowait(item)
+
+
+class EventBroker:
+    """Per-process fan-out of committed domain events to SSE subscribers.
+
+    Workers share nothing but the database, so one tailer thread per process polls `domain_events`
+    while anyone is subscribed; commits made in this process wake it early.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._subscribers: set[Subscription] = set()
+        self._thread: threading.Thread | None = None
+        self._last_id: int | None = None
+        self._seen: set[int] = set()
+        self._primed = False
+        self._last_purge = 0.0
+
+    def subscribe(self, after_id: int, *, limit: int | None = None) -> Subscription | None:
+        """Register the calling event loop; a fresh tailer starts from `after_id`. None once `limit` streams are open."""
+        subscription = Subscription(asyncio.get_running_loop())
+        with self._lock:
+            if limit is not None and len(self._subscribers) >= limit:
+                return None
+            self._subscribers.add(subscription)
+            if self._last_id is None:
+                self._last_id = after_id
+                self._primed = False
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="domain-events-tailer", daemon=True)
+                self._thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+        self._wake.set()
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(max(settings.admin_events_poll_ms, 50) / 1000)
+            self._wake.clear()
+            with self._lock:
+                subscribers = list(self._subscribers)
+                if not subscribers:
+                    # Idle processes stop polling; the next subscriber starts a fresh tailer.
+                    self._thread = None
+                    self._last_id = None
+                    self._seen.clear()
+                    return
+            try:
+                self._poll(subscribers)
+            except Exception:
+                logger.exception("Domain events poll failed")
+
+    def _poll(self, subscribers: list[Subscription]) -> None:
+        last_id = self._last_id or 0
+        with SessionLocal() as db:
+            rows = db.scalars(
+                select(DomainEvent)
+                .where(DomainEvent.id > last_id - LOOKBACK_IDS)
+                .order_by(DomainEvent.id.asc())
+                .limit(REPLAY_LIMIT + LOOKBACK_IDS)
+            ).all()
+            if time.monotonic() - self._last_purge > PURGE_INTERVAL_SECONDS:
+                self._last_purge = time.monotonic()
+                purge_old_domain_events(db)
+
+        if not self._primed:
+            # The lookback tail of a fresh tailer was published before it started.
+            self._seen.update(row.id for row in rows if row.id <= last_id)
+            self._primed = True
+        for row in rows:
+            if row.id in self._seen or row.id <= last_id - LOOKBACK_IDS:
+                continue
+            item = _published(row)
+            self._seen.add(row.id)
+            last_id = max(last_id, row.id)
+            for subscription in subscribers:
+                try:
+                    subscription.loop.call_soon_threadsafe(subscription.deliver, item)
+                except RuntimeError:
+                    # The subscriber's loop is gone; it will be unsubscribed by its own cleanup.
+                    continue
+        self._last_id = last_id
+        floor = last_id - LOOKBACK_IDS
+        self._seen = {event_id for event_id in self._seen if event_id > floor}
+
+
+broker = EventBroker()
+
+
+async def sse_stream(request: Request, last_event_id: int | None) -> AsyncIterator[str]:
+    """Replay events after `last_event_id` (or start from now), then follow the broker until the stream ages out.
+
+    Past ADMIN_EVENTS_MAX_STREAMS open streams in this process the response only replays and closes, and
+    `retry` asks the client to poll again later: under Passenger/a2wsgi an open stream holds a whole worker.
+    """
+    cursor = last_event_id if last_event_id is not None else await run_in_threadpool(latest_event_id)
+    subscription = broker.subscribe(cursor, limit=max(settings.admin_events_max_streams, 0))
+    retry_ms = SSE_RETRY_MS if subscription else max(settings.admin_events_poll_retry_ms, SSE_RETRY_MS)
+    sent: set[int] = set()
+    try:
+        yield f"retry: {retry_ms}\nid: {cursor}\n\n"
+        # Replay after subscribing so nothing committed in between is lost; duplicates are skipped below.
+        while True:
+            batch = await run_in_threadpool(load_events_after, cursor)
+            for item in batch:
+                sent.add(item.id)
+                cursor = item.id
+                yield item.as_sse()
+            if len(batch) < REPLAY_LIMIT:
+                break
+        if subscription is None:
+            return
+
+        deadline = time.monotonic() + max(settings.admin_events_stream_seconds, 1)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or await request.is_disconnected():
+                break
+            try:
+                item = await asyncio.wait_for(subscription.queue.get(), timeout=min(SSE_HEARTBEAT_SECONDS, remaining))
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if item is None:
+                break
+            if item.id in sent:
+                continue
+            sent.add(item.id)
+            yield item.as_sse()
+    finally:
+        if subscription is not None:
+            broker.unsubscribe(subscription)
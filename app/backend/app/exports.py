@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import csv
+import io
+import re
+import zipfile
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+from .db import SessionLocal
+
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_XLSX = "xlsx"
+EXPORT_FORMAT_PATTERN = f"^({EXPORT_FORMAT_CSV}|{EXPORT_FORMAT_XLSX})$"
+EXPORT_MEDIA_TYPES = {
+    EXPORT_FORMAT_CSV: "text/csv; charset=utf-8",
+    EXPORT_FORMAT_XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+EXPORT_BATCH_SIZE = 500
+# Flush generated bytes to the client once this much is buffered.
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+_XML_ILLEGAL_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+# Spreadsheets evaluate CSV cells starting with these as formulas.
+_CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+# "+7 (914) 707-57-10", "-150": a leading sign followed only by digits and phone punctuation cannot call a function.
+_CSV_SIGNED_NUMBER_RE = re.compile(r"[+-][\d\s().-]*\d[\d\s().-]*")
+
+
+@dataclass(frozen=True)
+class ExportColumn:
+    title: str
+    value: Callable[[Any], Any]
+
+
+def _cell_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, bool):
+        return "да" if value else "нет"
+    return str(value)
+
+
+def _csv_cell(value: Any) -> str:
+    text = _cell_text(value)
+    # Only free text is neutralized; numbers such as negative amounts stay numeric.
+    if isinstance(value, str) and text.startswith(_CSV_FORMULA_PREFIXES) and not _CSV_SIGNED_NUMBER_RE.fullmatch(text):
+        return f"'{text}"
+    return text
+
+
+def iter_export_rows(query: Select) -> Iterator[Any]:
+    """Stream ORM rows through a server-side cursor on a session owned by the response body."""
+    db = SessionLocal()
+    try:
+        for row in db.scalars(query.execution_options(yield_per=EXPORT_BATCH_SIZE)):
+            yield row
+    finally:
+        db.close()
+
+
+def stream_csv(rows: Iterable[Any], columns: list[ExportColumn]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM so Excel opens UTF-8 Cyrillic correctly.
+    buffer.write("\ufeff")
+    writer.writerow([column.title for column in columns])
+    for row in rows:
+        writer.writerow([_csv_cell(column.value(row)) for column in columns])
+        if buffer.tell() >= EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, non-seekable target: zipfile then streams entries with data descriptors."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:  # type: ignore[override]
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+_XLSX_STATIC_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+        'Target="styles.xml"/>'
+        "</Relationships>"
+    ),
+    "xl/styles.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+        '<borders count="1"><border/></borders>'
+        '<cellStyleXfs count="1"><xf/></cellStyleXfs>'
+        '<cellXfs count="1"><xf/></cellXfs>'
+        "</styleSheet>"
+    ),
+}
+
+
+def _xlsx_cell(value: Any) -> str:
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return f'<c t="n"><v>{value}</v></c>'
+    text = escape(_XML_ILLEGAL_RE.sub("", _cell_text(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(values: Iterable[Any]) -> str:
+    return "<row>" + "".join(_xlsx_cell(value) for value in values) + "</row>"
+
+
+def stream_xlsx(rows: Iterable[Any], columns: list[ExportColumn], *, sheet_name: str) -> Iterator[bytes]:
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_STATIC_PARTS.items():
+            archive.writestr(name, content)
+        archive.writestr(
+            "xl/workbook.xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{escape(sheet_name[:31])}" sheetId="1" r:id="rId1"/></sheets>'
+            "</workbook>",
+        )
+        yield sink.drain()
+
+        with archive.open("xl/worksheets/sheet1.xml", mode="w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(column.title for column in columns).encode("utf-8"))
+            for row in rows:
+                sheet.write(_xlsx_row(column.value(row) for column in columns).encode("utf-8"))
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+            sheet.write(b"</sheetData></worksheet>")
+    yield sink.drain()
+
+
+def export_response(
+    query: Select,
+    columns: list[ExportColumn],
+    *,
+    export_format: str,
+    filename: str,
+) -> StreamingResponse:
+    rows = iter_export_rows(query)
+    if export_format == EXPORT_FORMAT_XLSX:
+        body = stream_xlsx(rows, columns, sheet_name=filename)
+    else:
+        body = stream_csv(rows, columns)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M")
+    disposition = quote(f"{filename}-{stamp}.{export_format}")
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{disposition}"},
+    )
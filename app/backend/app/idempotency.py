@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any, TypeVar
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .models import IdempotencyKey
+
+IDEMPOTENCY_STATUS_PENDING = "pending"
+IDEMPOTENCY_STATUS_COMPLETED = "completed"
+MAX_IDEMPOTENCY_KEY_LENGTH = 128
+
+ResponseT = TypeVar("ResponseT", bound=BaseModel)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _request_hash(payload: dict[str, Any]) -> str:
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":"), sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _in_progress() -> HTTPException:
+    return HTTPException(status_code=409, detail="Запрос уже обрабатывается. Подождите несколько секунд.")
+
+
+def begin_idempotent_request(db: Session, *, scope: str, key: str, payload: dict[str, Any]) -> dict[str, Any] | None:
+    """Claim `key` for this request; returns the stored response when the request is a replay."""
+    request_hash = _request_hash(payload)
+    now = _utcnow()
+
+    row = db.scalar(select(IdempotencyKey).where(IdempotencyKey.scope == scope, IdempotencyKey.key == key))
+    if row and row.expires_at.replace(tzinfo=None) <= now:
+        db.delete(row)
+        db.commit()
+        row = None
+
+    if row:
+        if row.request_hash != request_hash:
+            raise HTTPException(status_code=422, detail="Idempotency-Key уже использован для другого запроса.")
+        if row.status == IDEMPOTENCY_STATUS_COMPLETED and row.response_body:
+            return json.loads(row.response_body)
+        raise _in_progress()
+
+    db.add(
+        IdempotencyKey(
+            scope=scope,
+            key=key,
+            request_hash=request_hash,
+            status=IDEMPOTENCY_STATUS_PENDING,
+            expires_at=now + timedelta(hours=max(settings.idempotency_ttl_hours, 1)),
+        )
+    )
+    try:
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        raise _in_progress() from exc
+    return None
+
+
+def complete_idempotent_request(db: Session, *, scope: str, key: str, response: dict[str, Any]) -> None:
+    db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+        .values(
+            status=IDEMPOTENCY_STATUS_COMPLETED,
+            response_body=json.dumps(response, ensure_ascii=False, separators=(",", ":")),
+        )
+    )
+    db.commit()
+
+
+def release_idempotent_request(db: Session, *, scope: str, key: str) -> None:
+    """Drop a pending claim after a failed attempt so the client can retry with the same key."""
+    db.rollback()
+    db.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.scope == scope,
+            IdempotencyKey.key == key,
+            IdempotencyKey.status == IDEMPOTENCY_STATUS_PENDING,
+        )
+    )
+    db.commit()
+
+
+def run_idempotent(
+    db: Session,
+    *,
+    scope: str,
+    key: str | None,
+    payload: BaseModel,
+    response_model: type[ResponseT],
+    handler: Callable[[], ResponseT],
+) -> ResponseT:
+    key = (key or "").strip()
+    if not key:
+        return handler()
+    if len(key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise HTTPException(status_code=422, detail="Idempotency-Key слишком длинный.")
+
+    replay = begin_idempotent_request(db, scope=scope, key=key, payload=payload.model_dump(mode="json"))
+    if replay is not None:
+        return response_model.model_validate(replay)
+
+    try:
+        response = handler()
+    except Exception:
+        release_idempotent_request(db, scope=scope, key=key)
+        raise
+
+    complete_idempotent_request(db, scope=scope, key=key, response=response.model_dump(mode="json"))
+    return response
+
+
+def purge_expired_idempotency_keys(db: Session) -> int:
+    result = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= _utcnow()))
+    db.commit()
+    return result.rowcount or 0
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import deque
+
+import anyio.to_thread
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .config import settings
+from .metrics import registry, route_template
+
+
+class ConcurrencyLimiter:
+    """At most `limit` requests in progress and at most `queue_size` waiting; the rest are turned away.
+
+    A released slot is handed straight to the oldest waiter. Slots are counted per process with a thread
+    lock, and waiters are woken on their own loop, so one limiter can serve several event loops.
+    """
+
+    def __init__(self, limit: int, queue_size: int) -> None:
+        self.limit = max(limit, 1)
+        self.queue_size = max(queue_size, 0)
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+
+    async def acquire(self, timeout: float) -> bool:
+        """False when the queue is full or the wait took longer than `timeout` seconds."""
+        with self._lock:
+            if self._active < self.limit and not self._waiters:
+                self._active += 1
+                waiter = None
+            elif len(self._waiters) >= self.queue_size:
+                return False
+            else:
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiters.append(waiter)
+        self._publish()
+        if waiter is None:
+            return True
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+            if waiter.done() and not waiter.cancelled():
+                # The slot arrived just as we gave up. A popped but still pending waiter is cancelled
+                # by now instead, and _grant passes that slot on.
+                self.release()
+            self._publish()
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            return False
+        self._publish()
+        return True
+
+    def release(self) -> None:
+        with self._lock:
+            if not self._waiters:
+                self._active -= 1
+                waiter = None
+            else:
+                waiter = self._waiters.popleft()
+        self._publish()
+        if waiter is None:
+            return
+        try:
+            waiter.get_loop().call_soon_threadsafe(self._grant, waiter)
+        except RuntimeError:
+            # The waiter's loop is closed; give the slot to the next one instead.
+            self.release()
+
+    def _publish(self) -> None:
+        registry.set_gauge("load_shed_active", None, self._active)
+        registry.set_gauge("load_shed_queued", None, len(self._waiters))
+
+    def _grant(self, waiter: asyncio.Future[None]) -> None:
+        if waiter.done():
+            self.release()
+        else:
+            waiter.set_result(None)
+
+
+def _apply_threadpool_size() -> None:
+    # The default limiter belongs to the running loop, so this is checked on the loop, per request.
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    if settings.threadpool_size > 0 and limiter.total_tokens != settings.threadpool_size:
+        limiter.total_tokens = settings.threadpool_size
+
+
+class LoadSheddingMiddleware:
+    """Sizes the sync-route threadpool and caps concurrent requests with a bounded wait queue.
+
+    When the queue is full, or a request waited LOAD_SHED_QUEUE_TIMEOUT_SECONDS without a slot,
+    it gets 503 with Retry-After instead of piling up until the client times out. Routes in
+    LOAD_SHED_BYPASS_ROUTES (health checks, metrics, long-lived streams) are never queued.
+    """
+
+    def __init__(self, app: ASGIApp, *, limiter: ConcurrencyLimiter | None = None) -> None:
+        self.app = app
+        self.limiter = limiter or ConcurrencyLimiter(settings.load_shed_concurrency, settings.load_shed_queue_size)
+        self.bypass = set(settings.load_shed_bypass_routes_list)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        _apply_threadpool_size()
+        if not settings.load_shedding_enabled or route_template(scope) in self.bypass:
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.limiter.acquire(settings.load_shed_queue_timeout_seconds):
+            registry.inc("http_requests_shed_total", {"route": route_template(scope)})
+            response = JSONResponse(
+                {"detail": "Сервер перегружен. Попробуйте немного позже."},
+                status_code=503,
+                headers={"Retry-After": str(max(settings.load_shed_retry_after_seconds, 1))},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release()
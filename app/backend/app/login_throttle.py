@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta, timezone
+
+from fastapi import Request
+from sqlalchemy import and_, delete, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .models import LoginThrottle
+
+SCOPE_IP = "ip"
+SCOPE_USER = "user"
+MAX_KEY_LENGTH = 128
+# Cap on the doubling exponent; the configured maximum lockout applies long before it.
+MAX_LOCKOUT_DOUBLINGS = 20
+
+ThrottleKey = tuple[str, str]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _naive(value: datetime | None) -> datetime | None:
+    return value.replace(tzinfo=None) if value is not None else None
+
+
+def client_ip(request: Request) -> str:
+    if settings.trust_forwarded_for:
+        forwarded = request.headers.get("x-forwarded-for", "").split(",")[0].strip()
+        if forwarded:
+            return forwarded[:MAX_KEY_LENGTH]
+    return (request.client.host if request.client else "unknown")[:MAX_KEY_LENGTH]
+
+
+def login_throttle_keys(ip: str, username: str) -> list[ThrottleKey]:
+    return [(SCOPE_IP, ip), (SCOPE_USER, username.strip().lower()[:MAX_KEY_LENGTH])]
+
+
+def _free_attempts(scope: str) -> int:
+    if scope == SCOPE_IP:
+        return max(settings.login_free_attempts_per_ip, 1)
+    return max(settings.login_free_attempts_per_user, 1)
+
+
+def lockout_seconds(scope: str, failures: int) -> int:
+    """Exponential lockout: the N-th failure past the free allowance locks for base * 2**N seconds."""
+    over = failures - _free_attempts(scope)
+    if over < 0:
+        return 0
+    seconds = settings.login_lockout_base_seconds * 2 ** min(over, MAX_LOCKOUT_DOUBLINGS)
+    return max(min(seconds, settings.login_lockout_max_seconds), 1)
+
+
+def _rows_for(db: Session, keys: list[ThrottleKey], *, for_update: bool = False) -> dict[ThrottleKey, LoginThrottle]:
+    query = select(LoginThrottle).where(
+        or_(*[and_(LoginThrottle.scope == scope, LoginThrottle.key == key) for scope, key in keys])
+    )
+    if for_update:
+        query = query.with_for_update()
+    return {(row.scope, row.key): row for row in db.scalars(query).all()}
+
+
+def login_retry_after(db: Session, keys: list[ThrottleKey]) -> int:
+    """Seconds until the next attempt is allowed; 0 when none of the keys is locked."""
+    now = _utcnow()
+    wait = 0
+    for row in _rows_for(db, keys).values():
+        locked_until = _naive(row.locked_until)
+        if locked_until and locked_until > now:
+            wait = max(wait, math.ceil((locked_until - now).total_seconds()))
+    return wait
+
+
+def record_login_failure(db: Session, keys: list[ThrottleKey]) -> int:
+    """Count a failed attempt against every key; returns the lockout it triggered, in seconds."""
+    now = _utcnow()
+    # Failures older than the longest lockout are forgotten rather than kept escalating forever.
+    stale_before = now - timedelta(seconds=max(settings.login_lockout_max_seconds, 60))
+    rows = _rows_for(db, keys, for_update=True)
+    retry_after = 0
+    for scope, key in keys:
+        row = rows.get((scope, key))
+        if row is None:
+            row = LoginThrottle(scope=scope, key=key, failures=0, last_failure_at=now)
+            db.add(row)
+        elif _naive(row.last_failure_at) < stale_before:
+            row.failures = 0
+        row.failures += 1
+        row.last_failure_at = now
+        seconds = lockout_seconds(scope, row.failures)
+        row.locked_until = now + timedelta(seconds=seconds) if seconds else None
+        retry_after = max(retry_after, seconds)
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent first failure for the same key inserted the row; that attempt was counted instead.
+        db.rollback()
+    return retry_after
+
+
+def clear_login_failures(db: Session, keys: list[ThrottleKey]) -> None:
+    """Forget the username's failures after a successful login; the IP counter keeps decaying on its own."""
+    user_keys = [(scope, key) for scope, key in keys if scope == SCOPE_USER]
+    if user_keys:
+        db.execute(
+            delete(LoginThrottle).where(
+                or_(*[and_(LoginThrottle.scope == scope, LoginThrottle.key == key) for scope, key in user_keys])
+            )
+        )
+
+
+def purge_login_throttle(db: Session) -> int:
+    now = _utcnow()
+    stale_before = now - timedelta(seconds=max(settings.login_lockout_max_seconds, 60))
+    result = db.execute(
+        delete(LoginThrottle).where(
+            LoginThrottle.last_failure_at < stale_before,
+            or_(LoginThrottle.locked_until.is_(None), LoginThrottle.locked_until < now),
+        )
+    )
+    db.commit()
+    return result.rowcount or 0
@@ -0,0 +1,375 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import anyio.to_thread
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+from .db import engine
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows dev machines
+    fcntl = None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "<unmatched>"
+ROUTE_CACHE_SIZE = 2048
+ARCHIVE_FILE = "archive.json"
+LOCK_FILE = ".lock"
+
+# name -> (type, help); everything recorded must be declared here.
+METRIC_HELP: dict[str, tuple[str, str]] = {
+    "http_requests_total": ("counter", "HTTP requests by route template, method and status."),
+    "http_request_duration_seconds": ("histogram", "HTTP request latency by route template and method."),
+    "http_requests_in_flight": ("gauge", "HTTP requests currently being served."),
+    "db_pool_size": ("gauge", "Configured SQLAlchemy pool size."),
+    "db_pool_checked_out": ("gauge", "SQLAlchemy connections currently checked out."),
+    "db_pool_overflow": ("gauge", "SQLAlchemy overflow connections currently open."),
+    "threadpool_capacity": ("gauge", "Threads available to sync routes."),
+    "threadpool_busy": ("gauge", "Threads currently running sync routes."),
+    "db_queries_total": ("counter", "SQL statements executed, by route template."),
+    "db_request_duration_seconds": ("histogram", "Total SQL time per request, by route template."),
+    "yookassa_request_duration_seconds": ("histogram", "YooKassa API call latency by method and outcome."),
+    "metrics_workers": ("gauge", "Worker processes with a live metrics snapshot."),
+    "load_shed_active": ("gauge", "Requests holding a load-shedding concurrency slot."),
+    "load_shed_queued": ("gauge", "Requests waiting for a load-shedding concurrency slot."),
+    "http_requests_shed_total": ("counter", "Requests rejected with 503 by load shedding, by route template."),
+}
+
+LabelKey = tuple[tuple[str, str], ...]
+
+logger = logging.getLogger(__name__)
+
+
+def _label_key(labels: dict[str, str] | None) -> LabelKey:
+    return tuple(sorted((labels or {}).items()))
+
+
+class MetricsRegistry:
+    """Counters, gauges and fixed-bucket histograms of one worker process."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[tuple[str, LabelKey], float] = {}
+        self._gauges: dict[tuple[str, LabelKey], float] = {}
+        # Per-bucket (non-cumulative) counts, then +Inf count, sum and total count.
+        self._histograms: dict[tuple[str, LabelKey], list[float]] = {}
+
+    def inc(self, name: str, labels: dict[str, str] | None = None, amount: float = 1.0) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + amount
+
+    def add_gauge(self, name: str, labels: dict[str, str] | None = None, delta: float = 1.0) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._gauges[key] = self._gauges.get(key, 0.0) + delta
+
+    def set_gauge(self, name: str, labels: dict[str, str] | None = None, value: float = 0.0) -> None:
+        with self._lock:
+            self._gauges[(name, _label_key(labels))] = float(value)
+
+    def observe(self, name: str, labels: dict[str, str] | None, value: float) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            row = self._histograms.get(key)
+            if row is None:
+                row = self._histograms[key] = [0.0] * (len(LATENCY_BUCKETS) + 3)
+            position = len(LATENCY_BUCKETS)
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if value <= bound:
+                    position = index
+                    break
+            row[position] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "written_at": time.time(),
+                "counters": [[name, dict(labels), value] for (name, labels), value in self._counters.items()],
+                "gauges": [[name, dict(labels), value] for (name, labels), value in self._gauges.items()],
+                "histograms": [[name, dict(labels), list(row)] for (name, labels), row in self._histograms.items()],
+            }
+
+
+registry = MetricsRegistry()
+
+
+def collect_runtime_gauges() -> None:
+    pool = engine.pool
+    for name, method in (
+        ("db_pool_size", "size"),
+        ("db_pool_checked_out", "checkedout"),
+        ("db_pool_overflow", "overflow"),
+    ):
+        # SQLite and test pools implement only part of the QueuePool interface.
+        if hasattr(pool, method):
+            registry.set_gauge(name, None, max(getattr(pool, method)(), 0))
+    limiter = _threadpool_limiter
+    if limiter is not None:
+        registry.set_gauge("threadpool_capacity", None, limiter.total_tokens)
+        registry.set_gauge("threadpool_busy", None, limiter.borrowed_tokens)
+
+
+def _metrics_dir() -> Path | None:
+    return Path(settings.metrics_dir) if settings.metrics_dir else None
+
+
+def _stale_after_seconds() -> float:
+    return max(settings.metrics_flush_seconds * 6, 60)
+
+
+def _write_json(path: Path, payload: dict[str, Any]) -> None:
+    temporary = path.with_name(f".{path.name}.tmp")
+    temporary.write_text(json.dumps(payload), encoding="utf-8")
+    os.replace(temporary, path)
+
+
+def write_snapshot() -> None:
+    """Publish this worker's registry for the others; a no-op in single-process mode."""
+    directory = _metrics_dir()
+    if directory is None:
+        return
+    collect_runtime_gauges()
+    directory.mkdir(parents=True, exist_ok=True)
+    _write_json(directory / f"{os.getpid()}.json", registry.snapshot())
+
+
+class SnapshotWriter:
+    """Background thread that rewrites the worker snapshot every METRICS_FLUSH_SECONDS."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def ensure_started(self) -> None:
+        if self._thread is not None or _metrics_dir() is None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="metrics-snapshot", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                write_snapshot()
+            except Exception:
+                logger.exception("Metrics snapshot failed")
+            time.sleep(max(settings.metrics_flush_seconds, 1))
+
+
+snapshot_writer = SnapshotWriter()
+
+
+def _read_json(path: Path) -> dict[str, Any] | None:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _archive_dead_workers(directory: Path, paths: list[Path]) -> bool:
+    """Fold counters of workers that stopped writing into archive.json, so totals stay monotonic."""
+    if fcntl is None:
+        return False
+    with open(directory / LOCK_FILE, "a+") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        # Re-read under the lock: another worker may have archived some of these already.
+        snapshots = [snapshot for snapshot in (_read_json(path) for path in paths) if snapshot is not None]
+        if not snapshots:
+            return True
+        archive = _read_json(directory / ARCHIVE_FILE) or {}
+        merged = _merge([archive, *snapshots], include_gauges=False)
+        _write_json(
+            directory / ARCHIVE_FILE,
+            {
+                "counters": [[name, dict(labels), value] for (name, labels), value in merged["counters"].items()],
+                "histograms": [[name, dict(labels), row] for (name, labels), row in merged["histograms"].items()],
+            },
+        )
+        for path in paths:
+            path.unlink(missing_ok=True)
+    return True
+
+
+def _merge(snapshots: list[dict[str, Any]], *, include_gauges: bool) -> dict[str, dict]:
+    counters: dict[tuple[str, LabelKey], float] = {}
+    gauges: dict[tuple[str, LabelKey], float] = {}
+    histograms: dict[tuple[str, LabelKey], list[float]] = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot.get("counters", []):
+            key = (name, _label_key(labels))
+            counters[key] = counters.get(key, 0.0) + value
+        if include_gauges:
+            # Gauges sum across workers: in-flight requests, checked-out connections and busy threads add up.
+            for name, labels, value in snapshot.get("gauges", []):
+                key = (name, _label_key(labels))
+                gauges[key] = gauges.get(key, 0.0) + value
+        for name, labels, row in snapshot.get("histograms", []):
+            key = (name, _label_key(labels))
+            current = histograms.get(key)
+            if current is None or len(current) != len(row):
+                histograms[key] = list(row)
+            else:
+                histograms[key] = [left + right for left, right in zip(current, row)]
+    return {"counters": counters, "gauges": gauges, "histograms": histograms}
+
+
+def collect_all_workers() -> dict[str, dict]:
+    """This worker's live registry merged with every other worker's last snapshot."""
+    directory = _metrics_dir()
+    if directory is None:
+        collect_runtime_gauges()
+        merged = _merge([registry.snapshot()], include_gauges=True)
+        merged["gauges"][("metrics_workers", ())] = 1
+        return merged
+
+    write_snapshot()
+    own = f"{os.getpid()}.json"
+    stale_before = time.time() - _stale_after_seconds()
+    live: list[dict[str, Any]] = []
+    dead: list[tuple[Path, dict[str, Any]]] = []
+    live_workers = 0
+    for path in directory.glob("*.json"):
+        if path.name == ARCHIVE_FILE:
+            continue
+        snapshot = _read_json(path)
+        if snapshot is None:
+            continue
+        if path.name != own and snapshot.get("written_at", 0) < stale_before:
+            dead.append((path, snapshot))
+        else:
+            live.append(snapshot)
+            live_workers += 1
+    if dead:
+        try:
+            archived = _archive_dead_workers(directory, [path for path, _ in dead])
+        except OSError:
+            logger.exception("Metrics archive update failed")
+            archived = False
+        if not archived:
+            # Keep their counters in the totals; their gauges no longer describe anything running.
+            live.extend({**snapshot, "gauges": []} for _, snapshot in dead)
+    archive = _read_json(directory / ARCHIVE_FILE) or {}
+    merged = _merge([archive, *live], include_gauges=True)
+    merged["gauges"][("metrics_workers", ())] = live_workers
+    return merged
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: LabelKey, extra: tuple[tuple[str, str], ...] = ()) -> str:
+    items = [*labels, *extra]
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in items) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render_prometheus(merged: dict[str, dict]) -> str:
+    series: dict[str, list[str]] = {name: [] for name in METRIC_HELP}
+    for kind in ("counters", "gauges"):
+        for (name, labels), value in sorted(merged[kind].items()):
+            if name in series:
+                series[name].append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    for (name, labels), row in sorted(merged["histograms"].items()):
+        if name not in series:
+            continue
+        cumulative = 0.0
+        for bound, count in zip(LATENCY_BUCKETS, row):
+            cumulative += count
+            series[name].append(f"{name}_bucket{_format_labels(labels, (('le', repr(bound)),))} {_format_value(cumulative)}")
+        series[name].append(f"{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {_format_value(row[-1])}")
+        series[name].append(f"{name}_sum{_format_labels(labels)} {repr(float(row[-2]))}")
+        series[name].append(f"{name}_count{_format_labels(labels)} {_format_value(row[-1])}")
+
+    lines: list[str] = []
+    for name, (kind, help_text) in METRIC_HELP.items():
+        if not series[name]:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(series[name])
+    return "\n".join(lines) + "\n"
+
+
+_threadpool_limiter: Any = None
+_route_cache: dict[tuple[str, str], str] = {}
+
+
+def route_template(scope: Scope) -> str:
+    cache_key = (scope["method"], scope["path"])
+    template = _route_cache.get(cache_key)
+    if template is not None:
+        return template
+    template = UNMATCHED_ROUTE
+    router = getattr(scope.get("app"), "router", None)
+    for route in getattr(router, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            template = route.path
+            break
+        if match == Match.PARTIAL and template == UNMATCHED_ROUTE:
+            template = route.path
+    if len(_route_cache) >= ROUTE_CACHE_SIZE:
+        _route_cache.clear()
+    _route_cache[cache_key] = template
+    return template
+
+
+class MetricsMiddleware:
+    """Counts requests and records latency per route template (not per raw path, which would explode label sets)."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        global _threadpool_limiter
+        # Read on the serving loop; the snapshot thread only reads its counters.
+        _threadpool_limiter = anyio.to_thread.current_default_thread_limiter()
+        snapshot_writer.ensure_started()
+
+        method = scope["method"]
+        route = route_template(scope)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        registry.add_gauge("http_requests_in_flight", {"route": route}, 1)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            registry.add_gauge("http_requests_in_flight", {"route": route}, -1)
+            registry.inc("http_requests_total", {"method": method, "route": route, "status": str(status)})
+            registry.observe(
+                "http_request_duration_seconds",
+                {"method": method, "route": route},
+                time.perf_counter() - started,
+            )
@@ -1,20 +1,23 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime, timezone
 from decimal import Decimal
 from typing import Any
 
 from sqlalchemy import (
     JSON,
     Boolean,
+    Date,
     DateTime,
     ForeignKey,
     Index,
     Integer,
+    LargeBinary,
     Numeric,
     String,
     Text,
     UniqueConstraint,
+    event,
     func,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -36,6 +39,14 @@ class TimestampMixin:
     )
 
 
+@event.listens_for(TimestampMixin, "before_insert", propagate=True)
+def _sqlite_created_at(mapper, connection, target) -> None:
+    # SQLite's CURRENT_TIMESTAMP has no fraction while SQLAlchemy writes microseconds; keyset pages compare
+    # the stored text, so new rows get the SQLAlchemy form too (old rows: normalize_sqlite_datetimes).
+    if target.created_at is None and connection.dialect.name == "sqlite":
+        target.created_at = datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class Setting(TimestampMixin, Base):
     __tablename__ = "settings"
 
@@ -91,6 +102,7 @@ class ScheduleEvent(TimestampMixin, Base):
     __tablename__ = "schedule_events"
     __table_args__ = (
         Index("ix_schedule_service_start", "service_id", "start_time"),
+        Index("ix_schedule_start", "start_time"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -108,6 +120,9 @@ class ScheduleEvent(TimestampMixin, Base):
 
 class Contact(TimestampMixin, Base):
     __tablename__ = "contacts"
+    __table_args__ = (
+        Index("ix_contacts_created", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(120), nullable=False)
@@ -121,6 +136,7 @@ class Booking(TimestampMixin, Base):
     __tablename__ = "bookings"
     __table_args__ = (
         Index("ix_bookings_schedule_status", "schedule_event_id", "status"),
+        Index("ix_bookings_created", "created_at"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -172,20 +188,40 @@ class Payment(TimestampMixin, Base):
 
 class PaymentLog(Base):
     __tablename__ = "payment_logs"
+    __table_args__ = (
+        Index("ix_payment_logs_created", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     payment_id: Mapped[int] = mapped_column(ForeignKey("payments.id", ondelete="CASCADE"), nullable=False)
     event_type: Mapped[str] = mapped_column(String(64), nullable=False)
-    payload: Mapped[dict[str, Any]] = mapped_column(JSON, default=dict, nullable=False)
+    # Legacy uncompressed column; new rows keep it empty and store payload_compressed instead.
+    payload_json: Mapped[dict[str, Any]] = mapped_column("payload", JSON, default=dict, nullable=False)
+    payload_compressed: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     payment: Mapped["Payment"] = relationship(back_populates="logs")
 
 
+class PaymentLogArchive(Base):
+    __tablename__ = "payment_logs_archive"
+    __table_args__ = (
+        Index("ix_payment_logs_archive_payment", "payment_id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    payment_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    event_type: Mapped[str] = mapped_column(String(64), nullable=False)
+    payload_compressed: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
 class GalleryItem(TimestampMixin, Base):
     __tablename__ = "gallery_items"
     __table_args__ = (
         Index("ix_gallery_category_active", "category", "is_active"),
+        Index("ix_gallery_sort", "sort_order"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -201,6 +237,7 @@ class GiftCertificate(TimestampMixin, Base):
     __tablename__ = "gift_certificates"
     __table_args__ = (
         Index("ix_gift_certificates_status_created", "status", "created_at"),
+        Index("ix_gift_certificates_created", "created_at"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -223,3 +260,102 @@ class GiftCertificate(TimestampMixin, Base):
     issued_by: Mapped[str | None] = mapped_column(String(120), nullable=True)
     issued_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     redeemed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("scope", "key", name="uq_idempotency_scope_key"),
+        Index("ix_idempotency_keys_expires", "expires_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    scope: Mapped[str] = mapped_column(String(64), nullable=False)
+    key: Mapped[str] = mapped_column(String(128), nullable=False)
+    request_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    status: Mapped[str] = mapped_column(String(16), default="pending", nullable=False)
+    response_body: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class AppMetadata(Base):
+    """Small key/value store for schema and index bookkeeping (e.g. the search token scheme version)."""
+
+    __tablename__ = "app_metadata"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    value: Mapped[str] = mapped_column(String(255), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+
+class SearchToken(Base):
+    __tablename__ = "search_tokens"
+    __table_args__ = (
+        Index("ix_search_tokens_lookup", "entity", "token", "entity_id"),
+        Index("ix_search_tokens_entity", "entity", "entity_id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    entity: Mapped[str] = mapped_column(String(16), nullable=False)
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    token: Mapped[str] = mapped_column(String(64), nullable=False)
+
+
+class DailyServiceStat(Base):
+    """Per-service, per-day rollup of schedule capacity and bookings (day of the event, schedule timezone)."""
+
+    __tablename__ = "daily_service_stats"
+    __table_args__ = (
+        UniqueConstraint("service_id", "day", name="uq_daily_service_stats_service_day"),
+        Index("ix_daily_service_stats_day", "day"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    service_id: Mapped[int] = mapped_column(ForeignKey("services.id", ondelete="CASCADE"), nullable=False)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    events: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    capacity: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    bookings: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    cancelled_bookings: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    confirmed_seats: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    paid_amount: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+
+class DomainEvent(Base):
+    """Outbox of admin-facing events; every worker tails it to feed its SSE subscribers."""
+
+    __tablename__ = "domain_events"
+    __table_args__ = (
+        Index("ix_domain_events_created", "created_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    event_type: Mapped[str] = mapped_column(String(48), nullable=False)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSON, default=dict, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class LoginThrottle(Base):
+    __tablename__ = "login_throttle"
+    __table_args__ = (
+        UniqueConstraint("scope", "key", name="uq_login_throttle_scope_key"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    scope: Mapped[str] = mapped_column(String(16), nullable=False)
+    key: Mapped[str] = mapped_column(String(128), nullable=False)
+    failures: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    locked_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_failure_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import DateTime, Select, and_, func, or_, select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+# Totals are counted over at most this many rows, so `with_total` stays cheap on huge tables.
+TOTAL_COUNT_CAP = 10_000
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_COUNT_EXACT_HEADER = "X-Total-Count-Exact"
+PAGINATION_HEADERS = [NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, TOTAL_COUNT_EXACT_HEADER]
+
+
+@dataclass(frozen=True)
+class SortKey:
+    column: InstrumentedAttribute
+    descending: bool = False
+
+
+@dataclass(frozen=True)
+class PageParams:
+    limit: int
+    cursor: str | None
+    with_total: bool
+
+
+def get_page_params(
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(default=None, max_length=512),
+    with_total: bool = False,
+) -> PageParams:
+    return PageParams(limit=limit, cursor=cursor or None, with_total=with_total)
+
+
+def _is_datetime(key: SortKey) -> bool:
+    return isinstance(key.column.type, DateTime)
+
+
+def encode_cursor(values: list[Any]) -> str:
+    encoded = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(encoded, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, sort_keys: list[SortKey]) -> list[Any]:
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(f"{cursor}{padding}").decode("utf-8"))
+        if not isinstance(values, list) or len(values) != len(sort_keys):
+            raise ValueError("cursor arity mismatch")
+        return [
+            datetime.fromisoformat(value) if _is_datetime(key) else value
+            for key, value in zip(sort_keys, values)
+        ]
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as exc:
+        raise HTTPException(status_code=422, detail="Некорректный курсор страницы.") from exc
+
+
+def _after_cursor(sort_keys: list[SortKey], values: list[Any]):
+    # Raw columns on both sides, so the (sort column, id) index serves the filter and the ORDER BY.
+    # On SQLite this relies on one stored text form per column (db_migrations.normalize_sqlite_datetimes).
+    if len({key.descending for key in sort_keys}) == 1:
+        columns = tuple_(*[key.column for key in sort_keys])
+        cursor = tuple_(*values)
+        return columns < cursor if sort_keys[0].descending else columns > cursor
+    clauses = []
+    for index, key in enumerate(sort_keys):
+        step = key.column < values[index] if key.descending else key.column > values[index]
+        clauses.append(and_(*[prev.column == value for prev, value in zip(sort_keys[:index], values)], step))
+    return or_(*clauses)
+
+
+def sorted_query(query: Select, sort_keys: list[SortKey]) -> Select:
+    return query.order_by(*[key.column.desc() if key.descending else key.column.asc() for key in sort_keys])
+
+
+def keyset_paginate(
+    db: Session,
+    query: Select,
+    *,
+    sort_keys: list[SortKey],
+    page: PageParams,
+    response: Response,
+) -> list[Any]:
+    """Fetch one page of `query` ordered by `sort_keys` (last key must be unique) and set cursor headers."""
+    if page.with_total:
+        capped = query.order_by(None).limit(TOTAL_COUNT_CAP + 1).subquery()
+        total = int(db.scalar(select(func.count()).select_from(capped)) or 0)
+        response.headers[TOTAL_COUNT_HEADER] = str(min(total, TOTAL_COUNT_CAP))
+        response.headers[TOTAL_COUNT_EXACT_HEADER] = "true" if total <= TOTAL_COUNT_CAP else "false"
+
+    ordered = sorted_query(query, sort_keys)
+    if page.cursor:
+        ordered = ordered.where(_after_cursor(sort_keys, decode_cursor(page.cursor, sort_keys)))
+
+    rows = list(db.scalars(ordered.limit(page.limit + 1)).all())
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(last, key.column.key) for key in sort_keys])
+    return rows
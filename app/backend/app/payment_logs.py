@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import gzip
+import json
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from .models import Payment, PaymentLog, PaymentLogArchive
+
+ARCHIVE_MODE_TABLE = "table"
+ARCHIVE_MODE_JSONL = "jsonl"
+
+
+def compress_payload(payload: dict[str, Any]) -> bytes:
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+    return zlib.compress(raw.encode("utf-8"), 6)
+
+
+def decompress_payload(blob: bytes | None) -> dict[str, Any]:
+    if not blob:
+        return {}
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+def build_payment_log(payment: Payment, event_type: str, payload: dict[str, Any]) -> PaymentLog:
+    return PaymentLog(
+        payment=payment,
+        event_type=event_type,
+        payload_json={},
+        payload_compressed=compress_payload(payload),
+    )
+
+
+def _row_payload(compressed: bytes | None, legacy: dict[str, Any] | None) -> dict[str, Any]:
+    if compressed:
+        return decompress_payload(compressed)
+    return dict(legacy or {})
+
+
+def _row_blob(compressed: bytes | None, legacy: dict[str, Any] | None) -> bytes:
+    if compressed:
+        return compressed
+    return compress_payload(legacy or {})
+
+
+def _iso(value: datetime | None) -> str | None:
+    return value.isoformat() if value else None
+
+
+def archive_payment_logs(
+    db: Session,
+    *,
+    older_than_days: int,
+    mode: str = ARCHIVE_MODE_TABLE,
+    output_dir: Path | None = None,
+    batch_size: int = 1000,
+) -> int:
+    """Move payment logs older than the cutoff out of the hot table; returns moved row count."""
+    if mode not in {ARCHIVE_MODE_TABLE, ARCHIVE_MODE_JSONL}:
+        raise ValueError(f"Unknown archive mode: {mode}")
+    if mode == ARCHIVE_MODE_JSONL and output_dir is None:
+        raise ValueError("output_dir is required for jsonl archives")
+
+    # created_at is written by the database clock (MySQL NOW() is server local time, SQLite's is UTC),
+    # so the cutoff comes from the same clock.
+    now = db.scalar(select(func.now()))
+    cutoff = now - timedelta(days=max(older_than_days, 0))
+    batch_size = max(batch_size, 1)
+
+    archive_file = None
+    if mode == ARCHIVE_MODE_JSONL:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        archive_path = output_dir / f"payment_logs_{now:%Y%m%d_%H%M%S}.jsonl.gz"
+        archive_file = gzip.open(archive_path, "at", encoding="utf-8")
+
+    moved = 0
+    try:
+        while True:
+            rows = db.execute(
+                select(
+                    PaymentLog.id,
+                    PaymentLog.payment_id,
+                    PaymentLog.event_type,
+                    PaymentLog.payload_json,
+                    PaymentLog.payload_compressed,
+                    PaymentLog.created_at,
+                )
+                .where(PaymentLog.created_at < cutoff)
+                .order_by(PaymentLog.id.asc())
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+
+            if archive_file is not None:
+                for row in rows:
+                    record = {
+                        "id": row.id,
+                        "payment_id": row.payment_id,
+                        "event_type": row.event_type,
+                        "created_at": _iso(row.created_at),
+                        "payload": _row_payload(row.payload_compressed, row.payload_json),
+                    }
+                    archive_file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+                archive_file.flush()
+            else:
+                db.execute(
+                    insert(PaymentLogArchive),
+                    [
+                        {
+                            "id": row.id,
+                            "payment_id": row.payment_id,
+                            "event_type": row.event_type,
+                            "payload_compressed": _row_blob(row.payload_compressed, row.payload_json),
+                            "created_at": row.created_at,
+                            "archived_at": now,
+                        }
+                        for row in rows
+                    ],
+                )
+
+            db.execute(delete(PaymentLog).where(PaymentLog.id.in_([row.id for row in rows])))
+            db.commit()
+            moved += len(rows)
+            if len(rows) < batch_size:
+                break
+    finally:
+        if archive_file is not None:
+            archive_file.close()
+
+    return moved
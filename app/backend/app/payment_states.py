@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+PAYMENT_STATUS_PENDING = "pending"
+PAYMENT_STATUS_WAITING_FOR_CAPTURE = "waiting_for_capture"
+PAYMENT_STATUS_SUCCEEDED = "succeeded"
+PAYMENT_STATUS_CANCELED = "canceled"
+
+TERMINAL_PAYMENT_STATUSES = frozenset({PAYMENT_STATUS_SUCCEEDED, PAYMENT_STATUS_CANCELED})
+
+# Higher rank = further along the YooKassa lifecycle; terminal states share the top rank.
+PAYMENT_STATUS_RANK: dict[str, int] = {
+    PAYMENT_STATUS_PENDING: 0,
+    PAYMENT_STATUS_WAITING_FOR_CAPTURE: 1,
+    PAYMENT_STATUS_SUCCEEDED: 2,
+    PAYMENT_STATUS_CANCELED: 2,
+}
+
+ALLOWED_PAYMENT_TRANSITIONS: dict[str, frozenset[str]] = {
+    PAYMENT_STATUS_PENDING: frozenset(
+        {PAYMENT_STATUS_WAITING_FOR_CAPTURE, PAYMENT_STATUS_SUCCEEDED, PAYMENT_STATUS_CANCELED}
+    ),
+    PAYMENT_STATUS_WAITING_FOR_CAPTURE: frozenset({PAYMENT_STATUS_SUCCEEDED, PAYMENT_STATUS_CANCELED}),
+    PAYMENT_STATUS_SUCCEEDED: frozenset(),
+    PAYMENT_STATUS_CANCELED: frozenset(),
+}
+
+TRANSITION_APPLY = "apply"
+TRANSITION_DUPLICATE = "duplicate"
+TRANSITION_STALE = "stale"
+
+
+def normalize_payment_status(status: str | None) -> str:
+    value = (status or "").strip().lower()
+    if value == "cancelled":
+        return PAYMENT_STATUS_CANCELED
+    return value
+
+
+def is_terminal_payment_status(status: str | None) -> bool:
+    return normalize_payment_status(status) in TERMINAL_PAYMENT_STATUSES
+
+
+def classify_payment_transition(current_status: str | None, new_status: str | None) -> str:
+    current = normalize_payment_status(current_status)
+    new = normalize_payment_status(new_status)
+
+    if new == current:
+        return TRANSITION_DUPLICATE
+    if current not in ALLOWED_PAYMENT_TRANSITIONS:
+        # Unknown stored status (legacy rows): accept any known provider state.
+        return TRANSITION_APPLY if new in PAYMENT_STATUS_RANK else TRANSITION_STALE
+    if new in ALLOWED_PAYMENT_TRANSITIONS[current]:
+        return TRANSITION_APPLY
+    if new not in PAYMENT_STATUS_RANK and current not in TERMINAL_PAYMENT_STATUSES:
+        return TRANSITION_APPLY
+    return TRANSITION_STALE
+
+
+def booking_state_for_payment(status: str) -> tuple[str, str]:
+    """Map a payment status to the (booking.status, booking.payment_status) pair it implies."""
+    normalized = normalize_payment_status(status)
+    if normalized == PAYMENT_STATUS_SUCCEEDED:
+        return "confirmed", "paid"
+    if normalized == PAYMENT_STATUS_CANCELED:
+        return "cancelled", "failed"
+    return "waiting_payment", normalized
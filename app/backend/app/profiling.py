@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import functools
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from fastapi import HTTPException
+from fastapi.routing import APIRoute
+from fastapi.security import HTTPAuthorizationCredentials
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+from .db import SessionLocal
+from .deps import get_current_admin
+from .metrics import route_template
+from .query_stats import current_query_stats
+
+PROFILE_QUERY_FLAG = b"_profile=1"
+PROFILE_ID_HEADER = "X-Profile-Id"
+CALL_TREE_MAX_DEPTH = 30
+CALL_TREE_MIN_SHARE = 0.01
+TOP_FUNCTIONS = 40
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProfileSession:
+    """Everything recorded for one flagged request."""
+
+    loop_profile: cProfile.Profile = field(default_factory=cProfile.Profile)
+    worker_profiles: list[cProfile.Profile] = field(default_factory=list)
+    endpoint_seconds: float = 0.0
+    endpoint_finished_at: float | None = None
+    response_started_at: float | None = None
+
+    def run_sync_endpoint(self, call: Callable[..., Any], kwargs: dict[str, Any]) -> Any:
+        # Sync endpoints run in a worker thread the loop-thread profiler cannot see.
+        profile = cProfile.Profile()
+        self.worker_profiles.append(profile)
+        started = time.perf_counter()
+        try:
+            return profile.runcall(call, **kwargs)
+        finally:
+            self.endpoint_finished(started)
+
+    def endpoint_finished(self, started: float) -> None:
+        self.endpoint_finished_at = time.perf_counter()
+        self.endpoint_seconds += self.endpoint_finished_at - started
+
+
+_current_session: ContextVar[ProfileSession | None] = ContextVar("profile_session", default=None)
+# cProfile allows one active profiler per thread, and every flagged request profiles the loop thread.
+_loop_profile_lock = threading.Lock()
+
+
+def _profiled_endpoint(call: Callable[..., Any]) -> Callable[..., Any]:
+    if asyncio.iscoroutinefunction(call):
+
+        @functools.wraps(call)
+        async def async_endpoint(**kwargs: Any) -> Any:
+            session = _current_session.get()
+            if session is None:
+                return await call(**kwargs)
+            started = time.perf_counter()
+            try:
+                return await call(**kwargs)
+            finally:
+                session.endpoint_finished(started)
+
+        return async_endpoint
+
+    @functools.wraps(call)
+    def sync_endpoint(**kwargs: Any) -> Any:
+        session = _current_session.get()
+        if session is None:
+            return call(**kwargs)
+        return session.run_sync_endpoint(call, kwargs)
+
+    return sync_endpoint
+
+
+class ProfiledRoute(APIRoute):
+    """APIRoute whose endpoint reports its own time and thread to a flagged request's profiler.
+
+    With PROFILING_ENABLED off the endpoint is left untouched.
+    """
+
+    def get_route_handler(self) -> Callable:
+        if settings.profiling_enabled and self.dependant.call is not None:
+            self.dependant.call = _profiled_endpoint(self.dependant.call)
+        return super().get_route_handler()
+
+
+def _profiling_dir() -> Path:
+    return Path(settings.profiling_dir)
+
+
+def _is_flagged(scope: Scope) -> bool:
+    query_string = scope.get("query_string", b"")
+    if PROFILE_QUERY_FLAG in query_string and PROFILE_QUERY_FLAG in query_string.split(b"&"):
+        return True
+    return any(name == b"x-profile" and value == b"1" for name, value in scope["headers"])
+
+
+def _is_admin(headers: Headers) -> bool:
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    credentials = (
+        HTTPAuthorizationCredentials(scheme=scheme, credentials=token.strip())
+        if scheme.lower() == "bearer" and token.strip()
+        else None
+    )
+    db = SessionLocal()
+    try:
+        principal = get_current_admin(credentials=credentials, x_admin_token=headers.get("x-admin-token"), db=db)
+    except HTTPException:
+        return False
+    finally:
+        db.close()
+    return principal.role.lower() == "admin"
+
+
+def _call_tree(stats: pstats.Stats, total: float) -> list[str]:
+    """Indented inclusive-time tree rebuilt from pstats caller edges; branches under 1% are dropped."""
+    children: dict[tuple, list[tuple[tuple, float, int]]] = {}
+    roots: list[tuple[tuple, float]] = []
+    for function, (_, calls, _, cumulative, callers) in stats.stats.items():
+        if not callers:
+            roots.append((function, cumulative))
+        for caller, (_, caller_calls, _, caller_cumulative) in callers.items():
+            children.setdefault(caller, []).append((function, caller_cumulative, caller_calls))
+
+    threshold = total * CALL_TREE_MIN_SHARE
+    lines: list[str] = []
+
+    def walk(function: tuple, cumulative: float, calls: int, depth: int, path: frozenset) -> None:
+        filename, line, name = function
+        lines.append(f"{'  ' * depth}{cumulative * 1000:9.2f}ms {calls:>6}x  {name}  {filename}:{line}")
+        if depth >= CALL_TREE_MAX_DEPTH:
+            return
+        for child, child_cumulative, child_calls in sorted(children.get(function, []), key=lambda item: -item[1]):
+            if child_cumulative >= threshold and child not in path:
+                walk(child, child_cumulative, child_calls, depth + 1, path | {child})
+
+    for function, cumulative in sorted(roots, key=lambda item: -item[1]):
+        if cumulative >= threshold:
+            walk(function, cumulative, stats.stats[function][1], 0, frozenset({function}))
+    return lines
+
+
+def _top_functions(stats: pstats.Stats) -> list[dict[str, Any]]:
+    rows = sorted(stats.stats.items(), key=lambda item: -item[1][2])[:TOP_FUNCTIONS]
+    return [
+        {
+            "function": f"{name}  {filename}:{line}",
+            "calls": calls,
+            "own_ms": round(own * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3),
+        }
+        for (filename, line, name), (_, calls, own, cumulative, _) in rows
+    ]
+
+
+def _prune_reports(directory: Path) -> None:
+    reports = sorted(directory.glob("*.json"), key=lambda path: path.stat().st_mtime, reverse=True)
+    for stale in reports[max(settings.profiling_max_reports, 1):]:
+        stale.unlink(missing_ok=True)
+        stale.with_suffix(".prof").unlink(missing_ok=True)
+
+
+def store_report(summary: dict[str, Any], session: ProfileSession) -> None:
+    stats = pstats.Stats(session.loop_profile, stream=io.StringIO())
+    for profile in session.worker_profiles:
+        stats.add(profile)
+    report = {
+        **summary,
+        "top_functions": _top_functions(stats),
+        "call_tree": _call_tree(stats, summary["total_ms"] / 1000),
+    }
+    directory = _profiling_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    stats.dump_stats(str(directory / f"{summary['id']}.prof"))
+    temporary = directory / f".{summary['id']}.json.tmp"
+    temporary.write_text(json.dumps(report, ensure_ascii=False), encoding="utf-8")
+    os.replace(temporary, directory / f"{summary['id']}.json")
+    _prune_reports(directory)
+
+
+def list_reports() -> list[dict[str, Any]]:
+    directory = _profiling_dir()
+    if not directory.is_dir():
+        return []
+    summaries = []
+    for path in directory.glob("*.json"):
+        try:
+            report = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        report.pop("top_functions", None)
+        report.pop("call_tree", None)
+        summaries.append(report)
+    return sorted(summaries, key=lambda item: item["created_at"], reverse=True)
+
+
+def report_path(report_id: str, suffix: str) -> Path | None:
+    if not report_id.isalnum():
+        return None
+    path = _profiling_dir() / f"{report_id}{suffix}"
+    return path if path.is_file() else None
+
+
+class ProfilingMiddleware:
+    """Runs a request under cProfile when an admin sends `X-Profile: 1` or `?_profile=1`.
+
+    The report (call tree, hottest functions, SQL and serialization time) is written to PROFILING_DIR
+    and its id returned in X-Profile-Id. Unflagged requests only pay for the flag lookup. Async code
+    of other requests that runs on the loop while a flagged request is in flight shows up in its tree.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _is_flagged(scope):
+            await self.app(scope, receive, send)
+            return
+        if not await run_in_threadpool(_is_admin, Headers(scope=scope)):
+            await self.app(scope, receive, send)
+            return
+        if not _loop_profile_lock.acquire(blocking=False):
+            logger.info("Profiling skipped for %s %s: another profile is running", scope["method"], scope["path"])
+            await self.app(scope, receive, send)
+            return
+
+        report_id = uuid.uuid4().hex[:16]
+        session = ProfileSession()
+        status = 500
+        stats = current_query_stats()
+        queries_before, sql_before = (stats.count, stats.seconds) if stats else (0, 0.0)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                session.response_started_at = time.perf_counter()
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", report_id.encode("latin-1"))]
+            await send(message)
+
+        token = _current_session.set(session)
+        started = time.perf_counter()
+        try:
+            session.loop_profile.enable()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                session.loop_profile.disable()
+        finally:
+            _current_session.reset(token)
+            _loop_profile_lock.release()
+            total = time.perf_counter() - started
+
+        serialization = (
+            session.response_started_at - session.endpoint_finished_at
+            if session.response_started_at and session.endpoint_finished_at
+            else 0.0
+        )
+        summary = {
+            "id": report_id,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "pid": os.getpid(),
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": route_template(scope),
+            "query_string": scope.get("query_string", b"").decode("latin-1"),
+            "status": status,
+            "total_ms": round(total * 1000, 3),
+            "endpoint_ms": round(session.endpoint_seconds * 1000, 3),
+            "serialization_ms": round(serialization * 1000, 3),
+            "sql_queries": (stats.count - queries_before) if stats else 0,
+            "sql_ms": round(((stats.seconds - sql_before) if stats else 0.0) * 1000, 3),
+        }
+        try:
+            await run_in_threadpool(store_report, summary, session)
+        except Exception:
+            logger.exception("Failed to store profile %s", report_id)
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import Counter
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+from .metrics import registry, route_template
+
+MAX_LOGGED_PARAMS = 500
+BUDGET_ATTRIBUTE = "__query_budget__"
+
+logger = logging.getLogger(__name__)
+
+Endpoint = TypeVar("Endpoint", bound=Callable[..., Any])
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    seconds: float = 0.0
+    statements: Counter[str] = field(default_factory=Counter)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Identical statements issued at least `threshold` times: the usual shape of an N+1 loop."""
+        return [(statement, times) for statement, times in self.statements.most_common() if times >= threshold]
+
+
+# The middleware installs a fresh object per request; sync routes see it too, because the threadpool
+# runs them in a copy of the request context that still points at the same QueryStats.
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> QueryStats | None:
+    return _current_stats.get()
+
+
+def query_budget(limit: int) -> Callable[[Endpoint], Endpoint]:
+    """Declare the most queries a route may issue per request (checked by QueryStatsMiddleware)."""
+
+    def decorator(endpoint: Endpoint) -> Endpoint:
+        setattr(endpoint, BUDGET_ATTRIBUTE, limit)
+        return endpoint
+
+    return decorator
+
+
+def _short_params(parameters: Any) -> str:
+    text = repr(parameters)
+    return text if len(text) <= MAX_LOGGED_PARAMS else f"{text[:MAX_LOGGED_PARAMS]}..."
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info["query_started_at"].pop()
+    elapsed = time.perf_counter() - started
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+        stats.statements[statement] += 1
+    if settings.sql_slow_query_ms > 0 and elapsed * 1000 >= settings.sql_slow_query_ms:
+        logger.warning("Slow query (%.1f ms): %s; params=%s", elapsed * 1000, statement, _short_params(parameters))
+
+
+@event.listens_for(Engine, "handle_error")
+def _drop_query_timer(exception_context) -> None:
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started_at"):
+        connection.info["query_started_at"].pop()
+
+
+class QueryStatsMiddleware:
+    """Per-request query count and DB time: a Server-Timing header, metrics, N+1 warnings and budget checks.
+
+    With SQL_QUERY_BUDGET_ASSERT on (test runs) a route over its budget raises QueryBudgetExceeded
+    after the response is sent, which fails the test client call; otherwise it is only logged.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                timing = f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries"'
+                message["headers"] = [*message.get("headers", []), (b"server-timing", timing.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
+        self._report(scope, stats)
+
+    def _report(self, scope: Scope, stats: QueryStats) -> None:
+        route = route_template(scope)
+        registry.inc("db_queries_total", {"route": route}, stats.count)
+        if stats.count:
+            registry.observe("db_request_duration_seconds", {"route": route}, stats.seconds)
+
+        threshold = settings.sql_n_plus_one_threshold
+        if threshold > 0:
+            for statement, times in stats.repeated(threshold):
+                logger.warning("Possible N+1 in %s %s: %d x %s", scope["method"], route, times, statement)
+
+        budget = getattr(scope.get("endpoint"), BUDGET_ATTRIBUTE, None) or settings.sql_default_query_budget
+        if budget > 0 and stats.count > budget:
+            message = f"{scope['method']} {route} issued {stats.count} queries, budget is {budget}"
+            if settings.sql_query_budget_assert:
+                raise QueryBudgetExceeded(message)
+            logger.warning("Query budget exceeded: %s", message)
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .config import settings
+from .login_throttle import client_ip
+
+# Buckets idle this long are full again and can be dropped.
+IDLE_BUCKET_SECONDS = 24 * 3600
+CLEANUP_EVERY_TAKES = 1000
+SQLITE_BUSY_TIMEOUT_SECONDS = 0.05
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RatePolicy:
+    """Token bucket: `burst` requests at once, refilled at `per_hour` requests per hour."""
+
+    name: str
+    burst: int
+    per_hour: int
+
+    @property
+    def refill_per_second(self) -> float:
+        return max(self.per_hour, 1) / 3600
+
+
+CONTACTS_POLICY = RatePolicy(
+    "contacts", burst=settings.rate_limit_contacts_burst, per_hour=settings.rate_limit_contacts_per_hour
+)
+BOOKINGS_POLICY = RatePolicy(
+    "bookings", burst=settings.rate_limit_bookings_burst, per_hour=settings.rate_limit_bookings_per_hour
+)
+CERTIFICATES_POLICY = RatePolicy(
+    "certificates", burst=settings.rate_limit_certificates_burst, per_hour=settings.rate_limit_certificates_per_hour
+)
+
+# Aliases of one form share a policy name and therefore one bucket per client.
+RATE_LIMIT_POLICIES: dict[tuple[str, str], RatePolicy] = {
+    ("POST", "/api/contacts"): CONTACTS_POLICY,
+    ("POST", "/api/submit_contact.php"): CONTACTS_POLICY,
+    ("POST", "/api/bookings"): BOOKINGS_POLICY,
+    ("POST", "/api/certificate-purchase"): CERTIFICATES_POLICY,
+    ("POST", "/api/certificate-purchase/"): CERTIFICATES_POLICY,
+    ("POST", "/api/certificates/purchase"): CERTIFICATES_POLICY,
+    ("POST", "/api/certificates/purchase/"): CERTIFICATES_POLICY,
+}
+
+
+def _refill(tokens: float, updated: float, now: float, policy: RatePolicy) -> float:
+    return min(float(max(policy.burst, 1)), tokens + max(now - updated, 0.0) * policy.refill_per_second)
+
+
+def _spend(tokens: float, policy: RatePolicy) -> tuple[float, float]:
+    """Returns (tokens left, seconds to wait); zero wait means the request is allowed."""
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / policy.refill_per_second
+
+
+class MemoryBucketStore:
+    """Per-process buckets; for development and single-worker runs."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    def take(self, key: str, policy: RatePolicy) -> float:
+        now = time.time()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (float(max(policy.burst, 1)), now))
+            tokens, wait = _spend(_refill(tokens, updated, now, policy), policy)
+            self._buckets[key] = (tokens, now)
+        return wait
+
+    async def take_async(self, key: str, policy: RatePolicy) -> float:
+        return self.take(key, policy)
+
+
+class SqliteBucketStore:
+    """Buckets in a local SQLite file, so every worker process on the host draws from the same counters.
+
+    Kept apart from the application database: a rejected request never touches MySQL.
+    """
+
+    def __init__(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._takes = 0
+        # Takes are serialized by the lock anyway; one thread keeps a busy file off the event loop.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rate-limit")
+        self._connection = sqlite3.connect(
+            path,
+            timeout=SQLITE_BUSY_TIMEOUT_SECONDS,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # Losing a few counter updates on power loss is fine; an fsync per request is not.
+        self._connection.execute("PRAGMA synchronous=OFF")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def take(self, key: str, policy: RatePolicy) -> float:
+        now = time.time()
+        with self._lock:
+            connection = self._connection
+            try:
+                connection.execute("BEGIN IMMEDIATE")
+                try:
+                    row = connection.execute("SELECT tokens, updated FROM rate_buckets WHERE key = ?", (key,)).fetchone()
+                    tokens = _refill(row[0], row[1], now, policy) if row else float(max(policy.burst, 1))
+                    tokens, wait = _spend(tokens, policy)
+                    connection.execute(
+                        "INSERT INTO rate_buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                        "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                        (key, tokens, now),
+                    )
+                    self._takes += 1
+                    if self._takes % CLEANUP_EVERY_TAKES == 0:
+                        connection.execute("DELETE FROM rate_buckets WHERE updated < ?", (now - IDLE_BUCKET_SECONDS,))
+                    connection.execute("COMMIT")
+                except BaseException:
+                    connection.execute("ROLLBACK")
+                    raise
+            except sqlite3.Error:
+                # Fail open: a stuck limiter file must not take the public forms down with it.
+                logger.exception("Rate limit store unavailable")
+                return 0.0
+        return wait
+
+    async def take_async(self, key: str, policy: RatePolicy) -> float:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.take, key, policy)
+
+
+def build_bucket_store() -> MemoryBucketStore | SqliteBucketStore:
+    if settings.rate_limit_store == "memory":
+        return MemoryBucketStore()
+    return SqliteBucketStore(settings.rate_limit_db_path)
+
+
+class RateLimitMiddleware:
+    """Rejects over-limit requests to policy routes with 429 before routing, validation or any DB work."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        store: MemoryBucketStore | SqliteBucketStore | None = None,
+        policies: dict[tuple[str, str], RatePolicy] | None = None,
+    ) -> None:
+        self.app = app
+        self.store = store or build_bucket_store()
+        self.policies = RATE_LIMIT_POLICIES if policies is None else policies
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            policy = self.policies.get((scope["method"], scope["path"]))
+            if policy is not None:
+                key = f"{policy.name}:{client_ip(Request(scope))}"
+                wait = await self.store.take_async(key, policy)
+                if wait > 0:
+                    response = JSONResponse(
+                        {"detail": "Слишком много запросов. Попробуйте немного позже."},
+                        status_code=429,
+                        headers={"Retry-After": str(max(math.ceil(wait), 1))},
+                    )
+                    await response(scope, receive, send)
+                    return
+        await self.app(scope, receive, send)
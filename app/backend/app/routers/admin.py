@@ -1,27 +1,41 @@
 from __future__ import annotations
 
 import secrets
-from datetime import datetime
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
-from fastapi.responses import JSONResponse
-from sqlalchemy import func, or_, select
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session, contains_eager, joinedload, selectinload
 
+from ..analytics import ANALYTICS_GROUP_PATTERN, refresh_daily_stats, summarize_daily_stats
 from ..certificates import (
     VALIDITY_MODE_CUSTOM_DAYS,
     calculate_certificate_expires_at,
     normalize_certificate_validity,
 )
 from ..config import settings
+from ..db_upsert import upsert_rows
 from ..deps import get_db_session, require_admin
-from ..models import Booking, Contact, GalleryItem, GiftCertificate, ScheduleEvent, Service, Setting
+from ..domain_events import sse_stream
+from ..exports import EXPORT_FORMAT_CSV, EXPORT_FORMAT_PATTERN, ExportColumn, export_response
+from ..models import Booking, Contact, GalleryItem, GiftCertificate, Payment, ScheduleEvent, Service, Setting
+from ..pagination import PageParams, SortKey, get_page_params, keyset_paginate, sorted_query
+from ..profiling import ProfiledRoute
+from ..query_stats import query_budget
+from ..search_index import search_clause
 from ..schemas import (
+    AnalyticsResponse,
+    AnalyticsRow,
+    AdminBulkIds,
+    AdminBulkResult,
     AdminDashboardStatsResponse,
+    BookingAdminBulkStatusUpdate,
     BookingAdminResponse,
     BookingAdminStatusUpdate,
+    ContactAdminBulkStatusUpdate,
     ContactAdminResponse,
     ContactAdminStatusUpdate,
     GiftCertificateAdminResponse,
@@ -32,6 +46,11 @@ from ..schemas import (
     ScheduleAdminCreate,
     ScheduleAdminResponse,
     ScheduleAdminUpdate,
+    ScheduleBulkResult,
+    ScheduleConflictItem,
+    ScheduleCopyRequest,
+    SchedulePlannedEvent,
+    ScheduleRecurrenceCreate,
     ServiceAdminCreate,
     ServiceAdminResponse,
     ServiceAdminUpdate,
@@ -39,8 +58,27 @@ from ..schemas import (
     SettingBulkUpdate,
     SettingUpdateItem,
 )
+from ..services.schedule_conflicts import (
+    ScheduleConflict,
+    ScheduleSlot,
+    find_conflicts,
+    load_slots,
+    service_resources,
+    sweep_conflicts,
+    wall_clock,
+)
+from ..services.schedule_rules import (
+    PlannedEvent,
+    drop_existing,
+    expand_recurrence,
+    insert_planned_events,
+    localize,
+    shift_events,
+    window_events,
+)
+from ..services.seats import apply_seat_deltas, release_seats, reserve_seats
 
-router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)], route_class=ProfiledRoute)
 
 
 def _resolve_media_root(raw_path: str) -> Path | None:
@@ -88,7 +126,39 @@ def _serialize_booking(row: Booking) -> BookingAdminResponse:
     )
 
 
+def _seat_delta(old_status: str, new_status: str) -> int:
+    if old_status != "confirmed" and new_status == "confirmed":
+        return 1
+    if old_status == "confirmed" and new_status != "confirmed":
+        return -1
+    return 0
+
+
+def _set_booking_status(row: Booking, new_status: str) -> None:
+    row.status = new_status
+    if new_status == "confirmed" and row.payment_status in {"pending", "waiting_payment"}:
+        row.payment_status = "paid"
+    if new_status == "cancelled" and row.payment_status != "paid":
+        row.payment_status = "failed"
+
+
+def _load_bookings(db: Session, ids: list[int], *, with_event: bool = False, refresh: bool = False) -> list[Booking]:
+    unique_ids = sorted(set(ids))
+    query = select(Booking).where(Booking.id.in_(unique_ids)).order_by(Booking.id.asc())
+    if with_event:
+        query = query.options(joinedload(Booking.schedule_event).joinedload(ScheduleEvent.service))
+    if refresh:
+        query = query.execution_options(populate_existing=True)
+    rows = list(db.scalars(query).all())
+    if len(rows) != len(unique_ids):
+        found = {row.id for row in rows}
+        missing = ", ".join(str(item) for item in unique_ids if item not in found)
+        raise HTTPException(status_code=404, detail=f"Бронирования не найдены: {missing}.")
+    return rows
+
+
 @router.get("/dashboard", response_model=AdminDashboardStatsResponse)
+@query_budget(7)
 def admin_dashboard_stats(db: Session = Depends(get_db_session)) -> AdminDashboardStatsResponse:
     return AdminDashboardStatsResponse(
         services=int(db.scalar(select(func.count(Service.id))) or 0),
@@ -102,6 +172,47 @@ def admin_dashboard_stats(db: Session = Depends(get_db_session)) -> AdminDashboa
     )
 
 
+@router.get("/events", response_model=None)
+async def admin_events_stream(
+    request: Request,
+    last_event_id: int | None = Query(default=None, ge=0),
+    last_event_id_header: str | None = Header(default=None, alias="Last-Event-ID"),
+) -> StreamingResponse:
+    if last_event_id is None and last_event_id_header and last_event_id_header.strip().isdigit():
+        last_event_id = int(last_event_id_header.strip())
+    return StreamingResponse(
+        sse_stream(request, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/analytics", response_model=AnalyticsResponse)
+def admin_analytics(
+    date_from: date | None = None,
+    date_to: date | None = None,
+    group_by: str = Query(default="month", pattern=ANALYTICS_GROUP_PATTERN),
+    service_id: int | None = None,
+    db: Session = Depends(get_db_session),
+) -> AnalyticsResponse:
+    today = wall_clock(datetime.now(timezone.utc)).date()
+    date_to = date_to or today + timedelta(days=60)
+    date_from = date_from or (date_to - timedelta(days=365)).replace(day=1)
+    if date_to < date_from:
+        raise HTTPException(status_code=422, detail="Дата окончания раньше даты начала.")
+    if (date_to - date_from).days > 3 * 366:
+        raise HTTPException(status_code=422, detail="Период аналитики не может превышать три года.")
+
+    rows, totals = summarize_daily_stats(db, date_from, date_to, group_by=group_by, service_id=service_id)
+    return AnalyticsResponse(
+        date_from=date_from,
+        date_to=date_to,
+        group_by=group_by,
+        rows=[AnalyticsRow(**row) for row in rows],
+        totals=AnalyticsRow(**totals),
+    )
+
+
 def _admin_services_payload(db: Session) -> list[dict[str, Any]]:
     rows = db.scalars(select(Service).order_by(Service.id.asc())).all()
     return [_service_to_admin(row).model_dump(mode="json") for row in rows]
@@ -163,12 +274,18 @@ def admin_delete_service(service_id: int, db: Session = Depends(get_db_session))
 
 
 @router.get("/schedule", response_model=list[ScheduleAdminResponse])
-def admin_list_schedule(db: Session = Depends(get_db_session)) -> list[ScheduleAdminResponse]:
-    rows = db.scalars(
-        select(ScheduleEvent)
-        .options(joinedload(ScheduleEvent.service))
-        .order_by(ScheduleEvent.start_time.asc())
-    ).all()
+def admin_list_schedule(
+    response: Response,
+    page: PageParams = Depends(get_page_params),
+    db: Session = Depends(get_db_session),
+) -> list[ScheduleAdminResponse]:
+    rows = keyset_paginate(
+        db,
+        select(ScheduleEvent).options(joinedload(ScheduleEvent.service)),
+        sort_keys=[SortKey(ScheduleEvent.start_time), SortKey(ScheduleEvent.id)],
+        page=page,
+        response=response,
+    )
     result: list[ScheduleAdminResponse] = []
     for item in rows:
         result.append(
@@ -191,10 +308,16 @@ def admin_list_schedule(db: Session = Depends(get_db_session)) -> list[ScheduleA
 
 
 @router.post("/schedule", response_model=ScheduleAdminResponse)
-def admin_create_schedule(payload: ScheduleAdminCreate, db: Session = Depends(get_db_session)) -> ScheduleAdminResponse:
+def admin_create_schedule(
+    payload: ScheduleAdminCreate,
+    allow_conflicts: bool = False,
+    db: Session = Depends(get_db_session),
+) -> ScheduleAdminResponse:
     service = db.get(Service, payload.service_id)
     if not service:
         raise HTTPException(status_code=404, detail="Услуга не найдена.")
+    if payload.is_active and not allow_conflicts:
+        _ensure_no_conflicts(db, [_candidate_slot(None, payload.service_id, payload.start_time, payload.end_time, service)])
     row = ScheduleEvent(**payload.model_dump())
     db.add(row)
     db.commit()
@@ -215,10 +338,168 @@ def admin_create_schedule(payload: ScheduleAdminCreate, db: Session = Depends(ge
     )
 
 
+def _candidate_slot(
+    event_id: int | None,
+    service_id: int,
+    start_time: datetime,
+    end_time: datetime,
+    service: Service,
+) -> ScheduleSlot:
+    return ScheduleSlot(
+        event_id=event_id,
+        service_id=service_id,
+        start=wall_clock(start_time),
+        end=wall_clock(end_time),
+        resources=service_resources(service),
+    )
+
+
+def _conflict_item(conflict: ScheduleConflict) -> ScheduleConflictItem:
+    return ScheduleConflictItem(
+        resource=conflict.resource,
+        event_id=conflict.slot.event_id,
+        service_id=conflict.slot.service_id,
+        start_time=conflict.slot.start,
+        end_time=conflict.slot.end,
+        conflicting_event_id=conflict.other.event_id,
+        conflicting_service_id=conflict.other.service_id,
+        conflicting_start_time=conflict.other.start,
+        conflicting_end_time=conflict.other.end,
+    )
+
+
+def _conflict_detail(conflicts: list[ScheduleConflict], limit: int = 5) -> str:
+    # One entry per clashing event, listing every shared resource (host and hall usually clash together).
+    grouped: dict[tuple[ScheduleSlot, ScheduleSlot], list[str]] = {}
+    for conflict in conflicts:
+        kind, _, name = conflict.resource.partition(":")
+        label = f"ведущий {name}" if kind == "host" else f"зал {name}"
+        grouped.setdefault((conflict.slot, conflict.other), []).append(label)
+
+    parts: list[str] = []
+    for (slot, other), labels in list(grouped.items())[:limit]:
+        reference = f"событием #{other.event_id}" if other.event_id else "другим событием серии"
+        parts.append(f"{slot.start:%d.%m %H:%M} с {reference} {other.start:%d.%m %H:%M}–{other.end:%H:%M} ({', '.join(labels)})")
+    more = f" и еще {len(grouped) - limit}" if len(grouped) > limit else ""
+    return "Пересечение в расписании: " + "; ".join(parts) + more + "."
+
+
+def _ensure_no_conflicts(db: Session, candidates: list[ScheduleSlot]) -> None:
+    conflicts = find_conflicts(db, candidates)
+    if conflicts:
+        raise HTTPException(status_code=409, detail=_conflict_detail(conflicts))
+
+
+def _bulk_schedule_result(
+    db: Session,
+    planned: list[PlannedEvent],
+    *,
+    dry_run: bool,
+    allow_conflicts: bool,
+) -> ScheduleBulkResult:
+    fresh = drop_existing(db, planned)
+    if len(fresh) > settings.schedule_bulk_max_events:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Слишком много событий за один раз: {len(fresh)} (максимум {settings.schedule_bulk_max_events}).",
+        )
+
+    services = {
+        service.id: service
+        for service in db.scalars(select(Service).where(Service.id.in_({item.service_id for item in fresh}))).all()
+    }
+    candidates = [
+        _candidate_slot(None, item.service_id, item.start_time, item.end_time, services[item.service_id])
+        for item in fresh
+        if item.is_active and item.service_id in services
+    ]
+    conflicts = find_conflicts(db, candidates)
+    if conflicts and not dry_run and not allow_conflicts:
+        raise HTTPException(status_code=409, detail=_conflict_detail(conflicts))
+
+    if not dry_run:
+        insert_planned_events(db, fresh)
+        # Bulk insert bypasses the flush hook that maintains the analytics rollup.
+        refresh_daily_stats(db, {(item.service_id, wall_clock(item.start_time).date()) for item in fresh})
+        db.commit()
+    return ScheduleBulkResult(
+        dry_run=dry_run,
+        created=0 if dry_run else len(fresh),
+        skipped_existing=len(planned) - len(fresh),
+        events=[
+            SchedulePlannedEvent(service_id=item.service_id, start_time=item.start_time, end_time=item.end_time)
+            for item in fresh
+        ],
+        conflicts=[_conflict_item(conflict) for conflict in conflicts],
+    )
+
+
+@router.get("/schedule/conflicts", response_model=list[ScheduleConflictItem])
+def admin_schedule_conflicts(
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    db: Session = Depends(get_db_session),
+) -> list[ScheduleConflictItem]:
+    start = wall_clock(date_from) if date_from else wall_clock(datetime.now(timezone.utc))
+    end = wall_clock(date_to) if date_to else start + timedelta(days=90)
+    if end <= start:
+        raise HTTPException(status_code=422, detail="Дата окончания раньше даты начала.")
+    if end - start > timedelta(days=366):
+        raise HTTPException(status_code=422, detail="Период проверки не может превышать год.")
+    return [_conflict_item(conflict) for conflict in sweep_conflicts(load_slots(db, start, end))]
+
+
+@router.post("/schedule/generate", response_model=ScheduleBulkResult)
+def admin_generate_schedule(
+    payload: ScheduleRecurrenceCreate,
+    allow_conflicts: bool = False,
+    db: Session = Depends(get_db_session),
+) -> ScheduleBulkResult:
+    if not db.get(Service, payload.service_id):
+        raise HTTPException(status_code=404, detail="Услуга не найдена.")
+
+    slots = expand_recurrence(
+        frequency=payload.frequency,
+        weekdays=payload.weekdays,
+        time_slots=[(slot.start, slot.end) for slot in payload.time_slots],
+        date_from=payload.date_from,
+        date_to=payload.date_to,
+        exceptions=payload.exceptions,
+        tz_name=settings.schedule_timezone,
+    )
+    planned = [
+        PlannedEvent(
+            service_id=payload.service_id,
+            start_time=start,
+            end_time=end,
+            max_participants=payload.max_participants,
+            is_individual=payload.is_individual,
+            is_active=payload.is_active,
+        )
+        for start, end in slots
+    ]
+    return _bulk_schedule_result(db, planned, dry_run=payload.dry_run, allow_conflicts=allow_conflicts)
+
+
+@router.post("/schedule/copy", response_model=ScheduleBulkResult)
+def admin_copy_schedule(
+    payload: ScheduleCopyRequest,
+    allow_conflicts: bool = False,
+    db: Session = Depends(get_db_session),
+) -> ScheduleBulkResult:
+    zone = settings.schedule_timezone
+    window_start = localize(datetime.combine(payload.source_from, datetime.min.time()), zone)
+    window_end = localize(datetime.combine(payload.source_to + timedelta(days=1), datetime.min.time()), zone)
+    events = window_events(db, window_start, window_end, payload.service_id)
+    planned = shift_events(events, (payload.target_from - payload.source_from).days, zone)
+    return _bulk_schedule_result(db, planned, dry_run=payload.dry_run, allow_conflicts=allow_conflicts)
+
+
 @router.put("/schedule/{event_id}", response_model=ScheduleAdminResponse)
 def admin_update_schedule(
     event_id: int,
     payload: ScheduleAdminUpdate,
+    allow_conflicts: bool = False,
     db: Session = Depends(get_db_session),
 ) -> ScheduleAdminResponse:
     row = db.get(ScheduleEvent, event_id)
@@ -228,6 +509,8 @@ def admin_update_schedule(
     service = db.get(Service, payload.service_id)
     if not service:
         raise HTTPException(status_code=404, detail="Услуга не найдена.")
+    if payload.is_active and not allow_conflicts:
+        _ensure_no_conflicts(db, [_candidate_slot(row.id, payload.service_id, payload.start_time, payload.end_time, service)])
 
     for key, value in payload.model_dump().items():
         setattr(row, key, value)
@@ -260,8 +543,18 @@ def admin_delete_schedule(event_id: int, db: Session = Depends(get_db_session))
 
 
 @router.get("/gallery", response_model=list[GalleryAdminResponse])
-def admin_list_gallery(db: Session = Depends(get_db_session)) -> list[GalleryItem]:
-    return db.scalars(select(GalleryItem).order_by(GalleryItem.sort_order.asc(), GalleryItem.id.desc())).all()
+def admin_list_gallery(
+    response: Response,
+    page: PageParams = Depends(get_page_params),
+    db: Session = Depends(get_db_session),
+) -> list[GalleryItem]:
+    return keyset_paginate(
+        db,
+        select(GalleryItem),
+        sort_keys=[SortKey(GalleryItem.sort_order), SortKey(GalleryItem.id, descending=True)],
+        page=page,
+        response=response,
+    )
 
 
 @router.post("/gallery", response_model=GalleryAdminResponse)
@@ -295,21 +588,21 @@ def admin_delete_gallery(item_id: int, db: Session = Depends(get_db_session)) ->
     return {"ok": True}
 
 
-@router.get("/bookings", response_model=list[BookingAdminResponse])
-def admin_list_bookings(
-    status: str | None = None,
-    service_id: int | None = None,
-    search: str | None = None,
-    date_from: datetime | None = None,
-    date_to: datetime | None = None,
-    db: Session = Depends(get_db_session),
-) -> list[BookingAdminResponse]:
+def _bookings_query(
+    db: Session,
+    *,
+    status: str | None,
+    service_id: int | None,
+    search: str | None,
+    date_from: datetime | None,
+    date_to: datetime | None,
+):
+    # The filter joins double as the eager load, so each page is one SELECT without extra JOINs.
     query = (
         select(Booking)
         .join(ScheduleEvent, Booking.schedule_event_id == ScheduleEvent.id)
         .join(Service, ScheduleEvent.service_id == Service.id)
-        .options(joinedload(Booking.schedule_event).joinedload(ScheduleEvent.service))
-        .order_by(Booking.created_at.desc())
+        .options(contains_eager(Booking.schedule_event).contains_eager(ScheduleEvent.service))
     )
 
     if status:
@@ -317,25 +610,72 @@ def admin_list_bookings(
     if service_id:
         query = query.where(ScheduleEvent.service_id == service_id)
     if search:
-        like = f"%{search.strip()}%"
-        query = query.where(
-            or_(
-                Booking.name.ilike(like),
-                Booking.phone.ilike(like),
-                Booking.email.ilike(like),
-                Booking.payment_id.ilike(like),
-                Service.title.ilike(like),
-            )
-        )
+        query = query.where(search_clause(db, search, ("booking", Booking.id), ("service", ScheduleEvent.service_id)))
     if date_from:
-        query = query.where(ScheduleEvent.start_time >= date_from)
+        query = query.where(ScheduleEvent.start_time >= wall_clock(date_from))
     if date_to:
-        query = query.where(ScheduleEvent.start_time <= date_to)
+        query = query.where(ScheduleEvent.start_time <= wall_clock(date_to))
+    return query
+
+
+BOOKING_SORT_KEYS = [SortKey(Booking.created_at, descending=True), SortKey(Booking.id, descending=True)]
 
-    rows = db.scalars(query).all()
+BOOKING_EXPORT_COLUMNS = [
+    ExportColumn("ID", lambda row: row.id),
+    ExportColumn("Создано", lambda row: row.created_at),
+    ExportColumn("Услуга", lambda row: row.schedule_event.service.title),
+    ExportColumn("Начало", lambda row: row.schedule_event.start_time),
+    ExportColumn("Имя", lambda row: row.name),
+    ExportColumn("Телефон", lambda row: row.phone),
+    ExportColumn("Email", lambda row: row.email),
+    ExportColumn("Комментарий", lambda row: row.comment),
+    ExportColumn("Статус", lambda row: row.status),
+    ExportColumn("Статус оплаты", lambda row: row.payment_status),
+    ExportColumn("Сумма", lambda row: row.payment_amount),
+    ExportColumn("ID платежа", lambda row: row.payment_id),
+    ExportColumn("Оплачено", lambda row: row.paid_at),
+]
+
+
+@router.get("/bookings", response_model=list[BookingAdminResponse])
+def admin_list_bookings(
+    response: Response,
+    status: str | None = None,
+    service_id: int | None = None,
+    search: str | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    page: PageParams = Depends(get_page_params),
+    db: Session = Depends(get_db_session),
+) -> list[BookingAdminResponse]:
+    query = _bookings_query(
+        db, status=status, service_id=service_id, search=search, date_from=date_from, date_to=date_to
+    )
+    rows = keyset_paginate(db, query, sort_keys=BOOKING_SORT_KEYS, page=page, response=response)
     return [_serialize_booking(row) for row in rows]
 
 
+@router.get("/bookings/export", response_model=None)
+def admin_export_bookings(
+    export_format: str = Query(default=EXPORT_FORMAT_CSV, alias="format", pattern=EXPORT_FORMAT_PATTERN),
+    status: str | None = None,
+    service_id: int | None = None,
+    search: str | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    db: Session = Depends(get_db_session),
+) -> StreamingResponse:
+    query = _bookings_query(
+        db, status=status, service_id=service_id, search=search, date_from=date_from, date_to=date_to
+    )
+    return export_response(
+        sorted_query(query, BOOKING_SORT_KEYS),
+        BOOKING_EXPORT_COLUMNS,
+        export_format=export_format,
+        filename="bookings",
+    )
+
+
 @router.patch("/bookings/{booking_id}/status", response_model=BookingAdminResponse)
 def admin_update_booking_status(
     booking_id: int,
@@ -355,65 +695,155 @@ def admin_update_booking_status(
     event = row.schedule_event
 
     if old_status != "confirmed" and new_status == "confirmed" and event:
-        if event.current_participants >= event.max_participants:
+        if not reserve_seats(db, event.id):
             raise HTTPException(status_code=409, detail="Невозможно подтвердить: мест больше нет.")
-        event.current_participants += 1
 
-    if old_status == "confirmed" and new_status != "confirmed" and event and event.current_participants > 0:
-        event.current_participants -= 1
+    if old_status == "confirmed" and new_status != "confirmed" and event:
+        release_seats(db, event.id)
 
-    row.status = new_status
-    if new_status == "confirmed" and row.payment_status in {"pending", "waiting_payment"}:
-        row.payment_status = "paid"
-    if new_status == "cancelled" and row.payment_status != "paid":
-        row.payment_status = "failed"
+    _set_booking_status(row, new_status)
 
     db.commit()
     db.refresh(row)
     return _serialize_booking(row)
 
 
+@router.post("/bookings/bulk/status", response_model=list[BookingAdminResponse])
+def admin_bulk_update_booking_status(
+    payload: BookingAdminBulkStatusUpdate,
+    db: Session = Depends(get_db_session),
+) -> list[BookingAdminResponse]:
+    rows = _load_bookings(db, payload.ids, with_event=True)
+    new_status = payload.status
+
+    deltas: dict[int, int] = {}
+    for row in rows:
+        delta = _seat_delta(row.status, new_status)
+        if delta:
+            deltas[row.schedule_event_id] = deltas.get(row.schedule_event_id, 0) + delta
+    failed = apply_seat_deltas(db, deltas)
+    if failed:
+        db.rollback()
+        listed = ", ".join(str(event_id) for event_id in failed)
+        raise HTTPException(status_code=409, detail=f"Невозможно подтвердить: не хватает мест в событиях {listed}.")
+
+    for row in rows:
+        _set_booking_status(row, new_status)
+
+    db.commit()
+    # One reload picks up server-side updated_at for the whole batch instead of a refresh per row.
+    rows = _load_bookings(db, payload.ids, with_event=True, refresh=True)
+    return [_serialize_booking(row) for row in rows]
+
+
+def _delete_bookings(db: Session, rows: list[Booking]) -> None:
+    """Delete bookings with their unpaid payments and payment logs; paid ones need a refund first."""
+    paid = [row.id for row in rows if row.payment_status == "paid"]
+    if paid:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Оплаченные бронирования нельзя удалить: {', '.join(map(str, paid))}. Сначала оформите возврат.",
+        )
+    # Booking.payment does not cascade, so a plain delete would null payments.booking_id (NOT NULL).
+    payments = db.scalars(
+        select(Payment).where(Payment.booking_id.in_([row.id for row in rows])).options(selectinload(Payment.logs))
+    ).all()
+    for payment in payments:
+        db.delete(payment)
+    for row in rows:
+        db.delete(row)
+
+
 @router.delete("/bookings/{booking_id}")
 def admin_delete_booking(booking_id: int, db: Session = Depends(get_db_session)) -> dict[str, bool]:
-    row = db.scalar(select(Booking).options(joinedload(Booking.schedule_event)).where(Booking.id == booking_id))
+    row = db.get(Booking, booking_id)
     if not row:
         raise HTTPException(status_code=404, detail="Бронирование не найдено.")
 
-    event = row.schedule_event
-    if row.status == "confirmed" and event and event.current_participants > 0:
-        event.current_participants -= 1
-
-    db.delete(row)
+    _delete_bookings(db, [row])
+    if row.status == "confirmed":
+        release_seats(db, row.schedule_event_id)
     db.commit()
     return {"ok": True}
 
 
+@router.post("/bookings/bulk/delete", response_model=AdminBulkResult)
+def admin_bulk_delete_bookings(payload: AdminBulkIds, db: Session = Depends(get_db_session)) -> AdminBulkResult:
+    rows = _load_bookings(db, payload.ids)
+    _delete_bookings(db, rows)
+
+    released: dict[int, int] = {}
+    for row in rows:
+        if row.status == "confirmed":
+            released[row.schedule_event_id] = released.get(row.schedule_event_id, 0) - 1
+    apply_seat_deltas(db, released)
+    db.commit()
+    return AdminBulkResult(affected=len(rows))
+
+
+def _contacts_query(
+    db: Session,
+    *,
+    status: str | None,
+    search: str | None,
+    date_from: datetime | None,
+    date_to: datetime | None,
+):
+    query = select(Contact)
+    if status:
+        query = query.where(Contact.status == status)
+    if search:
+        query = query.where(search_clause(db, search, ("contact", Contact.id)))
+    if date_from:
+        query = query.where(Contact.created_at >= date_from)
+    if date_to:
+        query = query.where(Contact.created_at <= date_to)
+    return query
+
+
+CONTACT_SORT_KEYS = [SortKey(Contact.created_at, descending=True), SortKey(Contact.id, descending=True)]
+
+CONTACT_EXPORT_COLUMNS = [
+    ExportColumn("ID", lambda row: row.id),
+    ExportColumn("Создано", lambda row: row.created_at),
+    ExportColumn("Имя", lambda row: row.name),
+    ExportColumn("Email", lambda row: row.email),
+    ExportColumn("Телефон", lambda row: row.phone),
+    ExportColumn("Сообщение", lambda row: row.message),
+    ExportColumn("Статус", lambda row: row.status),
+]
+
+
 @router.get("/contacts", response_model=list[ContactAdminResponse])
 def admin_list_contacts(
+    response: Response,
     status: str | None = None,
     search: str | None = None,
     date_from: datetime | None = None,
     date_to: datetime | None = None,
+    page: PageParams = Depends(get_page_params),
     db: Session = Depends(get_db_session),
 ) -> list[Contact]:
-    query = select(Contact).order_by(Contact.created_at.desc())
-    if status:
-        query = query.where(Contact.status == status)
-    if search:
-        like = f"%{search.strip()}%"
-        query = query.where(
-            or_(
-                Contact.name.ilike(like),
-                Contact.email.ilike(like),
-                Contact.phone.ilike(like),
-                Contact.message.ilike(like),
-            )
-        )
-    if date_from:
-        query = query.where(Contact.created_at >= date_from)
-    if date_to:
-        query = query.where(Contact.created_at <= date_to)
-    return db.scalars(query).all()
+    query = _contacts_query(db, status=status, search=search, date_from=date_from, date_to=date_to)
+    return keyset_paginate(db, query, sort_keys=CONTACT_SORT_KEYS, page=page, response=response)
+
+
+@router.get("/contacts/export", response_model=None)
+def admin_export_contacts(
+    export_format: str = Query(default=EXPORT_FORMAT_CSV, alias="format", pattern=EXPORT_FORMAT_PATTERN),
+    status: str | None = None,
+    search: str | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    db: Session = Depends(get_db_session),
+) -> StreamingResponse:
+    query = _contacts_query(db, status=status, search=search, date_from=date_from, date_to=date_to)
+    return export_response(
+        sorted_query(query, CONTACT_SORT_KEYS),
+        CONTACT_EXPORT_COLUMNS,
+        export_format=export_format,
+        filename="contacts",
+    )
 
 
 @router.patch("/contacts/{contact_id}/status", response_model=ContactAdminResponse)
@@ -431,6 +861,22 @@ def admin_update_contact_status(
     return row
 
 
+@router.post("/contacts/bulk/status", response_model=AdminBulkResult)
+def admin_bulk_update_contact_status(
+    payload: ContactAdminBulkStatusUpdate,
+    db: Session = Depends(get_db_session),
+) -> AdminBulkResult:
+    ids = sorted(set(payload.ids))
+    result = db.execute(
+        update(Contact)
+        .where(Contact.id.in_(ids))
+        .values(status=payload.status)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return AdminBulkResult(affected=result.rowcount or 0)
+
+
 @router.delete("/contacts/{contact_id}")
 def admin_delete_contact(contact_id: int, db: Session = Depends(get_db_session)) -> dict[str, bool]:
     row = db.get(Contact, contact_id)
@@ -447,6 +893,7 @@ def admin_list_settings(db: Session = Depends(get_db_session)) -> list[Setting]:
 
 
 @router.put("/settings", response_model=list[SettingAdminResponse])
+@query_budget(3)
 def admin_update_settings(
     payload: SettingBulkUpdate | list[SettingUpdateItem],
     db: Session = Depends(get_db_session),
@@ -455,16 +902,16 @@ def admin_update_settings(
     if not items:
         raise HTTPException(status_code=422, detail="Список settings пуст.")
 
-    for item in items:
-        row = db.scalar(select(Setting).where(Setting.key == item.key))
-        if row:
-            row.value = item.value
-            row.is_public = item.is_public
-        else:
-            db.add(Setting(key=item.key, value=item.value, is_public=item.is_public))
-
+    # Last occurrence wins, as it did when keys were written one by one.
+    written = {item.key: {"key": item.key, "value": item.value, "is_public": item.is_public} for item in items}
+    upsert_rows(db, Setting, list(written.values()), key_columns=["key"], update_columns=["value", "is_public"])
     db.commit()
-    return db.scalars(select(Setting).order_by(Setting.key.asc())).all()
+    return db.scalars(
+        select(Setting)
+        .where(Setting.key.in_(list(written)))
+        .order_by(Setting.key.asc())
+        .execution_options(populate_existing=True)
+    ).all()
 
 
 @router.delete("/settings/{key}")
@@ -477,28 +924,63 @@ def admin_delete_setting(key: str, db: Session = Depends(get_db_session)) -> dic
     return {"ok": True}
 
 
+def _certificates_query(db: Session, *, status: str | None, search: str | None):
+    query = select(GiftCertificate)
+    if status:
+        query = query.where(GiftCertificate.status == status)
+    if search:
+        query = query.where(search_clause(db, search, ("certificate", GiftCertificate.id)))
+    return query
+
+
+CERTIFICATE_SORT_KEYS = [
+    SortKey(GiftCertificate.created_at, descending=True),
+    SortKey(GiftCertificate.id, descending=True),
+]
+
+CERTIFICATE_EXPORT_COLUMNS = [
+    ExportColumn("ID", lambda row: row.id),
+    ExportColumn("Создан", lambda row: row.created_at),
+    ExportColumn("Код", lambda row: row.code),
+    ExportColumn("Сумма", lambda row: row.amount),
+    ExportColumn("Статус", lambda row: row.status),
+    ExportColumn("Получатель", lambda row: row.recipient_name),
+    ExportColumn("Отправитель", lambda row: row.sender_name),
+    ExportColumn("Покупатель", lambda row: row.buyer_name),
+    ExportColumn("Email покупателя", lambda row: row.buyer_email),
+    ExportColumn("Телефон покупателя", lambda row: row.buyer_phone),
+    ExportColumn("Действует до", lambda row: row.expires_at),
+    ExportColumn("Оформил", lambda row: row.issued_by),
+    ExportColumn("Оформлен", lambda row: row.issued_at),
+    ExportColumn("Погашен", lambda row: row.redeemed_at),
+]
+
+
 @router.get("/certificates", response_model=list[GiftCertificateAdminResponse])
 def admin_list_certificates(
+    response: Response,
     status: str | None = None,
     search: str | None = None,
+    page: PageParams = Depends(get_page_params),
     db: Session = Depends(get_db_session),
 ) -> list[GiftCertificate]:
-    query = select(GiftCertificate).order_by(GiftCertificate.created_at.desc())
-    if status:
-        query = query.where(GiftCertificate.status == status)
-    if search:
-        like = f"%{search.strip()}%"
-        query = query.where(
-            or_(
-                GiftCertificate.code.ilike(like),
-                GiftCertificate.recipient_name.ilike(like),
-                GiftCertificate.sender_name.ilike(like),
-                GiftCertificate.buyer_name.ilike(like),
-                GiftCertificate.buyer_email.ilike(like),
-                GiftCertificate.buyer_phone.ilike(like),
-            )
-        )
-    return db.scalars(query).all()
+    query = _certificates_query(db, status=status, search=search)
+    return keyset_paginate(db, query, sort_keys=CERTIFICATE_SORT_KEYS, page=page, response=response)
+
+
+@router.get("/certificates/export", response_model=None)
+def admin_export_certificates(
+    export_format: str = Query(default=EXPORT_FORMAT_CSV, alias="format", pattern=EXPORT_FORMAT_PATTERN),
+    status: str | None = None,
+    search: str | None = None,
+    db: Session = Depends(get_db_session),
+) -> StreamingResponse:
+    return export_response(
+        sorted_query(_certificates_query(db, status=status, search=search), CERTIFICATE_SORT_KEYS),
+        CERTIFICATE_EXPORT_COLUMNS,
+        export_format=export_format,
+        filename="certificates",
+    )
 
 
 @router.patch("/certificates/{certificate_id}", response_model=GiftCertificateAdminResponse)
@@ -1,22 +1,69 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from ..config import settings
 from ..deps import AdminPrincipal, get_current_admin, get_db_session
+from ..login_throttle import (
+    clear_login_failures,
+    client_ip,
+    login_retry_after,
+    login_throttle_keys,
+    record_login_failure,
+)
+from ..profiling import ProfiledRoute
 from ..schemas import AdminAuthResponse, AdminAuthUser, AdminLoginRequest, AdminMeResponse
-from ..security import authenticate_admin, create_access_token, get_admin_by_id
+from ..security import (
+    PasswordHashBusy,
+    create_access_token,
+    find_login_candidate,
+    mark_admin_login,
+    verify_password_bounded,
+)
 
-router = APIRouter(prefix="/api/auth", tags=["auth"])
+router = APIRouter(prefix="/api/auth", tags=["auth"], route_class=ProfiledRoute)
+
+
+def _throttled(retry_after: int) -> HTTPException:
+    minutes = max(1, (retry_after + 59) // 60)
+    return HTTPException(
+        status_code=429,
+        detail=f"Слишком много неудачных попыток входа. Повторите через {minutes} мин.",
+        headers={"Retry-After": str(retry_after)},
+    )
 
 
 @router.post("/login", response_model=AdminAuthResponse)
-def admin_login(payload: AdminLoginRequest, db: Session = Depends(get_db_session)) -> AdminAuthResponse:
-    user = authenticate_admin(db, payload.username, payload.password)
-    if not user:
+async def admin_login(
+    payload: AdminLoginRequest,
+    request: Request,
+    db: Session = Depends(get_db_session),
+) -> AdminAuthResponse:
+    keys = login_throttle_keys(client_ip(request), payload.username)
+    retry_after = await run_in_threadpool(login_retry_after, db, keys)
+    if retry_after:
+        raise _throttled(retry_after)
+
+    user = await run_in_threadpool(find_login_candidate, db, payload.username)
+    try:
+        verified = user is not None and await verify_password_bounded(payload.password, user.password_hash)
+    except PasswordHashBusy as exc:
+        raise HTTPException(
+            status_code=503,
+            detail="Сервер занят проверкой входа. Повторите попытку через несколько секунд.",
+            headers={"Retry-After": "2"},
+        ) from exc
+    if not verified:
+        lockout = await run_in_threadpool(record_login_failure, db, keys)
+        if lockout:
+            raise _throttled(lockout)
         raise HTTPException(status_code=401, detail="Неверный логин или пароль.")
 
+    await run_in_threadpool(clear_login_failures, db, keys)
+    user = await run_in_threadpool(mark_admin_login, db, user)
+
     token = create_access_token(user)
     return AdminAuthResponse(
         access_token=token,
@@ -32,10 +79,7 @@ def admin_login(payload: AdminLoginRequest, db: Session = Depends(get_db_session
 
 
 @router.get("/me", response_model=AdminMeResponse)
-def admin_me(
-    principal: AdminPrincipal = Depends(get_current_admin),
-    db: Session = Depends(get_db_session),
-) -> AdminMeResponse:
+def admin_me(principal: AdminPrincipal = Depends(get_current_admin)) -> AdminMeResponse:
     if principal.auth_type == "legacy-token":
         return AdminMeResponse(
             user=AdminAuthUser(
@@ -50,16 +94,13 @@ def admin_me(
     if principal.id is None:
         raise HTTPException(status_code=401, detail="Некорректный токен администратора.")
 
-    user = get_admin_by_id(db, principal.id)
-    if not user:
-        raise HTTPException(status_code=401, detail="Пользователь администратора не найден.")
-
+    # get_current_admin only resolves active users, so the principal already reflects the stored row.
     return AdminMeResponse(
         user=AdminAuthUser(
-            id=user.id,
-            username=user.username,
-            role=user.role,
-            is_active=user.is_active,
+            id=principal.id,
+            username=principal.username,
+            role=principal.role,
+            is_active=True,
         ),
         auth_type=principal.auth_type,
     )
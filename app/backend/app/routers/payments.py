@@ -3,16 +3,30 @@ from __future__ import annotations
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, Depends, Header, HTTPException, Request
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from ..config import settings
 from ..deps import get_db_session
-from ..models import Booking, Payment, PaymentLog
+from ..domain_events import EVENT_BOOKING_PAYMENT, record_event
+from ..models import Payment
+from ..payment_logs import build_payment_log
+from ..payment_states import (
+    PAYMENT_STATUS_CANCELED,
+    PAYMENT_STATUS_SUCCEEDED,
+    TRANSITION_APPLY,
+    booking_state_for_payment,
+    classify_payment_transition,
+    is_terminal_payment_status,
+    normalize_payment_status,
+)
+from ..profiling import ProfiledRoute
 from ..schemas import PaymentStatusResponse, PaymentWebhookEnvelope
+from ..services.seats import reserve_seats
 from ..services.yookassa import YookassaClient, safe_json_loads, verify_legacy_signature
 
-router = APIRouter(prefix="/api/payments", tags=["payments"])
+router = APIRouter(prefix="/api/payments", tags=["payments"], route_class=ProfiledRoute)
 
 
 def _apply_payment_state(
@@ -23,37 +37,51 @@ def _apply_payment_state(
     payment_method: str | None,
     payload: dict,
     event_type: str,
-) -> None:
-    payment.status = new_status
+) -> bool:
+    """Apply a provider event; returns False for duplicate or out-of-order events, which write nothing."""
+    new_status = normalize_payment_status(new_status)
+    observed_status = payment.status
+    if classify_payment_transition(observed_status, new_status) != TRANSITION_APPLY:
+        return False
+
+    # Compare-and-set on the observed status so concurrent deliveries of one event apply once.
+    claimed = db.execute(
+        update(Payment)
+        .where(Payment.id == payment.id, Payment.status == observed_status)
+        .values(status=new_status)
+        .execution_options(synchronize_session=False)
+    )
+    if claimed.rowcount != 1:
+        return False
+    set_committed_value(payment, "status", new_status)
+
     payment.payment_method = payment_method
     payment.raw_payload = payload
 
     booking = payment.booking
-    schedule = booking.schedule_event
-
-    if new_status == "succeeded":
-        if booking.status != "confirmed":
-            if schedule.current_participants >= schedule.max_participants:
-                raise HTTPException(status_code=409, detail="Платеж оплачен, но мест уже нет. Требуется ручная проверка.")
-            schedule.current_participants += 1
-        booking.status = "confirmed"
-        booking.payment_status = "paid"
+    booking_status, booking_payment_status = booking_state_for_payment(new_status)
+
+    if new_status == PAYMENT_STATUS_SUCCEEDED:
+        if booking.status != "confirmed" and not reserve_seats(db, booking.schedule_event_id):
+            raise HTTPException(status_code=409, detail="Платеж оплачен, но мест уже нет. Требуется ручная проверка.")
         booking.paid_at = datetime.now(timezone.utc)
         payment.paid_at = datetime.now(timezone.utc)
-    elif new_status in {"canceled", "cancelled"}:
-        booking.status = "cancelled"
-        booking.payment_status = "failed"
-    else:
-        booking.status = "waiting_payment"
-        booking.payment_status = new_status
-
-    db.add(
-        PaymentLog(
-            payment=payment,
-            event_type=event_type,
-            payload=payload,
-        )
+
+    booking.status = booking_status
+    booking.payment_status = booking_payment_status
+
+    db.add(build_payment_log(payment, event_type, payload))
+    record_event(
+        db,
+        EVENT_BOOKING_PAYMENT,
+        {
+            "booking_id": booking.id,
+            "payment_id": payment.provider_payment_id,
+            "payment_status": new_status,
+            "status": booking.status,
+        },
     )
+    return True
 
 
 def _build_redirect(payment_id: str, status: str) -> str | None:
@@ -62,7 +90,7 @@ def _build_redirect(payment_id: str, status: str) -> str | None:
         return f"{base}/payment/success?payment_id={payment_id}"
     if status == "waiting_for_capture":
         return f"{base}/payment/waiting?payment_id={payment_id}"
-    if status in {"canceled", "cancelled"}:
+    if normalize_payment_status(status) == PAYMENT_STATUS_CANCELED:
         return f"{base}/payment/failed?payment_id={payment_id}"
     return None
 
@@ -71,34 +99,35 @@ def _build_redirect(payment_id: str, status: str) -> str | None:
 def check_payment_status(provider_payment_id: str, db: Session = Depends(get_db_session)) -> PaymentStatusResponse:
     payment = db.scalar(
         select(Payment)
-        .options(
-            joinedload(Payment.booking).joinedload(Booking.schedule_event),
-        )
+        .options(joinedload(Payment.booking))
         .where(Payment.provider_payment_id == provider_payment_id)
     )
     if not payment:
         raise HTTPException(status_code=404, detail="Платеж не найден.")
 
-    yk = YookassaClient()
-    result = yk.get_payment(provider_payment_id)
+    # Terminal states never change at the provider, so skip the API call and the write entirely.
+    if not is_terminal_payment_status(payment.status):
+        yk = YookassaClient()
+        result = yk.get_payment(provider_payment_id)
 
-    _apply_payment_state(
-        db=db,
-        payment=payment,
-        new_status=result.status,
-        payment_method=result.payment_method,
-        payload=result.payload,
-        event_type="manual_status_check",
-    )
-    db.commit()
-    db.refresh(payment)
-    db.refresh(payment.booking)
+        applied = _apply_payment_state(
+            db=db,
+            payment=payment,
+            new_status=result.status,
+            payment_method=result.payment_method,
+            payload=result.payload,
+            event_type="manual_status_check",
+        )
+        if applied:
+            db.commit()
+            db.refresh(payment)
+            db.refresh(payment.booking)
 
     return PaymentStatusResponse(
         payment_id=provider_payment_id,
-        status=result.status,
+        status=payment.status,
         booking_status=payment.booking.status,
-        redirect_url=_build_redirect(provider_payment_id, result.status),
+        redirect_url=_build_redirect(provider_payment_id, payment.status),
     )
 
 
@@ -118,24 +147,22 @@ async def yookassa_webhook(
     if not provider_payment_id:
         raise HTTPException(status_code=400, detail="Webhook не содержит payment id.")
 
-    payment = db.scalar(
-        select(Payment)
-        .options(
-            joinedload(Payment.booking).joinedload(Booking.schedule_event),
-        )
-        .where(Payment.provider_payment_id == provider_payment_id)
-    )
-    if not payment:
-        raise HTTPException(status_code=404, detail="Платеж не найден.")
-
     status = str(envelope.object.get("status", "")).strip()
     if not status:
         raise HTTPException(status_code=400, detail="Webhook не содержит статус платежа.")
+
+    payment = db.scalar(select(Payment).where(Payment.provider_payment_id == provider_payment_id))
+    if not payment:
+        raise HTTPException(status_code=404, detail="Платеж не найден.")
+    if classify_payment_transition(payment.status, status) != TRANSITION_APPLY:
+        # Provider retries and out-of-order deliveries: acknowledge without touching the booking.
+        return {"ok": True}
+
     payment_method = None
     if isinstance(envelope.object.get("payment_method"), dict):
         payment_method = envelope.object["payment_method"].get("type")
 
-    _apply_payment_state(
+    applied = _apply_payment_state(
         db=db,
         payment=payment,
         new_status=status,
@@ -143,5 +170,6 @@ async def yookassa_webhook(
         payload=payload,
         event_type=envelope.event,
     )
-    db.commit()
+    if applied:
+        db.commit()
     return {"ok": True}
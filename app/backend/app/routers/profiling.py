@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, PlainTextResponse
+
+from ..deps import require_admin_role
+from ..profiling import list_reports, report_path
+from ..sampling import collect_samples, render_collapsed
+from ..schemas import ProfileReportResponse, ProfileReportSummary
+
+router = APIRouter(
+    prefix="/api/admin/profiling",
+    tags=["admin"],
+    dependencies=[Depends(require_admin_role("admin"))],
+)
+
+
+def _report_file(report_id: str, suffix: str) -> Path:
+    path = report_path(report_id, suffix)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Отчет профилирования не найден.")
+    return path
+
+
+@router.get("/requests", response_model=list[ProfileReportSummary])
+def admin_list_profiles() -> list[dict]:
+    return list_reports()
+
+
+@router.get("/requests/{report_id}", response_model=ProfileReportResponse)
+def admin_get_profile(report_id: str) -> dict:
+    return json.loads(_report_file(report_id, ".json").read_text(encoding="utf-8"))
+
+
+@router.get("/requests/{report_id}/download", response_model=None)
+def admin_download_profile(report_id: str) -> FileResponse:
+    # pstats dump: open with `python -m pstats`, snakeviz or gprof2dot.
+    return FileResponse(
+        _report_file(report_id, ".prof"),
+        media_type="application/octet-stream",
+        filename=f"profile-{report_id}.prof",
+    )
+
+
+@router.get("/samples", response_model=None)
+def admin_stack_samples(pid: int | None = Query(default=None)) -> PlainTextResponse:
+    # Collapsed stacks over the rolling window: feed to flamegraph.pl or open in speedscope.
+    return PlainTextResponse(render_collapsed(collect_samples(pid)))
@@ -6,14 +6,18 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Any
 
-from fastapi import APIRouter, Depends, Form, HTTPException, Query
+from fastapi import APIRouter, Depends, Form, Header, HTTPException, Query
 from fastapi.responses import JSONResponse
 from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
 
 from ..certificates import DEFAULT_VALIDITY_MODE
 from ..deps import get_db_session
+from ..domain_events import EVENT_BOOKING_CREATED, EVENT_CONTACT_CREATED, record_event
+from ..idempotency import run_idempotent
 from ..models import Booking, Contact, GalleryItem, GiftCertificate, Payment, ScheduleEvent, Service, Setting
+from ..profiling import ProfiledRoute
+from ..query_stats import query_budget
 from ..schemas import (
     BookingCreate,
     BookingCreateResponse,
@@ -30,7 +34,7 @@ from ..schemas import (
 )
 from ..services.yookassa import YookassaClient
 
-router = APIRouter(prefix="/api", tags=["public"])
+router = APIRouter(prefix="/api", tags=["public"], route_class=ProfiledRoute)
 
 DEFAULT_LEGAL_PAGES: dict[str, dict[str, str]] = {
     "offer": {
@@ -294,10 +298,13 @@ def list_gallery(
 
 
 @router.get("/legal", response_model=list[LegalPageResponse])
+@query_budget(1)
 def list_legal_pages(db: Session = Depends(get_db_session)) -> list[LegalPageResponse]:
+    keys = [f"legal_{slug}" for slug in DEFAULT_LEGAL_PAGES]
+    rows = {row.key: row for row in db.scalars(select(Setting).where(Setting.key.in_(keys))).all()}
     pages: list[LegalPageResponse] = []
     for slug, payload in DEFAULT_LEGAL_PAGES.items():
-        row = db.scalar(select(Setting).where(Setting.key == f"legal_{slug}"))
+        row = rows.get(f"legal_{slug}")
         if row and row.value:
             try:
                 parsed = json.loads(row.value)
@@ -358,6 +365,8 @@ def create_contact(payload: ContactCreate, db: Session = Depends(get_db_session)
         status="new",
     )
     db.add(row)
+    db.flush()
+    record_event(db, EVENT_CONTACT_CREATED, {"contact_id": row.id, "name": row.name})
     db.commit()
     db.refresh(row)
     return ContactResponse(
@@ -380,8 +389,19 @@ def legacy_submit_contact_php(
     return JSONResponse(result.model_dump(mode="json"))
 
 
-@router.post("/bookings", response_model=BookingCreateResponse)
-def create_booking(payload: BookingCreate, db: Session = Depends(get_db_session)) -> BookingCreateResponse:
+def _booking_event_payload(booking: Booking, event: ScheduleEvent) -> dict[str, Any]:
+    return {
+        "booking_id": booking.id,
+        "schedule_event_id": event.id,
+        "service_title": event.service.title,
+        "event_start_time": event.start_time.isoformat(),
+        "name": booking.name,
+        "status": booking.status,
+        "payment_status": booking.payment_status,
+    }
+
+
+def _create_booking(payload: BookingCreate, db: Session) -> BookingCreateResponse:
     if not (payload.privacy_policy and payload.personal_data and payload.terms):
         raise HTTPException(
             status_code=422,
@@ -414,6 +434,8 @@ def create_booking(payload: BookingCreate, db: Session = Depends(get_db_session)
             payment_amount=amount,
         )
         db.add(booking)
+        db.flush()
+        record_event(db, EVENT_BOOKING_CREATED, _booking_event_payload(booking, event))
         db.commit()
         db.refresh(booking)
         return BookingCreateResponse(
@@ -464,6 +486,7 @@ def create_booking(payload: BookingCreate, db: Session = Depends(get_db_session)
     booking.payment_status = payment_result.status
     booking.payment_confirmation_url = payment_result.confirmation_url
     booking.status = "waiting_payment"
+    record_event(db, EVENT_BOOKING_CREATED, _booking_event_payload(booking, event))
 
     db.commit()
     db.refresh(booking)
@@ -478,14 +501,23 @@ def create_booking(payload: BookingCreate, db: Session = Depends(get_db_session)
     )
 
 
-@router.post("/certificate-purchase", response_model=GiftCertificatePurchaseResponse)
-@router.post("/certificate-purchase/", response_model=GiftCertificatePurchaseResponse)
-@router.post("/certificates/purchase", response_model=GiftCertificatePurchaseResponse)
-@router.post("/certificates/purchase/", response_model=GiftCertificatePurchaseResponse)
-def purchase_certificate(
-    payload: GiftCertificatePurchaseRequest,
+@router.post("/bookings", response_model=BookingCreateResponse)
+def create_booking(
+    payload: BookingCreate,
+    idempotency_key: str | None = Header(default=None),
     db: Session = Depends(get_db_session),
-) -> GiftCertificatePurchaseResponse:
+) -> BookingCreateResponse:
+    return run_idempotent(
+        db,
+        scope="bookings",
+        key=idempotency_key,
+        payload=payload,
+        response_model=BookingCreateResponse,
+        handler=lambda: _create_booking(payload, db),
+    )
+
+
+def _purchase_certificate(payload: GiftCertificatePurchaseRequest, db: Session) -> GiftCertificatePurchaseResponse:
     code = _generate_certificate_code(db)
     row = GiftCertificate(
         code=code,
@@ -515,6 +547,25 @@ def purchase_certificate(
     )
 
 
+@router.post("/certificate-purchase", response_model=GiftCertificatePurchaseResponse)
+@router.post("/certificate-purchase/", response_model=GiftCertificatePurchaseResponse)
+@router.post("/certificates/purchase", response_model=GiftCertificatePurchaseResponse)
+@router.post("/certificates/purchase/", response_model=GiftCertificatePurchaseResponse)
+def purchase_certificate(
+    payload: GiftCertificatePurchaseRequest,
+    idempotency_key: str | None = Header(default=None),
+    db: Session = Depends(get_db_session),
+) -> GiftCertificatePurchaseResponse:
+    return run_idempotent(
+        db,
+        scope="certificates",
+        key=idempotency_key,
+        payload=payload,
+        response_model=GiftCertificatePurchaseResponse,
+        handler=lambda: _purchase_certificate(payload, db),
+    )
+
+
 @router.get("/certificates/{code}", response_model=GiftCertificatePublicResponse)
 def get_certificate(code: str, db: Session = Depends(get_db_session)) -> GiftCertificatePublicResponse:
     normalized_code = code.strip().upper()
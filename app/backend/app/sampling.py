@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .config import BASE_DIR, settings
+
+BUCKET_SECONDS = 10
+MAX_STACK_DEPTH = 128
+# Leaf frames of threads parked on a lock, a queue or the event loop's selector.
+IDLE_FRAMES = {
+    ("thread.py", "_worker"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+}
+# The app's own housekeeping daemons sleep in time.sleep or a timed wait between short ticks, which
+# no leaf frame reveals; they are left out by name. Idle password-hash workers are caught by IDLE_FRAMES.
+BACKGROUND_THREADS = {"metrics-snapshot", "domain-events-tailer"}
+
+logger = logging.getLogger(__name__)
+
+
+def _short_path(filename: str) -> str:
+    marker = "site-packages/"
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    backend = BASE_DIR.as_posix() + "/"
+    if filename.startswith(backend):
+        return filename[len(backend):]
+    return os.path.basename(filename)
+
+
+def _samples_dir() -> Path | None:
+    return Path(settings.sampling_profiler_dir) if settings.sampling_profiler_dir else None
+
+
+class StackSampler:
+    """Per-process sampling profiler: a daemon thread reads every thread's stack SAMPLING_PROFILER_HZ times a second.
+
+    Samples are folded into collapsed stacks (`pid-N;thread;outer;...;leaf count`, the flamegraph.pl input)
+    in BUCKET_SECONDS buckets; buckets older than SAMPLING_PROFILER_WINDOW_SECONDS are dropped. Each
+    bucket rotation publishes the window to SAMPLING_PROFILER_DIR so any worker can serve all of them.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+        self._buckets: deque[tuple[float, Counter[str]]] = deque()
+        self._labels: dict[CodeType, str] = {}
+
+    def ensure_started(self) -> None:
+        # A thread started in a Passenger preloader does not survive the fork, hence the pid check.
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._buckets.clear()
+            self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+            self._thread.start()
+
+    def _label(self, code: CodeType) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+            self._labels[code] = label
+        return label
+
+    def _collapse(self, frame: FrameType | None) -> list[str]:
+        frames: list[str] = []
+        while frame is not None and len(frames) < MAX_STACK_DEPTH:
+            frames.append(self._label(frame.f_code))
+            frame = frame.f_back
+        frames.reverse()
+        return frames
+
+    def sample(self) -> None:
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        prefix = f"pid-{os.getpid()}"
+        stacks: list[str] = []
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own:
+                continue
+            code = frame.f_code
+            name = names.get(thread_id, str(thread_id))
+            if not settings.sampling_profiler_include_idle and (
+                name in BACKGROUND_THREADS or (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES
+            ):
+                continue
+            thread = name.replace(";", ":").replace(" ", "_")
+            stacks.append(";".join([prefix, thread, *self._collapse(frame)]))
+        now = time.time()
+        with self._lock:
+            if not self._buckets or now - self._buckets[-1][0] >= BUCKET_SECONDS:
+                self._buckets.append((now, Counter()))
+            self._buckets[-1][1].update(stacks)
+
+    def window(self) -> Counter[str]:
+        horizon = time.time() - settings.sampling_profiler_window_seconds
+        merged: Counter[str] = Counter()
+        with self._lock:
+            while self._buckets and self._buckets[0][0] < horizon:
+                self._buckets.popleft()
+            for _, counts in self._buckets:
+                merged.update(counts)
+        return merged
+
+    def publish(self) -> None:
+        directory = _samples_dir()
+        if directory is None:
+            return
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{os.getpid()}.json"
+        temporary = path.with_name(f".{path.name}.tmp")
+        temporary.write_text(json.dumps({"written_at": time.time(), "stacks": self.window()}), encoding="utf-8")
+        os.replace(temporary, path)
+
+    def _run(self) -> None:
+        interval = 1 / max(settings.sampling_profiler_hz, 1)
+        published_at = time.monotonic()
+        while True:
+            try:
+                self.sample()
+                if time.monotonic() - published_at >= BUCKET_SECONDS:
+                    published_at = time.monotonic()
+                    self.publish()
+            except Exception:
+                logger.exception("Stack sampling failed")
+            time.sleep(interval)
+
+
+sampler = StackSampler()
+
+
+def collect_samples(pid: int | None = None) -> Counter[str]:
+    """Rolling window of this worker (live) and of every other worker that published recently."""
+    merged: Counter[str] = Counter()
+    if pid is None or pid == os.getpid():
+        merged.update(sampler.window())
+    directory = _samples_dir()
+    if directory is None or not directory.is_dir():
+        return merged
+    own = f"{os.getpid()}.json"
+    horizon = time.time() - settings.sampling_profiler_window_seconds
+    for path in directory.glob("*.json"):
+        if path.name == own or (pid is not None and path.name != f"{pid}.json"):
+            continue
+        try:
+            snapshot: dict[str, Any] = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        if snapshot.get("written_at", 0) < horizon:
+            # The worker is gone and its whole window has expired.
+            path.unlink(missing_ok=True)
+            continue
+        merged.update(snapshot.get("stacks", {}))
+    return merged
+
+
+def render_collapsed(stacks: Counter[str]) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class SamplingProfilerMiddleware:
+    """Starts the worker's sampler on its first request, i.e. after the server has forked it."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        sampler.ensure_started()
+        await self.app(scope, receive, send)
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime, time
 from decimal import Decimal
 from typing import Any
 
-from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator, model_validator
+
+from .services.schedule_conflicts import wall_clock
 
 
 class ContactCreate(BaseModel):
@@ -200,6 +202,12 @@ class ScheduleAdminBase(BaseModel):
     is_individual: bool = False
     is_active: bool = True
 
+    @field_validator("start_time", "end_time")
+    @classmethod
+    def _to_wall_clock(cls, value: datetime) -> datetime:
+        # Times are stored as naive SCHEDULE_TIMEZONE wall clock; the admin UI sends UTC ("...Z").
+        return wall_clock(value)
+
 
 class ScheduleAdminCreate(ScheduleAdminBase):
     pass
@@ -218,6 +226,107 @@ class ScheduleAdminResponse(ScheduleAdminBase):
     service_slug: str | None = None
 
 
+class ScheduleTimeSlot(BaseModel):
+    start: time
+    end: time
+
+    @model_validator(mode="after")
+    def _check_order(self) -> "ScheduleTimeSlot":
+        if self.end <= self.start:
+            raise ValueError("Время окончания должно быть позже начала.")
+        return self
+
+
+class ScheduleRecurrenceCreate(BaseModel):
+    service_id: int
+    frequency: str = Field(default="weekly", pattern="^(weekly|biweekly)$")
+    weekdays: list[int] = Field(min_length=1, max_length=7, description="0 = понедельник, 6 = воскресенье")
+    time_slots: list[ScheduleTimeSlot] = Field(min_length=1, max_length=24)
+    date_from: date
+    date_to: date
+    exceptions: list[date] = Field(default_factory=list)
+    max_participants: int = Field(default=1, ge=1)
+    is_individual: bool = False
+    is_active: bool = True
+    dry_run: bool = False
+
+    @model_validator(mode="after")
+    def _check_rule(self) -> "ScheduleRecurrenceCreate":
+        if any(day < 0 or day > 6 for day in self.weekdays):
+            raise ValueError("Дни недели задаются числами от 0 до 6.")
+        if self.date_to < self.date_from:
+            raise ValueError("Дата окончания раньше даты начала.")
+        if (self.date_to - self.date_from).days > 366:
+            raise ValueError("Период генерации не может превышать год.")
+        return self
+
+
+class ScheduleCopyRequest(BaseModel):
+    source_from: date
+    source_to: date
+    target_from: date
+    service_id: int | None = None
+    dry_run: bool = False
+
+    @model_validator(mode="after")
+    def _check_window(self) -> "ScheduleCopyRequest":
+        if self.source_to < self.source_from:
+            raise ValueError("Дата окончания раньше даты начала.")
+        if (self.source_to - self.source_from).days > 62:
+            raise ValueError("Копировать можно не больше двух месяцев за раз.")
+        if self.target_from == self.source_from:
+            raise ValueError("Целевая дата совпадает с исходной.")
+        return self
+
+
+class SchedulePlannedEvent(BaseModel):
+    service_id: int
+    start_time: datetime
+    end_time: datetime
+
+
+class ScheduleConflictItem(BaseModel):
+    resource: str
+    event_id: int | None = None
+    service_id: int
+    start_time: datetime
+    end_time: datetime
+    conflicting_event_id: int | None = None
+    conflicting_service_id: int
+    conflicting_start_time: datetime
+    conflicting_end_time: datetime
+
+
+class ScheduleBulkResult(BaseModel):
+    ok: bool = True
+    dry_run: bool
+    created: int
+    skipped_existing: int
+    events: list[SchedulePlannedEvent]
+    conflicts: list[ScheduleConflictItem] = Field(default_factory=list)
+
+
+class AnalyticsRow(BaseModel):
+    period: date
+    service_id: int | None = None
+    service_title: str | None = None
+    events: int
+    capacity: int
+    bookings: int
+    cancelled_bookings: int
+    confirmed_seats: int
+    paid_amount: Decimal
+    fill_rate: float | None = None
+
+
+class AnalyticsResponse(BaseModel):
+    date_from: date
+    date_to: date
+    group_by: str
+    rows: list[AnalyticsRow]
+    totals: AnalyticsRow
+
+
 class GalleryAdminBase(BaseModel):
     title: str = Field(min_length=1, max_length=255)
     description: str | None = None
@@ -304,6 +413,19 @@ class BookingAdminStatusUpdate(BaseModel):
     status: str = Field(pattern="^(pending|waiting_payment|confirmed|cancelled)$")
 
 
+class AdminBulkIds(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=500)
+
+
+class BookingAdminBulkStatusUpdate(AdminBulkIds):
+    status: str = Field(pattern="^(pending|waiting_payment|confirmed|cancelled)$")
+
+
+class AdminBulkResult(BaseModel):
+    ok: bool = True
+    affected: int
+
+
 class ContactAdminResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -321,6 +443,10 @@ class ContactAdminStatusUpdate(BaseModel):
     status: str = Field(pattern="^(new|read|replied)$")
 
 
+class ContactAdminBulkStatusUpdate(AdminBulkIds):
+    status: str = Field(pattern="^(new|read|replied)$")
+
+
 class GiftCertificateAdminResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -412,3 +538,31 @@ class AdminAuthResponse(BaseModel):
 class AdminMeResponse(BaseModel):
     user: AdminAuthUser
     auth_type: str
+
+
+class ProfileReportSummary(BaseModel):
+    id: str
+    created_at: datetime
+    pid: int
+    method: str
+    path: str
+    route: str
+    query_string: str = ""
+    status: int
+    total_ms: float
+    endpoint_ms: float
+    serialization_ms: float
+    sql_queries: int
+    sql_ms: float
+
+
+class ProfileFunctionRow(BaseModel):
+    function: str
+    calls: int
+    own_ms: float
+    cumulative_ms: float
+
+
+class ProfileReportResponse(ProfileReportSummary):
+    top_functions: list[ProfileFunctionRow] = Field(default_factory=list)
+    call_tree: list[str] = Field(default_factory=list)
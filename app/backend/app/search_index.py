@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import logging
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any
+
+from sqlalchemy import and_, delete, event, false, insert, inspect, or_, select, true
+from sqlalchemy.orm import Session
+
+from .models import AppMetadata, Booking, Contact, GiftCertificate, SearchToken, Service
+
+MAX_TOKEN_LENGTH = 64
+MAX_QUERY_TERMS = 8
+MIN_PHONE_DIGITS = 3
+# Trailing digit runs indexed per phone: "4567" ... "1234567" (last digits of the local number).
+PHONE_SUFFIX_LENGTHS = range(4, 8)
+# Bumped whenever the token scheme changes; init_db / rebuild_search_index.py rebuild older indexes.
+SEARCH_INDEX_VERSION = 3
+VERSION_KEY = "search_index_version"
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_PHONE_QUERY_RE = re.compile(r"[\d\s()+\-.]+")
+
+
+@dataclass(frozen=True)
+class SearchEntity:
+    name: str
+    # Split into words; for emails that is the local part and the domain ("anna", "petrova", "mail", "ru").
+    text_fields: tuple[str, ...] = ()
+    phone_fields: tuple[str, ...] = ()
+    # Indexed both as a whole value and split into words (payment ids, certificate codes).
+    exact_fields: tuple[str, ...] = ()
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        return self.text_fields + self.phone_fields + self.exact_fields
+
+
+SEARCH_ENTITIES: dict[type, SearchEntity] = {
+    Booking: SearchEntity("booking", text_fields=("name", "email"), phone_fields=("phone",), exact_fields=("payment_id",)),
+    Contact: SearchEntity("contact", text_fields=("name", "message", "email"), phone_fields=("phone",)),
+    GiftCertificate: SearchEntity(
+        "certificate",
+        text_fields=("recipient_name", "sender_name", "buyer_name", "buyer_email"),
+        phone_fields=("buyer_phone",),
+        exact_fields=("code",),
+    ),
+    Service: SearchEntity("service", text_fields=("title",)),
+}
+
+
+def _normalize(value: str) -> str:
+    return value.strip().lower().replace("ё", "е")
+
+
+def _words(value: str) -> set[str]:
+    return {word[:MAX_TOKEN_LENGTH] for word in _WORD_RE.findall(_normalize(value))}
+
+
+def phone_tokens(value: str) -> set[str]:
+    digits = re.sub(r"\D", "", value)
+    if len(digits) < MIN_PHONE_DIGITS:
+        return set()
+    tokens = {digits}
+    # The last digits of a number are a common lookup; only a few suffix lengths keep writes small.
+    tokens.update(digits[-length:] for length in PHONE_SUFFIX_LENGTHS if length < len(digits))
+    # Russian numbers: +7 / 8 / bare national part should all be findable by any spelling.
+    if len(digits) == 11 and digits[0] in "78":
+        tokens.update({digits[1:], f"7{digits[1:]}"})
+    return tokens
+
+
+def build_search_tokens(row: Any, spec: SearchEntity) -> set[str]:
+    tokens: set[str] = set()
+    for field in spec.text_fields:
+        value = getattr(row, field)
+        if value:
+            tokens |= _words(value)
+    for field in spec.phone_fields:
+        value = getattr(row, field)
+        if value:
+            tokens |= phone_tokens(value)
+    for field in spec.exact_fields:
+        value = getattr(row, field)
+        if value:
+            tokens.add(_normalize(value)[:MAX_TOKEN_LENGTH])
+            tokens |= _words(value)
+    tokens.discard("")
+    return tokens
+
+
+def search_terms(raw: str) -> list[tuple[str, ...]]:
+    """Split a search string into AND-ed terms; each term is a tuple of OR-ed token prefixes."""
+    value = (raw or "").strip()
+    if _PHONE_QUERY_RE.fullmatch(value):
+        digits = re.sub(r"\D", "", value)
+        if len(digits) >= MIN_PHONE_DIGITS:
+            if digits[0] == "8" and len(digits) >= 4:
+                return [(digits, f"7{digits[1:]}")]
+            return [(digits,)]
+    words = sorted(_words(value), key=len, reverse=True)[:MAX_QUERY_TERMS]
+    return [(word,) for word in words]
+
+
+def _prefix_match(db: Session, prefix: str):
+    if db.get_bind().dialect.name == "sqlite":
+        # SQLite's LIKE is case-insensitive and cannot use a plain index; a range scan can.
+        return and_(SearchToken.token >= prefix, SearchToken.token < f"{prefix}\U0010ffff")
+    return SearchToken.token.startswith(prefix, autoescape=True)
+
+
+def _matching_ids(db: Session, entity: str, prefixes: tuple[str, ...]):
+    return select(SearchToken.entity_id).where(
+        SearchToken.entity == entity,
+        or_(*[_prefix_match(db, prefix) for prefix in prefixes]),
+    )
+
+
+def search_clause(db: Session, raw: str, *targets: tuple[str, Any]):
+    """WHERE clause matching rows whose tokens start with every search term.
+
+    `targets` are (entity name, id column) pairs; a term matches if any target matches it,
+    e.g. a booking by its own fields or by its service title.
+    """
+    terms = search_terms(raw)
+    if not terms:
+        # Blank input filters nothing; input without any searchable characters matches nothing.
+        return true() if not (raw or "").strip() else false()
+    return and_(
+        *[
+            or_(*[column.in_(_matching_ids(db, entity, prefixes)) for entity, column in targets])
+            for prefixes in terms
+        ]
+    )
+
+
+def _token_rows(row: Any, spec: SearchEntity) -> list[dict[str, Any]]:
+    return [{"entity": spec.name, "entity_id": row.id, "token": token} for token in build_search_tokens(row, spec)]
+
+
+def _search_fields_changed(row: Any, spec: SearchEntity) -> bool:
+    attrs = inspect(row).attrs
+    return any(attrs[field].history.has_changes() for field in spec.fields)
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_search_tokens(session: Session, flush_context) -> None:
+    stale: dict[str, set[int]] = defaultdict(set)
+    fresh: list[dict[str, Any]] = []
+
+    for row in session.deleted:
+        spec = SEARCH_ENTITIES.get(type(row))
+        if spec:
+            stale[spec.name].add(row.id)
+    for row in chain(session.new, session.dirty):
+        spec = SEARCH_ENTITIES.get(type(row))
+        if not spec or row in session.deleted:
+            continue
+        if row not in session.new:
+            if not _search_fields_changed(row, spec):
+                continue
+            stale[spec.name].add(row.id)
+        fresh.extend(_token_rows(row, spec))
+
+    if not stale and not fresh:
+        return
+    connection = session.connection()
+    for entity, ids in stale.items():
+        connection.execute(delete(SearchToken).where(SearchToken.entity == entity, SearchToken.entity_id.in_(ids)))
+    if fresh:
+        connection.execute(insert(SearchToken), fresh)
+
+
+def rebuild_search_index(db: Session, *, batch_size: int = 1000) -> int:
+    db.execute(delete(SearchToken))
+    written = 0
+    for model, spec in SEARCH_ENTITIES.items():
+        last_id = 0
+        while True:
+            rows = db.scalars(select(model).where(model.id > last_id).order_by(model.id.asc()).limit(batch_size)).all()
+            if not rows:
+                break
+            token_rows = list(chain.from_iterable(_token_rows(row, spec) for row in rows))
+            if token_rows:
+                db.execute(insert(SearchToken), token_rows)
+                written += len(token_rows)
+            last_id = rows[-1].id
+            db.expunge_all()
+    _write_version(db)
+    db.commit()
+    return written
+
+
+def _write_version(db: Session) -> None:
+    db.merge(AppMetadata(key=VERSION_KEY, value=str(SEARCH_INDEX_VERSION)))
+
+
+def search_index_is_current(db: Session) -> bool:
+    return db.scalar(select(AppMetadata.value).where(AppMetadata.key == VERSION_KEY)) == str(SEARCH_INDEX_VERSION)
+
+
+def ensure_search_index(db: Session) -> None:
+    """Build the index for databases that predate it or were indexed under an older token scheme.
+
+    Runs from init_db.py (the deploy step), not at app startup, so workers never race to rebuild.
+    """
+    if search_index_is_current(db):
+        return
+    if any(db.scalar(select(model.id).limit(1)) is not None for model in SEARCH_ENTITIES):
+        rebuild_search_index(db)
+    else:
+        _write_version(db)
+        db.commit()
+
+
+def warn_if_search_index_stale(db: Session) -> None:
+    if not search_index_is_current(db):
+        logger.warning("Search index is missing or outdated; run `python init_db.py` or `python rebuild_search_index.py`.")
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 import base64
 import hashlib
 import hmac
 import json
 import secrets
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
 
@@ -47,6 +50,28 @@ def verify_password(password: str, password_hash: str) -> bool:
     return hmac.compare_digest(actual, expected)
 
 
+class PasswordHashBusy(RuntimeError):
+    """All password-hashing slots are taken; the caller should shed the request."""
+
+
+# PBKDF2 is deliberately CPU-heavy: run it on its own small pool so a login burst cannot take
+# the request threadpool away from public pages, and refuse work beyond a short queue.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=max(settings.password_hash_workers, 1),
+    thread_name_prefix="password-hash",
+)
+_hash_slots = threading.BoundedSemaphore(max(settings.password_hash_workers, 1) + max(settings.password_hash_queue, 0))
+
+
+async def verify_password_bounded(password: str, password_hash: str) -> bool:
+    if not _hash_slots.acquire(blocking=False):
+        raise PasswordHashBusy()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, verify_password, password, password_hash)
+    finally:
+        _hash_slots.release()
+
+
 @dataclass(frozen=True)
 class AdminTokenPayload:
     sub: int
@@ -111,13 +136,14 @@ def decode_access_token(token: str) -> AdminTokenPayload:
     return AdminTokenPayload(sub=sub, username=username, role=role, exp=exp, iat=iat)
 
 
-def authenticate_admin(db: Session, username: str, password: str) -> AdminUser | None:
+def find_login_candidate(db: Session, username: str) -> AdminUser | None:
     row = db.scalar(select(AdminUser).where(AdminUser.username == username.strip()))
     if not row or not row.is_active:
         return None
-    if not verify_password(password, row.password_hash):
-        return None
+    return row
+
 
+def mark_admin_login(db: Session, row: AdminUser) -> AdminUser:
     row.last_login_at = datetime.now(timezone.utc)
     db.commit()
     db.refresh(row)
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import heapq
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, joinedload
+
+from ..config import settings
+from ..models import ScheduleEvent, Service
+
+# Events are assumed shorter than this; it bounds how far back a window query looks for overlaps.
+MAX_EVENT_SPAN = timedelta(days=1)
+
+
+@dataclass(frozen=True)
+class ScheduleSlot:
+    event_id: int | None
+    service_id: int
+    start: datetime
+    end: datetime
+    resources: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class ScheduleConflict:
+    resource: str
+    slot: ScheduleSlot
+    other: ScheduleSlot
+
+
+def wall_clock(value: datetime) -> datetime:
+    """Naive wall-clock time in the schedule zone (stored times are naive wall-clock values)."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(ZoneInfo(settings.schedule_timezone)).replace(tzinfo=None)
+
+
+@event.listens_for(ScheduleEvent.start_time, "set", retval=True)
+@event.listens_for(ScheduleEvent.end_time, "set", retval=True)
+def _store_wall_clock(target: ScheduleEvent, value: datetime, oldvalue: object, initiator: object) -> datetime:
+    # The drivers drop tzinfo on write, so an aware value would be stored in its own zone. Normalizing
+    # on assignment stores wall clock and lets flush hooks see the same value a later read returns.
+    return wall_clock(value) if isinstance(value, datetime) else value
+
+
+def _host_key(service: Service) -> str:
+    name = str((service.host or {}).get("name") or "")
+    # "Анна Андреева — дипломированный психолог..." -> "анна андреева"
+    return name.split("—")[0].split(",")[0].strip().lower()
+
+
+def service_resources(service: Service) -> tuple[str, ...]:
+    resources: list[str] = []
+    host = _host_key(service)
+    if host:
+        resources.append(f"host:{host}")
+    hall = str((service.host or {}).get("hall") or settings.schedule_default_hall).strip().lower()
+    if hall:
+        resources.append(f"hall:{hall}")
+    return tuple(resources)
+
+
+def slot_for_event(event: ScheduleEvent, service: Service) -> ScheduleSlot:
+    return ScheduleSlot(
+        event_id=event.id,
+        service_id=event.service_id,
+        start=wall_clock(event.start_time),
+        end=wall_clock(event.end_time),
+        resources=service_resources(service),
+    )
+
+
+class IntervalIndex:
+    """Static augmented interval tree over half-open intervals.
+
+    Slots sorted by start form an implicit balanced tree (the middle of each range is its root);
+    every node keeps the latest end in its subtree. `overlapping` skips subtrees that end before
+    the query start or begin after the query end, so a query costs O(log n + k log n) for k hits
+    instead of scanning back over every slot that a single long event would otherwise keep in reach.
+    """
+
+    def __init__(self, slots: list[ScheduleSlot]) -> None:
+        self._slots = sorted(slots, key=lambda slot: (slot.start, slot.end))
+        self._max_end: list[datetime | None] = [None] * len(self._slots)
+        if self._slots:
+            self._build(0, len(self._slots))
+
+    def _build(self, low: int, high: int) -> datetime:
+        # Recursion depth is log2(n); the subtree [low, high) is rooted at its middle.
+        middle = (low + high) // 2
+        latest = self._slots[middle].end
+        if low < middle:
+            latest = max(latest, self._build(low, middle))
+        if middle + 1 < high:
+            latest = max(latest, self._build(middle + 1, high))
+        self._max_end[middle] = latest
+        return latest
+
+    def overlapping(self, start: datetime, end: datetime, *, exclude_id: int | None = None) -> list[ScheduleSlot]:
+        found: list[int] = []
+        pending = [(0, len(self._slots))] if self._slots else []
+        while pending:
+            low, high = pending.pop()
+            middle = (low + high) // 2
+            if self._max_end[middle] <= start:
+                continue
+            if low < middle:
+                pending.append((low, middle))
+            slot = self._slots[middle]
+            if slot.start < end:
+                if slot.end > start and (exclude_id is None or slot.event_id != exclude_id):
+                    found.append(middle)
+                if middle + 1 < high:
+                    pending.append((middle + 1, high))
+        return [self._slots[position] for position in sorted(found)]
+
+
+class ConflictIndex:
+    def __init__(self, slots: list[ScheduleSlot]) -> None:
+        by_resource: dict[str, list[ScheduleSlot]] = defaultdict(list)
+        for slot in slots:
+            for resource in slot.resources:
+                by_resource[resource].append(slot)
+        self._indexes = {resource: IntervalIndex(items) for resource, items in by_resource.items()}
+
+    def conflicts_for(self, slot: ScheduleSlot) -> list[ScheduleConflict]:
+        conflicts: list[ScheduleConflict] = []
+        for resource in slot.resources:
+            index = self._indexes.get(resource)
+            if index is None:
+                continue
+            for other in index.overlapping(slot.start, slot.end, exclude_id=slot.event_id):
+                conflicts.append(ScheduleConflict(resource=resource, slot=slot, other=other))
+        return conflicts
+
+
+def load_slots(db: Session, start: datetime, end: datetime) -> list[ScheduleSlot]:
+    """Active events that may overlap [start, end), as wall-clock slots."""
+    rows = db.scalars(
+        select(ScheduleEvent)
+        .options(joinedload(ScheduleEvent.service))
+        .where(
+            ScheduleEvent.is_active.is_(True),
+            ScheduleEvent.start_time < end,
+            ScheduleEvent.start_time > start - MAX_EVENT_SPAN,
+        )
+        .order_by(ScheduleEvent.start_time.asc())
+    ).all()
+    slots = [slot_for_event(row, row.service) for row in rows if row.service]
+    return [slot for slot in slots if slot.end > start]
+
+
+def find_conflicts(db: Session, candidates: list[ScheduleSlot]) -> list[ScheduleConflict]:
+    """Check candidates against stored events and against each other."""
+    if not candidates:
+        return []
+    window_start = min(slot.start for slot in candidates)
+    window_end = max(slot.end for slot in candidates)
+    index = ConflictIndex(load_slots(db, window_start, window_end))
+
+    conflicts: list[ScheduleConflict] = []
+    for slot in candidates:
+        conflicts.extend(index.conflicts_for(slot))
+    conflicts.extend(sweep_conflicts(candidates))
+    return conflicts
+
+
+def sweep_conflicts(slots: list[ScheduleSlot]) -> list[ScheduleConflict]:
+    """All overlapping pairs per resource: sort by start, keep a heap of intervals still open."""
+    by_resource: dict[str, list[ScheduleSlot]] = defaultdict(list)
+    for slot in slots:
+        for resource in slot.resources:
+            by_resource[resource].append(slot)
+
+    conflicts: list[ScheduleConflict] = []
+    for resource, items in by_resource.items():
+        items.sort(key=lambda slot: (slot.start, slot.end))
+        open_slots: list[tuple[datetime, int, ScheduleSlot]] = []
+        for position, slot in enumerate(items):
+            while open_slots and open_slots[0][0] <= slot.start:
+                heapq.heappop(open_slots)
+            for _, _, other in open_slots:
+                conflicts.append(ScheduleConflict(resource=resource, slot=slot, other=other))
+            heapq.heappush(open_slots, (slot.end, position, slot))
+    return conflicts
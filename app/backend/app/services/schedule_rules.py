@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from ..models import ScheduleEvent
+from .schedule_conflicts import wall_clock
+
+FREQUENCY_WEEKLY = "weekly"
+FREQUENCY_BIWEEKLY = "biweekly"
+
+
+@dataclass(frozen=True)
+class PlannedEvent:
+    service_id: int
+    start_time: datetime
+    end_time: datetime
+    max_participants: int
+    is_individual: bool
+    is_active: bool
+
+    def as_row(self) -> dict[str, Any]:
+        return {
+            "service_id": self.service_id,
+            "start_time": wall_clock(self.start_time),
+            "end_time": wall_clock(self.end_time),
+            "max_participants": self.max_participants,
+            "current_participants": 0,
+            "is_individual": self.is_individual,
+            "is_active": self.is_active,
+        }
+
+
+def _naive(value: datetime) -> datetime:
+    return value.replace(tzinfo=None)
+
+
+def localize(value: datetime, tz_name: str) -> datetime:
+    # Stored times are wall-clock values; SQLite hands them back naive.
+    zone = ZoneInfo(tz_name)
+    return value.replace(tzinfo=zone) if value.tzinfo is None else value.astimezone(zone)
+
+
+def expand_recurrence(
+    *,
+    frequency: str,
+    weekdays: list[int],
+    time_slots: list[tuple[time, time]],
+    date_from: date,
+    date_to: date,
+    exceptions: list[date],
+    tz_name: str,
+) -> list[tuple[datetime, datetime]]:
+    """Expand a weekly/biweekly rule into (start, end) pairs in `tz_name`, ordered by start."""
+    zone = ZoneInfo(tz_name)
+    wanted_days = set(weekdays)
+    skipped = set(exceptions)
+    # Biweekly rules count weeks from the Monday of the first day in range.
+    anchor = date_from - timedelta(days=date_from.weekday())
+    step = 2 if frequency == FREQUENCY_BIWEEKLY else 1
+
+    slots: list[tuple[datetime, datetime]] = []
+    day = date_from
+    while day <= date_to:
+        if day.weekday() in wanted_days and day not in skipped and ((day - anchor).days // 7) % step == 0:
+            for slot_start, slot_end in time_slots:
+                slots.append(
+                    (
+                        datetime.combine(day, slot_start, tzinfo=zone),
+                        datetime.combine(day, slot_end, tzinfo=zone),
+                    )
+                )
+        day += timedelta(days=1)
+    slots.sort()
+    return slots
+
+
+def window_events(db: Session, start: datetime, end: datetime, service_id: int | None = None) -> list[ScheduleEvent]:
+    query = select(ScheduleEvent).where(ScheduleEvent.start_time >= start, ScheduleEvent.start_time < end)
+    if service_id:
+        query = query.where(ScheduleEvent.service_id == service_id)
+    return list(db.scalars(query.order_by(ScheduleEvent.start_time.asc(), ScheduleEvent.id.asc())).all())
+
+
+def drop_existing(db: Session, planned: list[PlannedEvent]) -> list[PlannedEvent]:
+    """Skip events whose service already has an event starting at the same moment (reruns are no-ops)."""
+    if not planned:
+        return []
+    first = min(item.start_time for item in planned)
+    last = max(item.start_time for item in planned)
+    rows = db.execute(
+        select(ScheduleEvent.service_id, ScheduleEvent.start_time).where(
+            ScheduleEvent.service_id.in_({item.service_id for item in planned}),
+            ScheduleEvent.start_time >= first,
+            ScheduleEvent.start_time <= last,
+        )
+    ).all()
+    taken = {(service_id, _naive(start_time)) for service_id, start_time in rows}
+    return [item for item in planned if (item.service_id, _naive(item.start_time)) not in taken]
+
+
+def shift_events(events: list[ScheduleEvent], days: int, tz_name: str) -> list[PlannedEvent]:
+    offset = timedelta(days=days)
+    return [
+        PlannedEvent(
+            service_id=event.service_id,
+            start_time=localize(event.start_time, tz_name) + offset,
+            end_time=localize(event.end_time, tz_name) + offset,
+            max_participants=event.max_participants,
+            is_individual=event.is_individual,
+            is_active=event.is_active,
+        )
+        for event in events
+    ]
+
+
+def insert_planned_events(db: Session, planned: list[PlannedEvent]) -> int:
+    if planned:
+        db.execute(insert(ScheduleEvent), [item.as_row() for item in planned])
+    return len(planned)
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from sqlalchemy import case, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+
+from ..models import ScheduleEvent
+
+
+def _expire_cached_counter(db: Session, schedule_event_id: int) -> None:
+    # The UPDATE bypasses the identity map, so drop any stale in-memory counter.
+    cached = db.identity_map.get(identity_key(ScheduleEvent, schedule_event_id))
+    if cached is not None:
+        db.expire(cached, ["current_participants"])
+
+
+def reserve_seats(db: Session, schedule_event_id: int, count: int = 1) -> bool:
+    """Atomically take `count` seats; returns False when the event has no room left."""
+    if count <= 0:
+        return True
+
+    result = db.execute(
+        update(ScheduleEvent)
+        .where(
+            ScheduleEvent.id == schedule_event_id,
+            ScheduleEvent.current_participants + count <= ScheduleEvent.max_participants,
+        )
+        .values(current_participants=ScheduleEvent.current_participants + count)
+        .execution_options(synchronize_session=False)
+    )
+    _expire_cached_counter(db, schedule_event_id)
+    return result.rowcount == 1
+
+
+def release_seats(db: Session, schedule_event_id: int, count: int = 1) -> None:
+    """Atomically return `count` seats, never letting the counter drop below zero."""
+    if count <= 0:
+        return
+
+    db.execute(
+        update(ScheduleEvent)
+        .where(
+            ScheduleEvent.id == schedule_event_id,
+            ScheduleEvent.current_participants > 0,
+        )
+        .values(
+            current_participants=case(
+                (ScheduleEvent.current_participants >= count, ScheduleEvent.current_participants - count),
+                else_=0,
+            )
+        )
+        .execution_options(synchronize_session=False)
+    )
+    _expire_cached_counter(db, schedule_event_id)
+
+
+def apply_seat_deltas(db: Session, deltas: dict[int, int]) -> list[int]:
+    """Apply net per-event seat changes in one pass; returns the events that had no room for their delta."""
+    failed: list[int] = []
+    # Stable event order keeps concurrent bulk operations from locking rows in opposite orders.
+    for schedule_event_id, delta in sorted(deltas.items()):
+        if delta > 0 and not reserve_seats(db, schedule_event_id, delta):
+            failed.append(schedule_event_id)
+        elif delta < 0:
+            release_seats(db, schedule_event_id, -delta)
+    return failed
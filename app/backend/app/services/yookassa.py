@@ -4,6 +4,7 @@ import base64
 import hashlib
 import hmac
 import json
+import time
 from dataclasses import dataclass
 from decimal import Decimal
 from uuid import uuid4
@@ -12,9 +13,7 @@ import httpx
 from fastapi import HTTPException
 
 from ..config import settings
-
-YOOKASSA_API_BASE = "https://api.yookassa.ru/v3"
-
+from ..metrics import registry
 
 @dataclass
 class YookassaPaymentResult:
@@ -26,7 +25,7 @@ class YookassaPaymentResult:
 
 
 class YookassaClient:
-    def __init__(self) -> None:
+    def __init__(self, api_base: str | None = None) -> None:
         if not settings.yookassa_enabled:
             raise HTTPException(
                 status_code=503,
@@ -36,6 +35,7 @@ class YookassaClient:
         self.secret_key = settings.yookassa_secret_key or ""
         token = base64.b64encode(f"{self.shop_id}:{self.secret_key}".encode("utf-8")).decode("utf-8")
         self.auth_header = f"Basic {token}"
+        self.api_base = (api_base or settings.yookassa_api_base).rstrip("/")
 
     def _request(self, method: str, path: str, *, payload: dict | None = None) -> dict:
         headers = {
@@ -45,12 +45,27 @@ class YookassaClient:
         if method.upper() == "POST":
             headers["Idempotence-Key"] = str(uuid4())
 
-        with httpx.Client(timeout=20.0) as client:
-            response = client.request(
-                method=method,
-                url=f"{YOOKASSA_API_BASE}{path}",
-                headers=headers,
-                json=payload,
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            with httpx.Client(timeout=float(max(settings.yookassa_timeout_seconds, 1))) as client:
+                response = client.request(
+                    method=method,
+                    url=f"{self.api_base}{path}",
+                    headers=headers,
+                    json=payload,
+                )
+            outcome = "ok" if response.status_code < 400 else f"http_{response.status_code // 100}xx"
+        except httpx.HTTPError as exc:
+            raise HTTPException(
+                status_code=502,
+                detail="Платежный сервис не отвечает. Попробуйте еще раз чуть позже.",
+            ) from exc
+        finally:
+            registry.observe(
+                "yookassa_request_duration_seconds",
+                {"method": method.upper(), "outcome": outcome},
+                time.perf_counter() - started,
             )
 
         if response.status_code >= 400:
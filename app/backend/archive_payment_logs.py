@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from app.config import BASE_DIR, settings
+from app.db import Base, SessionLocal, engine
+from app.db_migrations import ensure_declared_indexes, ensure_payment_log_storage_schema
+from app.payment_logs import ARCHIVE_MODE_JSONL, ARCHIVE_MODE_TABLE, archive_payment_logs
+
+
+def resolve_output_dir(raw_path: str) -> Path:
+    candidate = Path(raw_path)
+    if candidate.is_absolute():
+        return candidate
+    return (BASE_DIR / candidate).resolve()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Move old payment logs out of the hot payment_logs table.")
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=settings.payment_log_retention_days,
+        help="Архивировать логи старше указанного числа дней.",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=[ARCHIVE_MODE_TABLE, ARCHIVE_MODE_JSONL],
+        default=ARCHIVE_MODE_TABLE,
+        help="table — в таблицу payment_logs_archive, jsonl — в сжатые файлы *.jsonl.gz.",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default=settings.payment_log_archive_dir,
+        help="Каталог для файлов архива (только для --mode jsonl).",
+    )
+    parser.add_argument("--batch-size", type=int, default=1000, help="Сколько строк переносить за одну транзакцию.")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    ensure_payment_log_storage_schema(engine)
+    ensure_declared_indexes(engine)
+
+    db = SessionLocal()
+    try:
+        moved = archive_payment_logs(
+            db,
+            older_than_days=args.days,
+            mode=args.mode,
+            output_dir=resolve_output_dir(args.output_dir) if args.mode == ARCHIVE_MODE_JSONL else None,
+            batch_size=args.batch_size,
+        )
+        print(f"Archived payment logs: {moved}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,457 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+import uuid
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import delete, func, insert, select, update
+
+from app.analytics import rebuild_daily_stats
+from app.certificates import VALIDITY_MODE_CUSTOM_DAYS, calculate_certificate_expires_at
+from app.db import Base, SessionLocal, engine
+from app.db_migrations import ensure_declared_indexes
+from app.models import (
+    Booking,
+    Contact,
+    DailyServiceStat,
+    GiftCertificate,
+    Payment,
+    PaymentLog,
+    ScheduleEvent,
+    SearchToken,
+    Service,
+)
+from app.payment_logs import compress_payload
+from app.search_index import rebuild_search_index
+
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = BASE_DIR / "data"
+
+FIRST_NAMES = ["Анна", "Мария", "Елена", "Ольга", "Ирина", "Наталья", "Алексей", "Дмитрий", "Сергей", "Иван", "Павел", "Юлия"]
+LAST_NAMES = ["Иванова", "Смирнова", "Кузнецова", "Попова", "Соколова", "Лебедева", "Новикова", "Морозова", "Волкова", "Зайцева"]
+EMAIL_DOMAINS = ["mail.ru", "yandex.ru", "gmail.com", "bk.ru", "inbox.ru"]
+CONTACT_MESSAGES = [
+    "Хочу записаться на групповую практику, подскажите ближайшие даты.",
+    "Можно ли прийти с ребенком?",
+    "Интересует подарочный сертификат на индивидуальную сессию.",
+    "Подскажите, что взять с собой на первое занятие?",
+    "Есть ли скидки при покупке абонемента?",
+]
+EVENT_HOURS = [10, 12, 15, 17, 19]
+
+# (value, weight) mixes; weights need not sum to 100.
+BOOKING_STATUS_MIX = [("confirmed", 55), ("waiting_payment", 10), ("pending", 15), ("cancelled", 20)]
+CONTACT_STATUS_MIX = [("new", 30), ("read", 40), ("replied", 30)]
+CERTIFICATE_STATUS_MIX = [("paid", 35), ("issued", 35), ("redeemed", 20), ("cancelled", 10)]
+VALIDITY_MODE_MIX = [("3m", 70), ("1m", 20), (VALIDITY_MODE_CUSTOM_DAYS, 10)]
+CERTIFICATE_AMOUNTS = [1000, 2000, 3000, 3500, 5000, 10000]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic dataset for load and benchmark runs.")
+    parser.add_argument("--services", type=int, default=200, help="Сколько услуг создать.")
+    parser.add_argument("--events", type=int, default=20_000, help="Сколько событий расписания создать.")
+    parser.add_argument("--bookings", type=int, default=200_000, help="Сколько бронирований создать (платежи — для групповых).")
+    parser.add_argument("--contacts", type=int, default=50_000, help="Сколько заявок с формы контактов создать.")
+    parser.add_argument("--certificates", type=int, default=20_000, help="Сколько подарочных сертификатов создать.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Множитель для всех объемов выше.")
+    parser.add_argument("--seed", type=int, default=42, help="Seed генератора: одинаковые аргументы дают одинаковые данные.")
+    parser.add_argument("--anchor", type=date.fromisoformat, default=date.today(), help="Дата «сегодня» для расписания (YYYY-MM-DD).")
+    parser.add_argument("--past-days", type=int, default=365, help="Насколько далеко в прошлое уходит расписание.")
+    parser.add_argument("--future-days", type=int, default=90, help="На сколько дней вперед строится расписание.")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Строк в одном INSERT.")
+    parser.add_argument("--reset", action="store_true", help="Удалить услуги, расписание, брони, платежи, заявки и сертификаты.")
+    parser.add_argument("--skip-rebuild", action="store_true", help="Не перестраивать поисковый индекс и аналитику.")
+    return parser.parse_args()
+
+
+def scaled(value: int, scale: float) -> int:
+    return max(int(value * scale), 0)
+
+
+def weighted(rng: random.Random, mix: list[tuple[str, int]]) -> str:
+    return rng.choices([value for value, _ in mix], weights=[weight for _, weight in mix])[0]
+
+
+def batched(rows: Iterable[dict[str, Any]], size: int) -> Iterator[list[dict[str, Any]]]:
+    batch: list[dict[str, Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def bulk_insert(db, model, rows: Iterable[dict[str, Any]], batch_size: int) -> int:
+    written = 0
+    for batch in batched(rows, batch_size):
+        db.execute(insert(model), batch)
+        db.commit()
+        written += len(batch)
+    return written
+
+
+def report(label: str, written: int, started: float) -> None:
+    elapsed = time.perf_counter() - started
+    print(f"{label}: {written} rows in {elapsed:.1f}s ({written / max(elapsed, 1e-9):.0f} rows/s)")
+
+
+def next_id(db, model) -> int:
+    return int(db.scalar(select(func.max(model.id))) or 0) + 1
+
+
+def reset_generated(db) -> None:
+    for model in (PaymentLog, Payment, Booking, DailyServiceStat, ScheduleEvent, Contact, GiftCertificate, SearchToken, Service):
+        db.execute(delete(model))
+    db.commit()
+
+
+def person(rng: random.Random, index: int) -> dict[str, str]:
+    first = rng.choice(FIRST_NAMES)
+    last = rng.choice(LAST_NAMES)
+    return {
+        "name": f"{first} {last}",
+        "email": f"user{index}@{rng.choice(EMAIL_DOMAINS)}",
+        "phone": f"+79{rng.randrange(10**9):09d}",
+    }
+
+
+def event_price(pricing: dict[str, Any], individual: bool) -> Decimal:
+    block = pricing.get("individual" if individual else "group") or pricing.get("fixed") or {}
+    return Decimal(str(block.get("price") or block.get("price_per_person") or 2000))
+
+
+def generate_services(rng: random.Random, count: int, first_id: int, stamp: datetime) -> list[dict[str, Any]]:
+    templates = json.loads((DATA_DIR / "services.json").read_text(encoding="utf-8"))
+    rows = []
+    for offset in range(count):
+        template = templates[offset % len(templates)]
+        service_id = first_id + offset
+        rows.append(
+            {
+                "id": service_id,
+                "slug": f"{template['slug']}-{service_id}",
+                "title": f"{template['title']} #{service_id}",
+                "category": template.get("category"),
+                "category_label": template.get("category_label"),
+                "format_mode": template.get("format_mode") or "group_and_individual",
+                "teaser": template.get("teaser"),
+                "duration": template.get("duration"),
+                "pricing": template.get("pricing") or {},
+                "about": template.get("about") or [],
+                "suitable_for": template.get("suitable_for") or [],
+                "host": template.get("host") or {},
+                "important": template.get("important") or [],
+                "dress_code": template.get("dress_code") or [],
+                "contraindications": template.get("contraindications") or [],
+                "media": template.get("media") or [],
+                "age_restriction": template.get("age_restriction"),
+                # A few drafts and archived services, as in a real catalog.
+                "is_draft": rng.random() < 0.03,
+                "is_active": rng.random() >= 0.05,
+                "created_at": stamp,
+                "updated_at": stamp,
+            }
+        )
+    return rows
+
+
+class EventPlan:
+    """What the booking generator needs to know about each event, kept as parallel lists."""
+
+    def __init__(self) -> None:
+        self.ids: list[int] = []
+        self.starts: list[datetime] = []
+        self.capacity: list[int] = []
+        self.confirmed: list[int] = []
+        self.individual: list[bool] = []
+        self.price: list[Decimal] = []
+
+
+def generate_events(
+    rng: random.Random,
+    services: list[dict[str, Any]],
+    count: int,
+    first_id: int,
+    anchor: date,
+    past_days: int,
+    future_days: int,
+    plan: EventPlan,
+) -> Iterator[dict[str, Any]]:
+    first_day = anchor - timedelta(days=past_days)
+    span_days = max(past_days + future_days, 1)
+    for offset in range(count):
+        service = services[rng.randrange(len(services))]
+        individual = service["format_mode"] == "individual_only" or rng.random() < 0.3
+        start = datetime.combine(first_day + timedelta(days=rng.randrange(span_days)), datetime.min.time()).replace(
+            hour=rng.choice(EVENT_HOURS),
+            minute=rng.choice((0, 30)),
+        )
+        capacity = 1 if individual else rng.choice((4, 5, 8, 12, 12, 16))
+        event_id = first_id + offset
+        plan.ids.append(event_id)
+        plan.starts.append(start)
+        plan.capacity.append(capacity)
+        plan.confirmed.append(0)
+        plan.individual.append(individual)
+        plan.price.append(event_price(service["pricing"], individual))
+        created = min(start, datetime.combine(anchor, datetime.min.time())) - timedelta(days=rng.randrange(7, 60))
+        yield {
+            "id": event_id,
+            "service_id": service["id"],
+            "start_time": start,
+            "end_time": start + timedelta(minutes=rng.choice((60, 60, 90, 120))),
+            "max_participants": capacity,
+            # Filled in from the confirmed bookings once they are written.
+            "current_participants": 0,
+            "is_individual": individual,
+            "is_active": rng.random() >= 0.04,
+            "created_at": created,
+            "updated_at": created,
+        }
+
+
+def generate_bookings(
+    rng: random.Random,
+    plan: EventPlan,
+    count: int,
+    first_id: int,
+    first_payment_id: int,
+    anchor: date,
+    payments: list[dict[str, Any]],
+) -> Iterator[dict[str, Any]]:
+    """Bookings in id order; group bookings append their Payment row to `payments` as a side effect."""
+    now = datetime.combine(anchor, datetime.min.time())
+    payment_id = first_payment_id
+    for offset in range(count):
+        booking_id = first_id + offset
+        index = rng.randrange(len(plan.ids))
+        status = weighted(rng, BOOKING_STATUS_MIX)
+        if status == "confirmed":
+            if plan.confirmed[index] >= plan.capacity[index]:
+                status = "cancelled"
+            else:
+                plan.confirmed[index] += 1
+        start = plan.starts[index]
+        created = min(start, now) - timedelta(hours=rng.randrange(1, 24 * 30))
+        amount = plan.price[index]
+        row = {
+            "id": booking_id,
+            "schedule_event_id": plan.ids[index],
+            **person(rng, booking_id),
+            "comment": None,
+            "status": status,
+            "payment_status": "not_required",
+            "payment_id": None,
+            "payment_amount": amount,
+            "payment_confirmation_url": None,
+            "paid_at": None,
+            "created_at": created,
+            "updated_at": created,
+        }
+        if plan.individual[index]:
+            # Individual sessions are confirmed by an administrator, never paid online.
+            if status == "waiting_payment":
+                row["status"] = "pending"
+        else:
+            if status == "pending":
+                row["status"] = status = "waiting_payment"
+            provider_status, row["payment_status"] = {
+                "confirmed": ("succeeded", "paid"),
+                "cancelled": ("canceled", "failed"),
+                "waiting_payment": ("pending", "pending"),
+            }[status]
+            provider_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+            paid_at = created + timedelta(minutes=rng.randrange(1, 30)) if provider_status == "succeeded" else None
+            row["payment_id"] = provider_id
+            row["paid_at"] = paid_at
+            payments.append(
+                {
+                    "id": payment_id,
+                    "booking_id": booking_id,
+                    "provider": "yookassa",
+                    "provider_payment_id": provider_id,
+                    "amount": amount,
+                    "currency": "RUB",
+                    "status": provider_status,
+                    "payment_method": "bank_card" if provider_status != "pending" else None,
+                    "confirmation_url": None,
+                    "paid_at": paid_at,
+                    "raw_payload": {"id": provider_id, "status": provider_status},
+                    "created_at": created,
+                    "updated_at": paid_at or created,
+                }
+            )
+            payment_id += 1
+        yield row
+
+
+def generate_payment_logs(rng: random.Random, payments: list[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+    for payment in payments:
+        events = ["manual_status_check"] * rng.randrange(0, 3)
+        if payment["status"] != "pending":
+            events.append(f"payment.{payment['status']}")
+        for position, event_type in enumerate(events):
+            payload = {
+                "event": event_type,
+                "object": {
+                    "id": payment["provider_payment_id"],
+                    "status": payment["status"],
+                    "amount": {"value": f"{payment['amount']:.2f}", "currency": "RUB"},
+                },
+            }
+            yield {
+                "payment_id": payment["id"],
+                "event_type": event_type,
+                "payload": {},
+                "payload_compressed": compress_payload(payload),
+                "created_at": payment["created_at"] + timedelta(minutes=position + 1),
+            }
+
+
+def generate_contacts(rng: random.Random, count: int, first_id: int, anchor: date) -> Iterator[dict[str, Any]]:
+    now = datetime.combine(anchor, datetime.min.time())
+    for offset in range(count):
+        contact_id = first_id + offset
+        created = now - timedelta(minutes=rng.randrange(365 * 24 * 60))
+        yield {
+            "id": contact_id,
+            **person(rng, contact_id),
+            "message": rng.choice(CONTACT_MESSAGES),
+            "status": weighted(rng, CONTACT_STATUS_MIX),
+            "created_at": created,
+            "updated_at": created,
+        }
+
+
+def generate_certificates(rng: random.Random, count: int, first_id: int, anchor: date) -> Iterator[dict[str, Any]]:
+    now = datetime.combine(anchor, datetime.min.time())
+    for offset in range(count):
+        certificate_id = first_id + offset
+        buyer = person(rng, certificate_id)
+        status = weighted(rng, CERTIFICATE_STATUS_MIX)
+        mode = weighted(rng, VALIDITY_MODE_MIX)
+        days = rng.choice((14, 30, 60, 180)) if mode == VALIDITY_MODE_CUSTOM_DAYS else None
+        created = now - timedelta(minutes=rng.randrange(365 * 24 * 60))
+        issued_at = created + timedelta(hours=rng.randrange(1, 72)) if status in {"issued", "redeemed"} else None
+        yield {
+            "id": certificate_id,
+            # "G" is not a hex digit, so these never collide with real ATM-XXXXXXXX codes.
+            "code": f"ATM-G{certificate_id:07X}",
+            "amount": Decimal(rng.choice(CERTIFICATE_AMOUNTS)),
+            "recipient_name": rng.choice(FIRST_NAMES),
+            "sender_name": buyer["name"],
+            "sender_hidden": rng.random() < 0.1,
+            "note": None,
+            "buyer_name": buyer["name"],
+            "buyer_email": buyer["email"],
+            "buyer_phone": buyer["phone"],
+            "status": status,
+            "validity_mode": mode,
+            "validity_days": days,
+            "expires_at": calculate_certificate_expires_at(issued_at, mode, days) if issued_at else None,
+            "issued_by": "admin" if issued_at else None,
+            "issued_at": issued_at,
+            "redeemed_at": issued_at + timedelta(days=rng.randrange(1, 30)) if status == "redeemed" else None,
+            "created_at": created,
+            "updated_at": issued_at or created,
+        }
+
+
+def main() -> None:
+    args = parse_args()
+    Base.metadata.create_all(bind=engine)
+    ensure_declared_indexes(engine)
+
+    rng = random.Random(args.seed)
+    stamp = datetime.combine(args.anchor, datetime.min.time()) - timedelta(days=args.past_days + 30)
+    started = time.perf_counter()
+
+    db = SessionLocal()
+    try:
+        if args.reset:
+            reset_generated(db)
+
+        step = time.perf_counter()
+        services = generate_services(rng, max(scaled(args.services, args.scale), 1), next_id(db, Service), stamp)
+        report("services", bulk_insert(db, Service, services, args.batch_size), step)
+
+        step = time.perf_counter()
+        plan = EventPlan()
+        events = generate_events(
+            rng,
+            services,
+            max(scaled(args.events, args.scale), 1),
+            next_id(db, ScheduleEvent),
+            args.anchor,
+            args.past_days,
+            args.future_days,
+            plan,
+        )
+        report("schedule_events", bulk_insert(db, ScheduleEvent, events, args.batch_size), step)
+
+        # Payments are collected while bookings stream out and written right after each chunk, so the FK holds.
+        step = time.perf_counter()
+        payments: list[dict[str, Any]] = []
+        bookings = generate_bookings(
+            rng,
+            plan,
+            scaled(args.bookings, args.scale),
+            next_id(db, Booking),
+            next_id(db, Payment),
+            args.anchor,
+            payments,
+        )
+        written = {"bookings": 0, "payments": 0, "payment_logs": 0}
+        for batch in batched(bookings, args.batch_size * 10):
+            written["bookings"] += bulk_insert(db, Booking, batch, args.batch_size)
+            written["payments"] += bulk_insert(db, Payment, payments, args.batch_size)
+            written["payment_logs"] += bulk_insert(db, PaymentLog, generate_payment_logs(rng, payments), args.batch_size)
+            payments.clear()
+
+        confirmed = (
+            select(func.count(Booking.id))
+            .where(Booking.schedule_event_id == ScheduleEvent.id, Booking.status == "confirmed")
+            .scalar_subquery()
+        )
+        db.execute(
+            update(ScheduleEvent)
+            .where(ScheduleEvent.id >= plan.ids[0])
+            .values(current_participants=confirmed)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        report(" + ".join(written), sum(written.values()), step)
+
+        step = time.perf_counter()
+        contacts = generate_contacts(rng, scaled(args.contacts, args.scale), next_id(db, Contact), args.anchor)
+        report("contacts", bulk_insert(db, Contact, contacts, args.batch_size), step)
+
+        step = time.perf_counter()
+        certificates = generate_certificates(
+            rng, scaled(args.certificates, args.scale), next_id(db, GiftCertificate), args.anchor
+        )
+        report("gift_certificates", bulk_insert(db, GiftCertificate, certificates, args.batch_size), step)
+
+        # Bulk inserts bypass the ORM flush hooks that maintain these two.
+        if not args.skip_rebuild:
+            step = time.perf_counter()
+            report("search_tokens", rebuild_search_index(db), step)
+            step = time.perf_counter()
+            report("daily_service_stats", rebuild_daily_stats(db), step)
+    finally:
+        db.close()
+    print(f"Dataset generated in {time.perf_counter() - started:.1f}s (seed={args.seed}, anchor={args.anchor}).")
+
+
+if __name__ == "__main__":
+    main()
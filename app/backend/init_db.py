@@ -1,7 +1,17 @@
 from __future__ import annotations
 
-from app.db_migrations import backfill_gift_certificate_validity, ensure_gift_certificate_validity_schema
+from app.analytics import ensure_daily_stats
+from app.db_migrations import (
+    backfill_gift_certificate_validity,
+    ensure_declared_indexes,
+    ensure_gift_certificate_validity_schema,
+    ensure_payment_log_storage_schema,
+)
 from app.db import Base, SessionLocal, engine
+from app.domain_events import purge_old_domain_events
+from app.idempotency import purge_expired_idempotency_keys
+from app.login_throttle import purge_login_throttle
+from app.search_index import ensure_search_index
 from app.security import ensure_bootstrap_admin
 from app.models import Service
 from seed_from_json import seed_gallery_assets, seed_schedule, seed_services, seed_site
@@ -17,6 +27,8 @@ def apply_runtime_content_fixes(db) -> None:
 def main() -> None:
     Base.metadata.create_all(bind=engine)
     ensure_gift_certificate_validity_schema(engine)
+    ensure_payment_log_storage_schema(engine)
+    ensure_declared_indexes(engine)
 
     db = SessionLocal()
     try:
@@ -32,6 +44,8 @@ def main() -> None:
             seed_gallery_assets(db, service_map)
             db.commit()
             backfill_gift_certificate_validity(db)
+            ensure_search_index(db)
+            ensure_daily_stats(db)
             print("Database initialized and seeded.")
         else:
             # Preserve admin-edited settings on redeploy; only create missing keys from defaults.
@@ -39,6 +53,11 @@ def main() -> None:
             apply_runtime_content_fixes(db)
             db.commit()
             backfill_gift_certificate_validity(db)
+            purge_expired_idempotency_keys(db)
+            purge_old_domain_events(db)
+            purge_login_throttle(db)
+            ensure_search_index(db)
+            ensure_daily_stats(db)
             print("Database initialized. Seed skipped (services already exist).")
     finally:
         db.close()
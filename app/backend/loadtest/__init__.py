@@ -0,0 +1 @@
+# Load, stress and benchmark tooling (run from app/backend: python -m loadtest.<module>).
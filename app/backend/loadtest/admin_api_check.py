@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from typing import Any
+
+ADMIN_TOKEN = "admin-api-check"
+CHECKS: list[Callable[[Any], str | None]] = []
+
+
+def check(func: Callable[[Any], str | None]) -> Callable[[Any], str | None]:
+    CHECKS.append(func)
+    return func
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Admin API regression checks against a throwaway SQLite database.")
+    parser.add_argument("names", nargs="*", help="Какие проверки запустить. По умолчанию — все.")
+    return parser.parse_args()
+
+
+def _service(slug: str, hall: str = "") -> int:
+    from app.db import SessionLocal
+    from app.models import Service
+
+    with SessionLocal() as db:
+        service = Service(slug=f"{slug}-{time.time_ns()}", title=slug, host={"name": f"Ведущий {slug}", "hall": hall})
+        db.add(service)
+        db.commit()
+        return service.id
+
+
+def _event_payload(service_id: int, start: str, end: str) -> dict[str, Any]:
+    return {"service_id": service_id, "start_time": start, "end_time": end, "max_participants": 5}
+
+
+@check
+def schedule_utc_payload(client: Any) -> str | None:
+    """The admin UI sends toISOString() values; they must be stored and compared as schedule wall clock."""
+    service_id = _service("tz-check")
+    first = client.post("/api/admin/schedule", json=_event_payload(service_id, "2026-03-02T07:00:00.000Z", "2026-03-02T09:00:00.000Z"))
+    if first.status_code != 200:
+        return f"first event: {first.status_code} {first.text}"
+    if not first.json()["start_time"].startswith("2026-03-02T10:00"):
+        return f"07:00Z stored as {first.json()['start_time']}, expected 10:00 Moscow wall clock"
+    overlap = client.post("/api/admin/schedule", json=_event_payload(service_id, "2026-03-02T07:30:00.000Z", "2026-03-02T08:30:00.000Z"))
+    if overlap.status_code != 409:
+        return f"overlapping Z payload: {overlap.status_code}, expected 409"
+    naive = client.post("/api/admin/schedule", json=_event_payload(service_id, "2026-03-02T10:30:00", "2026-03-02T11:30:00"))
+    if naive.status_code != 409:
+        return f"overlapping naive payload: {naive.status_code}, expected 409"
+    return None
+
+
+@check
+def rollup_matches_rebuild(client: Any) -> str | None:
+    """Events created late in the UTC day land on the same rollup day incrementally and after a rebuild."""
+    from datetime import datetime, timezone
+
+    from sqlalchemy import select
+
+    from app.analytics import rebuild_daily_stats
+    from app.db import SessionLocal
+    from app.models import DailyServiceStat, ScheduleEvent
+
+    service_id = _service("rollup-check")
+    created = client.post("/api/admin/schedule", json=_event_payload(service_id, "2026-03-02T22:30:00.000Z", "2026-03-02T23:30:00.000Z"))
+    if created.status_code != 200:
+        return f"API event: {created.status_code} {created.text}"
+    with SessionLocal() as db:
+        # Straight through the ORM with an aware UTC value, as scripts and seeders do.
+        start = datetime(2026, 3, 4, 22, 30, tzinfo=timezone.utc)
+        db.add(ScheduleEvent(service_id=service_id, start_time=start, end_time=start.replace(hour=23), max_participants=3))
+        db.commit()
+
+        def snapshot() -> list[tuple[Any, ...]]:
+            rows = db.execute(
+                select(DailyServiceStat.day, DailyServiceStat.events, DailyServiceStat.capacity)
+                .where(DailyServiceStat.service_id == service_id, DailyServiceStat.events > 0)
+                .order_by(DailyServiceStat.day)
+            ).all()
+            return [tuple(row) for row in rows]
+
+        incremental = snapshot()
+        rebuild_daily_stats(db)
+        rebuilt = snapshot()
+    if incremental != rebuilt:
+        return f"incremental {incremental} != rebuilt {rebuilt}"
+    if [row[0].isoformat() for row in rebuilt] != ["2026-03-03", "2026-03-05"]:
+        return f"unexpected days {rebuilt}, expected the Moscow dates 2026-03-03 and 2026-03-05"
+    return None
+
+
+@check
+def delete_bookings_with_payments(client: Any) -> str | None:
+    """Unpaid bookings go with their payment and logs; paid ones are refused with their ids."""
+    from datetime import datetime
+    from decimal import Decimal
+
+    from sqlalchemy import func, select
+
+    from app.db import SessionLocal
+    from app.models import Booking, Payment, PaymentLog, ScheduleEvent
+
+    service_id = _service("delete-check")
+    with SessionLocal() as db:
+        event = ScheduleEvent(
+            service_id=service_id, start_time=datetime(2026, 4, 1, 10), end_time=datetime(2026, 4, 1, 11), max_participants=5
+        )
+        db.add(event)
+        db.flush()
+        ids: dict[str, int] = {}
+        for label, payment_status in (("unpaid", "pending"), ("single", "pending"), ("paid", "paid")):
+            booking = Booking(
+                schedule_event_id=event.id, name=label, phone="+79990001122", email=f"{label}@example.com",
+                payment_status=payment_status,
+            )
+            booking.payment = Payment(
+                provider_payment_id=f"{label}-{time.time_ns()}", amount=Decimal("1000"), status=payment_status
+            )
+            booking.payment.logs.append(PaymentLog(event_type="payment.created", payload_json={}))
+            db.add(booking)
+            db.flush()
+            ids[label] = booking.id
+        db.commit()
+
+    bulk = client.post("/api/admin/bookings/bulk/delete", json={"ids": [ids["unpaid"]]})
+    if bulk.status_code != 200:
+        return f"bulk delete of an unpaid booking: {bulk.status_code} {bulk.text}"
+    single = client.delete(f"/api/admin/bookings/{ids['single']}")
+    if single.status_code != 200:
+        return f"single delete of an unpaid booking: {single.status_code} {single.text}"
+    refused = client.post("/api/admin/bookings/bulk/delete", json={"ids": [ids["unpaid"] + 1000, ids["paid"]]})
+    if refused.status_code != 404:
+        return f"bulk delete with a missing id: {refused.status_code}, expected 404"
+    refused = client.post("/api/admin/bookings/bulk/delete", json={"ids": [ids["paid"]]})
+    if refused.status_code != 409 or str(ids["paid"]) not in refused.json()["detail"]:
+        return f"bulk delete of a paid booking: {refused.status_code} {refused.text}, expected 409 naming it"
+    with SessionLocal() as db:
+        left = db.scalar(select(func.count()).select_from(Payment))
+        logs = db.scalar(select(func.count()).select_from(PaymentLog))
+    if (left, logs) != (1, 1):
+        return f"payments/logs left: {left}/{logs}, expected only the paid booking's 1/1"
+    return None
+
+
+@check
+def payment_log_archive_cutoff(client: Any) -> str | None:
+    """The archive cutoff is taken from the clock that wrote created_at, so only genuinely old rows move."""
+    from datetime import datetime
+    from decimal import Decimal
+
+    from sqlalchemy import func, select, update
+
+    from app.db import SessionLocal
+    from app.models import Booking, Payment, PaymentLog, PaymentLogArchive, ScheduleEvent
+    from app.payment_logs import archive_payment_logs, build_payment_log
+
+    service_id = _service("archive-check")
+    with SessionLocal() as db:
+        event = ScheduleEvent(
+            service_id=service_id, start_time=datetime(2026, 5, 1, 10), end_time=datetime(2026, 5, 1, 11), max_participants=5
+        )
+        booking = Booking(schedule_event=event, name="archive", phone="+79990001122", email="archive@example.com")
+        payment = Payment(
+            booking=booking, provider_payment_id=f"archive-{time.time_ns()}", amount=Decimal("500"), status="pending"
+        )
+        db.add_all([event, booking, payment])
+        db.flush()
+        old = build_payment_log(payment, "archive.old", {"n": 1})
+        fresh = build_payment_log(payment, "archive.fresh", {"n": 2})
+        db.add_all([old, fresh])
+        db.flush()
+        db.execute(
+            update(PaymentLog)
+            .where(PaymentLog.id == old.id)
+            .values(created_at=select(func.datetime(func.now(), "-31 days")).scalar_subquery())
+        )
+        db.commit()
+        old_id, fresh_id = old.id, fresh.id
+        moved = archive_payment_logs(db, older_than_days=30)
+        archived = set(db.scalars(select(PaymentLogArchive.id)).all())
+        hot = set(db.scalars(select(PaymentLog.id)).all())
+    if moved != 1 or old_id not in archived or fresh_id not in hot:
+        return f"moved {moved}, archived {sorted(archived)}, hot {sorted(hot)}; expected only log {old_id} archived"
+    return None
+
+
+def main() -> int:
+    args = parse_args()
+    fd, temp_path = tempfile.mkstemp(prefix="atman_admin_check_", suffix=".db")
+    os.close(fd)
+    os.environ["DATABASE_URL"] = f"sqlite:///{temp_path}"
+    os.environ["ADMIN_TOKEN"] = ADMIN_TOKEN
+    os.environ["SCHEDULE_TIMEZONE"] = "Europe/Moscow"
+    # Keep runtime state out of data/: no shared rate limit file, metrics snapshots or sample windows.
+    os.environ["RATE_LIMIT_STORE"] = "memory"
+    os.environ["METRICS_DIR"] = ""
+    os.environ["SAMPLING_PROFILER_DIR"] = ""
+
+    # Settings are read at import time, so the app is imported only after the environment is set.
+    from fastapi.testclient import TestClient
+
+    from app.application import create_app
+    from app.db import engine
+
+    failed = False
+    try:
+        with TestClient(create_app(), headers={"X-Admin-Token": ADMIN_TOKEN}) as client:
+            for func in CHECKS:
+                if args.names and func.__name__ not in args.names:
+                    continue
+                error = func(client)
+                failed = failed or error is not None
+                print(f"{func.__name__}: {'OK' if error is None else f'FAIL {error}'}")
+    finally:
+        engine.dispose()
+        os.remove(temp_path)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+from uuid import uuid4
+
+import httpx
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+TERMINAL_STATUSES = {"succeeded", "canceled"}
+
+
+@dataclass
+class FakeProviderConfig:
+    public_url: str = "http://127.0.0.1:8099"
+    webhook_url: str = "http://127.0.0.1:8000/api/payments/webhook"
+    webhook_secret: str = ""
+    webhook_delay_ms: int = 200
+    duplicate_webhook_rate: float = 0.0
+    auto_pay_after_ms: int = -1
+    cancel_rate: float = 0.0
+    latency_ms: int = 0
+    jitter_ms: int = 0
+    error_rate: float = 0.0
+    seed: int | None = None
+
+
+@dataclass
+class FakeProviderState:
+    payments: dict[str, dict[str, Any]] = field(default_factory=dict)
+    idempotence: dict[str, str] = field(default_factory=dict)
+    webhooks_sent: int = 0
+    webhooks_failed: int = 0
+    injected_errors: int = 0
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def create_fake_provider(config: FakeProviderConfig) -> FastAPI:
+    """Minimal stand-in for the YooKassa v3 payments API with webhook callbacks."""
+    app = FastAPI(title="Fake YooKassa", docs_url=None, redoc_url=None)
+    state = FakeProviderState()
+    rng = random.Random(config.seed)
+    background: set[asyncio.Task] = set()
+
+    async def simulate_network() -> None:
+        delay_ms = config.latency_ms + (rng.randint(0, config.jitter_ms) if config.jitter_ms > 0 else 0)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+        if config.error_rate > 0 and rng.random() < config.error_rate:
+            state.injected_errors += 1
+            raise HTTPException(status_code=500, detail={"type": "error", "code": "internal_server_error"})
+
+    def require_auth(authorization: str | None) -> None:
+        if not authorization or not authorization.startswith("Basic "):
+            raise HTTPException(status_code=401, detail={"type": "error", "code": "invalid_credentials"})
+
+    async def send_webhook(payment: dict[str, Any]) -> None:
+        await asyncio.sleep(max(config.webhook_delay_ms, 0) / 1000)
+        body = json.dumps(
+            {"type": "notification", "event": f"payment.{payment['status']}", "object": payment},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if config.webhook_secret:
+            headers["X-Payment-Sha1-Hash"] = hmac.new(
+                config.webhook_secret.encode("utf-8"), body, hashlib.sha1
+            ).hexdigest()
+
+        copies = 2 if config.duplicate_webhook_rate > 0 and rng.random() < config.duplicate_webhook_rate else 1
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            for _ in range(copies):
+                try:
+                    response = await client.post(config.webhook_url, content=body, headers=headers)
+                    if response.status_code >= 400:
+                        state.webhooks_failed += 1
+                    else:
+                        state.webhooks_sent += 1
+                except httpx.HTTPError:
+                    state.webhooks_failed += 1
+
+    def schedule(coro) -> None:
+        task = asyncio.create_task(coro)
+        background.add(task)
+        task.add_done_callback(background.discard)
+
+    def finish_payment(payment: dict[str, Any], outcome: str) -> None:
+        if payment["status"] in TERMINAL_STATUSES:
+            return
+        payment["status"] = outcome
+        payment["paid"] = outcome == "succeeded"
+        if outcome == "succeeded":
+            payment["captured_at"] = _now_iso()
+            payment["payment_method"] = {"type": "bank_card", "id": payment["id"], "saved": False}
+        else:
+            payment["cancellation_details"] = {"party": "yoo_money", "reason": "expired_on_confirmation"}
+        schedule(send_webhook(dict(payment)))
+
+    async def auto_pay(payment_id: str) -> None:
+        await asyncio.sleep(config.auto_pay_after_ms / 1000)
+        payment = state.payments.get(payment_id)
+        if payment:
+            outcome = "canceled" if config.cancel_rate > 0 and rng.random() < config.cancel_rate else "succeeded"
+            finish_payment(payment, outcome)
+
+    @app.post("/v3/payments")
+    async def create_payment(
+        request: Request,
+        authorization: str | None = Header(default=None),
+        idempotence_key: str | None = Header(default=None),
+    ) -> JSONResponse:
+        require_auth(authorization)
+        await simulate_network()
+        if idempotence_key and idempotence_key in state.idempotence:
+            return JSONResponse(state.payments[state.idempotence[idempotence_key]])
+
+        body = await request.json()
+        payment_id = f"fake-{uuid4()}"
+        payment = {
+            "id": payment_id,
+            "status": "pending",
+            "paid": False,
+            "test": True,
+            "amount": body.get("amount") or {},
+            "description": body.get("description"),
+            "metadata": body.get("metadata") or {},
+            "recipient": {"account_id": "fake", "gateway_id": "fake"},
+            "created_at": _now_iso(),
+            "confirmation": {
+                "type": "redirect",
+                "confirmation_url": f"{config.public_url.rstrip('/')}/checkout/{payment_id}",
+            },
+            "refundable": False,
+        }
+        state.payments[payment_id] = payment
+        if idempotence_key:
+            state.idempotence[idempotence_key] = payment_id
+        if config.auto_pay_after_ms >= 0:
+            schedule(auto_pay(payment_id))
+        return JSONResponse(payment)
+
+    @app.get("/v3/payments/{payment_id}")
+    async def get_payment(payment_id: str, authorization: str | None = Header(default=None)) -> JSONResponse:
+        require_auth(authorization)
+        await simulate_network()
+        payment = state.payments.get(payment_id)
+        if not payment:
+            raise HTTPException(status_code=404, detail={"type": "error", "code": "not_found"})
+        return JSONResponse(payment)
+
+    @app.get("/checkout/{payment_id}")
+    async def checkout(payment_id: str, outcome: str | None = None) -> JSONResponse:
+        """Simulates the buyer completing (or abandoning) the hosted payment page."""
+        payment = state.payments.get(payment_id)
+        if not payment:
+            raise HTTPException(status_code=404, detail="Unknown payment")
+        if outcome not in TERMINAL_STATUSES:
+            outcome = "canceled" if config.cancel_rate > 0 and rng.random() < config.cancel_rate else "succeeded"
+        finish_payment(payment, outcome)
+        return JSONResponse({"id": payment_id, "status": payment["status"]})
+
+    @app.get("/_stats")
+    async def stats() -> dict[str, int]:
+        statuses: dict[str, int] = {}
+        for payment in state.payments.values():
+            statuses[payment["status"]] = statuses.get(payment["status"], 0) + 1
+        return {
+            "payments": len(state.payments),
+            "webhooks_sent": state.webhooks_sent,
+            "webhooks_failed": state.webhooks_failed,
+            "injected_errors": state.injected_errors,
+            **{f"status_{key}": value for key, value in statuses.items()},
+        }
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local YooKassa stand-in for end-to-end payment load tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--public-url", default="", help="Базовый URL для confirmation_url (по умолчанию http://host:port).")
+    parser.add_argument("--webhook-url", default="http://127.0.0.1:8000/api/payments/webhook")
+    parser.add_argument("--webhook-secret", default="", help="Совпадает с YOOKASSA_WEBHOOK_SECRET backend-а.")
+    parser.add_argument("--webhook-delay-ms", type=int, default=200)
+    parser.add_argument("--duplicate-webhook-rate", type=float, default=0.0, help="Доля webhook-ов, отправляемых дважды.")
+    parser.add_argument("--auto-pay-after-ms", type=int, default=-1, help="Автоматически завершать оплату (-1 — ждать /checkout).")
+    parser.add_argument("--cancel-rate", type=float, default=0.0, help="Доля платежей, завершающихся отменой.")
+    parser.add_argument("--latency-ms", type=int, default=0, help="Базовая задержка ответа API.")
+    parser.add_argument("--jitter-ms", type=int, default=0, help="Случайная добавка к задержке.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Доля запросов API, отвечающих 500.")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = FakeProviderConfig(
+        public_url=args.public_url or f"http://{args.host}:{args.port}",
+        webhook_url=args.webhook_url,
+        webhook_secret=args.webhook_secret,
+        webhook_delay_ms=args.webhook_delay_ms,
+        duplicate_webhook_rate=args.duplicate_webhook_rate,
+        auto_pay_after_ms=args.auto_pay_after_ms,
+        cancel_rate=args.cancel_rate,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    uvicorn.run(create_fake_provider(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
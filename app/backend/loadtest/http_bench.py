@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from .stats import format_summary, summarize_latencies
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+BENCH_ADMIN_USERNAME = "bench_admin"
+BENCH_ADMIN_PASSWORD = "bench_password_1"
+# The dataset anchor is pinned so every run benchmarks the same rows.
+DEFAULT_ANCHOR = "2026-01-15"
+
+
+@dataclass
+class Scenario:
+    name: str
+    request: Callable[[httpx.AsyncClient, random.Random], Awaitable[httpx.Response]]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="HTTP benchmark of the public and admin API against a seeded dataset.")
+    parser.add_argument("--database-url", default="", help="БД для прогона. По умолчанию — временный SQLite-файл.")
+    parser.add_argument("--skip-seed", action="store_true", help="Не наполнять БД (для --database-url с готовыми данными).")
+    parser.add_argument("--scale", type=float, default=0.05, help="Множитель объема для generate_dataset.py.")
+    parser.add_argument("--seed", type=int, default=42, help="Seed набора данных и выбора запросов.")
+    parser.add_argument("--workers", type=int, default=1, help="Сколько процессов uvicorn поднять.")
+    parser.add_argument("--requests", type=int, default=500, help="Запросов на сценарий.")
+    parser.add_argument("--warmup", type=int, default=50, help="Прогревочных запросов на сценарий (не учитываются).")
+    parser.add_argument("--concurrency", type=int, default=16, help="Одновременных клиентов.")
+    parser.add_argument("--only", default="", help="Запустить только сценарии, в имени которых есть эта строка.")
+    parser.add_argument("--timeout", type=float, default=30.0, help="HTTP-таймаут одного запроса, сек.")
+    parser.add_argument("--output", default="", help="Сохранить результат в JSON-файл.")
+    parser.add_argument("--baseline", default="", help="JSON прошлого прогона для сравнения.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Допустимое ухудшение p95 и пропускной способности (0.2 = 20%%).")
+    return parser.parse_args()
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def seed_database(env: dict[str, str], args: argparse.Namespace) -> None:
+    # init_db creates the schema, the bench admin and the JSON catalog; the generator adds volume on top.
+    subprocess.run([sys.executable, "init_db.py"], cwd=BACKEND_DIR, env=env, check=True)
+    subprocess.run(
+        [
+            sys.executable,
+            "generate_dataset.py",
+            "--scale",
+            str(args.scale),
+            "--seed",
+            str(args.seed),
+            "--anchor",
+            DEFAULT_ANCHOR,
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+        check=True,
+    )
+
+
+def start_server(env: dict[str, str], port: int, workers: int) -> subprocess.Popen:
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "main:app",
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(port),
+        "--workers",
+        str(max(workers, 1)),
+        "--log-level",
+        "warning",
+        "--no-access-log",
+    ]
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+
+
+def wait_ready(base_url: str, server: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+        try:
+            if httpx.get(f"{base_url}/api/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("uvicorn did not become ready in time")
+
+
+async def build_scenarios(client: httpx.AsyncClient) -> list[Scenario]:
+    services = (await client.get("/api/services")).json()
+    slugs = [item["slug"] for item in services] or ["missing"]
+    schedule = (await client.get("/api/schedule")).json()
+    # Pending bookings hold no seat, so events that are open now stay open for the whole run.
+    individual_ids = [item["id"] for item in schedule if item["is_individual"] and item["available_spots"] > 0] or [0]
+
+    login = await client.post(
+        "/api/auth/login", json={"username": BENCH_ADMIN_USERNAME, "password": BENCH_ADMIN_PASSWORD}
+    )
+    login.raise_for_status()
+    admin_headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    booking_counter = iter(range(1, 10**9))
+
+    def create_booking(client: httpx.AsyncClient, rng: random.Random) -> Awaitable[httpx.Response]:
+        # Individual sessions take no online payment, so the flow needs no YooKassa stub.
+        index = next(booking_counter)
+        return client.post(
+            "/api/bookings",
+            json={
+                "schedule_id": rng.choice(individual_ids),
+                "name": f"Bench {index}",
+                "phone": f"+7998{index:07d}"[:16],
+                "email": f"bench{index}@example.com",
+                "privacy_policy": True,
+                "personal_data": True,
+                "terms": True,
+            },
+        )
+
+    return [
+        Scenario("GET /api/site", lambda client, rng: client.get("/api/site")),
+        Scenario("GET /api/services", lambda client, rng: client.get("/api/services")),
+        Scenario("GET /api/services/{slug}", lambda client, rng: client.get(f"/api/services/{rng.choice(slugs)}")),
+        Scenario("GET /api/schedule", lambda client, rng: client.get("/api/schedule")),
+        Scenario("GET /api/gallery", lambda client, rng: client.get("/api/gallery")),
+        Scenario(
+            "GET /api/admin/bookings",
+            lambda client, rng: client.get("/api/admin/bookings", params={"limit": 50}, headers=admin_headers),
+        ),
+        Scenario("POST /api/bookings", create_booking),
+    ]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    *,
+    total: int,
+    concurrency: int,
+    rng: random.Random,
+) -> dict[str, Any]:
+    latencies: list[float] = []
+    statuses: Counter[str] = Counter()
+    pending = iter(range(total))
+
+    async def worker() -> None:
+        for _ in pending:
+            started = time.perf_counter()
+            try:
+                response = await scenario.request(client, rng)
+                statuses[str(response.status_code)] += 1
+            except httpx.HTTPError as exc:
+                statuses[f"transport_{type(exc).__name__}"] += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(concurrency, 1))))
+    elapsed = time.perf_counter() - started
+    errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+    return {
+        **summarize_latencies(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "errors": errors,
+        "statuses": dict(statuses),
+    }
+
+
+async def run_all(base_url: str, args: argparse.Namespace) -> dict[str, dict[str, Any]]:
+    limits = httpx.Limits(max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency)
+    rng = random.Random(args.seed)
+    results: dict[str, dict[str, Any]] = {}
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        for scenario in await build_scenarios(client):
+            if args.only and args.only not in scenario.name:
+                continue
+            if args.warmup:
+                await run_scenario(client, scenario, total=args.warmup, concurrency=args.concurrency, rng=rng)
+            results[scenario.name] = await run_scenario(
+                client, scenario, total=args.requests, concurrency=args.concurrency, rng=rng
+            )
+            print(f"{format_summary(scenario.name, results[scenario.name])} rps={results[scenario.name]['rps']:>8.1f}")
+    return results
+
+
+def compare_with_baseline(results: dict[str, dict[str, Any]], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Human-readable regressions: p95 slower or throughput lower than the baseline by more than `tolerance`."""
+    regressions: list[str] = []
+    for name, current in results.items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']:.2f}ms -> {current['p95_ms']:.2f}ms")
+        if previous["rps"] and current["rps"] < previous["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {previous['rps']:.1f} -> {current['rps']:.1f} rps")
+        if current["errors"] > previous.get("errors", 0):
+            regressions.append(f"{name}: errors {previous.get('errors', 0)} -> {current['errors']}")
+    return regressions
+
+
+def main() -> int:
+    args = parse_args()
+    temp_path = None
+    env = dict(os.environ)
+    if args.database_url:
+        env["DATABASE_URL"] = args.database_url
+    else:
+        fd, temp_path = tempfile.mkstemp(prefix="atman_bench_", suffix=".db")
+        os.close(fd)
+        env["DATABASE_URL"] = f"sqlite:///{temp_path}"
+    env.update(
+        {
+            "ADMIN_BOOTSTRAP_USERNAME": BENCH_ADMIN_USERNAME,
+            "ADMIN_BOOTSTRAP_PASSWORD": BENCH_ADMIN_PASSWORD,
+            # The booking scenario would trip the public form limits within seconds.
+            "RATE_LIMIT_STORE": "off",
+            "METRICS_DIR": "",
+        }
+    )
+    # Under saturation every statement is "slow"; keep the console readable unless asked otherwise.
+    env.setdefault("SQL_SLOW_QUERY_MS", "0")
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = None
+    try:
+        if not args.skip_seed:
+            seed_database(env, args)
+        server = start_server(env, port, args.workers)
+        wait_ready(base_url, server)
+        results = asyncio.run(run_all(base_url, args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+        if temp_path:
+            os.remove(temp_path)
+
+    report = {
+        "meta": {
+            "date": date.today().isoformat(),
+            "python": platform.python_version(),
+            "database": "sqlite" if env["DATABASE_URL"].startswith("sqlite") else env["DATABASE_URL"].split(":", 1)[0],
+            "scale": args.scale,
+            "seed": args.seed,
+            "workers": args.workers,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "scenarios": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            regressions = compare_with_baseline(results, json.load(handle), args.tolerance)
+        if regressions:
+            print("Regressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
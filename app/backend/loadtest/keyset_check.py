@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+
+
+# Same instant (or within a millisecond) in the shapes SQLite ends up storing: plain seconds,
+# six-digit fractions from SQLAlchemy, sub-millisecond values and a value that rounds up.
+MIXED_TIMESTAMPS = [
+    "2026-01-10 10:00:00",
+    "2026-01-10 10:00:00.000000",
+    "2026-01-10 10:00:00.000400",
+    "2026-01-10 10:00:00.000900",
+    "2026-01-10 10:00:00.999700",
+    "2026-01-10 10:00:01",
+    "2026-01-10 10:00:01.500000",
+]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Keyset pagination check: every row exactly once with mixed-precision timestamps.")
+    parser.add_argument("--copies", type=int, default=3, help="Сколько раз повторить набор времен (больше совпадающих ключей).")
+    parser.add_argument("--max-limit", type=int, default=5, help="Проверить размеры страницы от 1 до этого значения.")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    fd, temp_path = tempfile.mkstemp(prefix="atman_keyset_", suffix=".db")
+    os.close(fd)
+    os.environ["DATABASE_URL"] = f"sqlite:///{temp_path}"
+
+    # Settings are read at import time, so the app is imported only after DATABASE_URL is set.
+    from fastapi import Response
+    from sqlalchemy import select, text
+
+    from app.db import Base, SessionLocal, engine
+    from app.db_migrations import normalize_sqlite_datetimes
+    from app.models import Contact
+    from app.pagination import PageParams, _after_cursor, decode_cursor, keyset_paginate, sorted_query
+    from app.routers.admin import CONTACT_SORT_KEYS
+
+    Base.metadata.create_all(bind=engine)
+    failed = False
+    try:
+        with engine.begin() as connection:
+            for _ in range(args.copies):
+                for stamp in MIXED_TIMESTAMPS:
+                    # Raw SQL keeps the stored text exactly as written.
+                    connection.execute(
+                        text(
+                            "INSERT INTO contacts (name, email, message, status, created_at, updated_at) "
+                            "VALUES ('Keyset', 'keyset@example.com', 'check', 'new', :stamp, :stamp)"
+                        ),
+                        {"stamp": stamp},
+                    )
+        normalize_sqlite_datetimes(engine)
+
+        with SessionLocal() as db:
+            expected = set(db.scalars(select(Contact.id)).all())
+            for limit in range(1, args.max_limit + 1):
+                seen: list[int] = []
+                cursor = None
+                while True:
+                    response = Response()
+                    rows = keyset_paginate(
+                        db,
+                        select(Contact),
+                        sort_keys=CONTACT_SORT_KEYS,
+                        page=PageParams(limit=limit, cursor=cursor, with_total=False),
+                        response=response,
+                    )
+                    seen.extend(row.id for row in rows)
+                    cursor = response.headers.get("x-next-cursor")
+                    if not cursor or len(seen) > len(expected):
+                        break
+                ok = len(seen) == len(expected) and set(seen) == expected
+                failed = failed or not ok
+                print(f"limit={limit}: {len(seen)}/{len(expected)} rows, {'OK' if ok else 'FAIL'} order={seen}")
+
+            # A cursor page must walk the created_at index, not scan and sort the table.
+            response = Response()
+            keyset_paginate(db, select(Contact), sort_keys=CONTACT_SORT_KEYS, page=PageParams(2, None, False), response=response)
+            cursor_values = decode_cursor(response.headers["x-next-cursor"], CONTACT_SORT_KEYS)
+            page_query = sorted_query(select(Contact), CONTACT_SORT_KEYS).where(_after_cursor(CONTACT_SORT_KEYS, cursor_values)).limit(3)
+            compiled = page_query.compile(engine, compile_kwargs={"literal_binds": True})
+            plan = " | ".join(row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {compiled}")))
+            indexed = "ix_contacts_created" in plan and "TEMP B-TREE" not in plan
+            failed = failed or not indexed
+            print(f"plan: {plan} -> {'OK' if indexed else 'FAIL'}")
+    finally:
+        engine.dispose()
+        os.remove(temp_path)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
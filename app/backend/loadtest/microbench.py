@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.pool import StaticPool
+
+
+@dataclass
+class Case:
+    name: str
+    # One call of `run` processes `calls` inputs; results are reported per input.
+    run: Callable[[], Any]
+    calls: int
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Microbenchmarks of hot pure functions: time and allocations per call.")
+    parser.add_argument("--repeat", type=int, default=7, help="Сколько замеров сделать (берется медиана и минимум).")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Минимальная длительность одного замера, сек.")
+    parser.add_argument("--only", default="", help="Запустить только кейсы, в имени которых есть эта строка.")
+    parser.add_argument("--output", default="", help="Сохранить результат в JSON-файл.")
+    parser.add_argument("--baseline", default="", help="JSON прошлого прогона для сравнения.")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Допустимое ухудшение времени и памяти (0.15 = 15%%).")
+    return parser.parse_args()
+
+
+def load_inputs() -> dict[str, Any]:
+    """Real ORM rows built from data/*.json by the seed code, in a private in-memory database."""
+    from app.db import Base
+    from app.models import ScheduleEvent, Service, Setting
+    from seed_from_json import seed_schedule, seed_services, seed_site
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    with Session(engine, expire_on_commit=False) as db:
+        seed_site(db)
+        service_map = seed_services(db)
+        seed_schedule(db, service_map)
+        db.commit()
+        settings_rows = list(db.scalars(select(Setting).where(Setting.is_public.is_(True))).all())
+        services = list(db.scalars(select(Service).order_by(Service.id)).all())
+        events = list(
+            db.scalars(select(ScheduleEvent).options(joinedload(ScheduleEvent.service)).order_by(ScheduleEvent.id)).all()
+        )
+    return {"settings_rows": settings_rows, "services": services, "events": events}
+
+
+def build_cases(inputs: dict[str, Any]) -> list[Case]:
+    from app.certificates import calculate_certificate_expires_at, normalize_certificate_validity
+    from app.models import AdminUser
+    from app.routers.public import _extract_group_price, _schedule_to_public, _serialize_site, _service_to_public
+    from app.security import create_access_token, decode_access_token
+
+    settings_rows = inputs["settings_rows"]
+    services = inputs["services"]
+    events = inputs["events"]
+    admin = AdminUser(id=1, username="admin", role="admin", password_hash="", is_active=True)
+    token = create_access_token(admin)
+    validity_inputs = [("3m", None), ("1m", None), ("custom_days", 45), ("custom_days", 0), ("", None), ("unknown", 10)]
+    issued_dates = [datetime(2026, month, day, 12, 30) for month in range(1, 13) for day in (1, 15, 28)]
+    expiry_inputs = [(issued, mode, days) for issued in issued_dates for mode, days in validity_inputs]
+
+    return [
+        Case("_serialize_site", lambda: _serialize_site(settings_rows), 1),
+        Case("_service_to_public", lambda: [_service_to_public(item) for item in services], len(services)),
+        Case("_schedule_to_public", lambda: [_schedule_to_public(item) for item in events], len(events)),
+        Case(
+            "_extract_group_price",
+            lambda: [_extract_group_price(item.service, item) for item in events],
+            len(events),
+        ),
+        Case(
+            "normalize_certificate_validity",
+            lambda: [normalize_certificate_validity(mode, days) for mode, days in validity_inputs],
+            len(validity_inputs),
+        ),
+        Case(
+            "calculate_certificate_expires_at",
+            lambda: [calculate_certificate_expires_at(issued, mode, days) for issued, mode, days in expiry_inputs],
+            len(expiry_inputs),
+        ),
+        Case("create_access_token", lambda: create_access_token(admin), 1),
+        Case("decode_access_token", lambda: decode_access_token(token), 1),
+    ]
+
+
+def time_case(case: Case, repeat: int, min_time: float) -> dict[str, float]:
+    """Per-input time in microseconds, timeit-style: calibrate a loop count, then take `repeat` samples."""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            case.run()
+        if time.perf_counter() - started >= min_time / 5:
+            break
+        loops *= 2
+    samples: list[float] = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            for _ in range(loops * 5):
+                case.run()
+            samples.append((time.perf_counter() - started) / (loops * 5 * case.calls) * 1e6)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {"median_us": round(statistics.median(samples), 3), "min_us": round(min(samples), 3)}
+
+
+def measure_allocations(case: Case) -> dict[str, float]:
+    """Peak traced memory during one call and what the result keeps alive, per input."""
+    case.run()  # warm caches so one-off imports and interned strings are not counted
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = case.run()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return {
+        "peak_bytes": round((peak - before) / case.calls, 1),
+        "retained_bytes": round((current - before) / case.calls, 1),
+    }
+
+
+def compare_with_baseline(results: dict[str, dict[str, float]], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    regressions: list[str] = []
+    for name, current in results.items():
+        previous = baseline.get("cases", {}).get(name)
+        if not previous:
+            continue
+        for metric, unit in (("median_us", "us"), ("peak_bytes", "B")):
+            if previous[metric] and current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {previous[metric]:.2f}{unit} -> {current[metric]:.2f}{unit}")
+    return regressions
+
+
+def main() -> int:
+    args = parse_args()
+    cases = [case for case in build_cases(load_inputs()) if not args.only or args.only in case.name]
+
+    results: dict[str, dict[str, float]] = {}
+    for case in cases:
+        results[case.name] = {"inputs": case.calls, **time_case(case, args.repeat, args.min_time), **measure_allocations(case)}
+        row = results[case.name]
+        print(
+            f"{case.name:<34} median={row['median_us']:>9.2f}us min={row['min_us']:>9.2f}us "
+            f"peak={row['peak_bytes']:>10.0f}B retained={row['retained_bytes']:>10.0f}B"
+        )
+
+    report = {"meta": {"python": sys.version.split()[0], "repeat": args.repeat}, "cases": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            regressions = compare_with_baseline(results, json.load(handle), args.tolerance)
+        if regressions:
+            print("Regressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter, defaultdict
+from typing import Any
+
+import httpx
+
+from .stats import format_summary, summarize_latencies
+
+TERMINAL_PAYMENT_STATUSES = {"succeeded", "canceled", "cancelled"}
+
+
+class FunnelRun:
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.outcomes: Counter[str] = Counter()
+
+    async def timed(self, step: str, call) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            return await call
+        finally:
+            self.latencies[step].append((time.perf_counter() - started) * 1000)
+
+
+async def run_funnel(
+    index: int,
+    *,
+    client: httpx.AsyncClient,
+    run: FunnelRun,
+    args: argparse.Namespace,
+    rng: random.Random,
+) -> None:
+    services = await run.timed("GET /api/services", client.get("/api/services"))
+    if services.status_code != 200:
+        run.outcomes[f"services_{services.status_code}"] += 1
+        return
+
+    schedule = await run.timed("GET /api/schedule", client.get("/api/schedule"))
+    if schedule.status_code != 200:
+        run.outcomes[f"schedule_{schedule.status_code}"] += 1
+        return
+
+    candidates = [
+        item
+        for item in schedule.json()
+        if not item["is_individual"] and item["available_spots"] > 0
+        and (not args.schedule_id or item["id"] == args.schedule_id)
+    ]
+    if not candidates:
+        run.outcomes["sold_out_before_booking"] += 1
+        return
+    event = rng.choice(candidates)
+
+    booking = await run.timed(
+        "POST /api/bookings",
+        client.post(
+            "/api/bookings",
+            json={
+                "schedule_id": event["id"],
+                "name": f"Load Test {index}",
+                "phone": f"+7999{index:07d}"[:16],
+                "email": f"load{index}@example.com",
+                "privacy_policy": True,
+                "personal_data": True,
+                "terms": True,
+            },
+        ),
+    )
+    if booking.status_code != 200:
+        run.outcomes[f"booking_{booking.status_code}"] += 1
+        return
+    booking_payload: dict[str, Any] = booking.json()
+    payment_id = booking_payload.get("payment_id")
+    confirmation_url = booking_payload.get("confirmation_url")
+    if not payment_id or not confirmation_url:
+        run.outcomes["booking_without_payment"] += 1
+        return
+
+    checkout = await run.timed("GET confirmation_url", client.get(confirmation_url))
+    if checkout.status_code != 200:
+        run.outcomes[f"checkout_{checkout.status_code}"] += 1
+        return
+
+    deadline = time.monotonic() + args.settle_timeout
+    status_payload: dict[str, Any] = {}
+    while time.monotonic() < deadline:
+        await asyncio.sleep(args.poll_interval)
+        status = await run.timed(
+            "GET /api/payments/{id}/status",
+            client.get(f"/api/payments/{payment_id}/status"),
+        )
+        if status.status_code != 200:
+            continue
+        status_payload = status.json()
+        if status_payload.get("status") in TERMINAL_PAYMENT_STATUSES:
+            break
+
+    if status_payload.get("status") in TERMINAL_PAYMENT_STATUSES:
+        run.outcomes[f"payment_{status_payload['status']}_booking_{status_payload.get('booking_status')}"] += 1
+    else:
+        run.outcomes["payment_not_settled"] += 1
+
+
+async def main_async(args: argparse.Namespace) -> dict[str, Any]:
+    run = FunnelRun()
+    rng = random.Random(args.seed)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    limits = httpx.Limits(max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.api_base, timeout=args.timeout, limits=limits) as client:
+
+        async def guarded(index: int) -> None:
+            async with semaphore:
+                try:
+                    await run_funnel(index, client=client, run=run, args=args, rng=rng)
+                except httpx.HTTPError as exc:
+                    run.outcomes[f"transport_{type(exc).__name__}"] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(guarded(index) for index in range(args.funnels)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "funnels": args.funnels,
+        "concurrency": args.concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "funnels_per_s": round(args.funnels / elapsed, 3) if elapsed else 0.0,
+        "outcomes": dict(run.outcomes),
+        "steps": {step: summarize_latencies(values) for step, values in run.latencies.items()},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Drive booking -> payment -> webhook funnels against a running backend.")
+    parser.add_argument("--api-base", default="http://127.0.0.1:8000")
+    parser.add_argument("--funnels", type=int, default=100, help="Сколько покупок прогнать.")
+    parser.add_argument("--concurrency", type=int, default=10, help="Сколько покупок идет одновременно.")
+    parser.add_argument("--schedule-id", type=int, default=0, help="Бронировать только это событие (0 — любое групповое).")
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="Пауза между проверками статуса, сек.")
+    parser.add_argument("--settle-timeout", type=float, default=15.0, help="Сколько ждать финального статуса, сек.")
+    parser.add_argument("--timeout", type=float, default=30.0, help="HTTP-таймаут одного запроса, сек.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="", help="Сохранить итог в JSON-файл.")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    print(f"funnels={report['funnels']} elapsed={report['elapsed_s']}s throughput={report['funnels_per_s']} funnels/s")
+    for outcome, count in sorted(report["outcomes"].items()):
+        print(f"  {outcome}: {count}")
+    for step, summary in report["steps"].items():
+        print(format_summary(step, summary))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
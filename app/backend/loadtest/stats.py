@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Iterable
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile over an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize_latencies(values_ms: Iterable[float]) -> dict[str, float]:
+    ordered = sorted(values_ms)
+    if not ordered:
+        return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered), 3),
+        "p50_ms": round(percentile(ordered, 50), 3),
+        "p95_ms": round(percentile(ordered, 95), 3),
+        "p99_ms": round(percentile(ordered, 99), 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def format_summary(name: str, summary: dict[str, float]) -> str:
+    return (
+        f"{name:<28} n={int(summary['count']):<6} mean={summary['mean_ms']:>8.2f}ms "
+        f"p50={summary['p50_ms']:>8.2f}ms p95={summary['p95_ms']:>8.2f}ms "
+        f"p99={summary['p99_ms']:>8.2f}ms max={summary['max_ms']:>8.2f}ms"
+    )
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Concurrent seat reservation stress test (no overbooking check).")
+    parser.add_argument("--database-url", default="", help="БД для прогона. По умолчанию — временный SQLite-файл.")
+    parser.add_argument("--seats", type=int, default=20, help="Вместимость тестового события.")
+    parser.add_argument("--attempts", type=int, default=500, help="Сколько параллельных попыток занять место.")
+    parser.add_argument("--threads", type=int, default=64, help="Размер пула потоков.")
+    parser.add_argument("--rounds", type=int, default=3, help="Сколько раз повторить прогон.")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    temp_path = None
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        fd, temp_path = tempfile.mkstemp(prefix="atman_stress_", suffix=".db")
+        os.close(fd)
+        os.environ["DATABASE_URL"] = f"sqlite:///{temp_path}"
+
+    # Settings are read at import time, so the app is imported only after DATABASE_URL is set.
+    from app.db import Base, SessionLocal, engine
+    from app.models import ScheduleEvent, Service
+    from app.services.seats import release_seats, reserve_seats
+
+    Base.metadata.create_all(bind=engine)
+    failed = False
+
+    try:
+        for round_no in range(1, args.rounds + 1):
+            db = SessionLocal()
+            try:
+                service = Service(slug=f"stress-{time.time_ns()}", title="Stress test service")
+                db.add(service)
+                db.flush()
+                start = datetime.now(timezone.utc) + timedelta(days=1)
+                event = ScheduleEvent(
+                    service_id=service.id,
+                    start_time=start,
+                    end_time=start + timedelta(hours=1),
+                    max_participants=args.seats,
+                    current_participants=0,
+                )
+                db.add(event)
+                db.commit()
+                event_id = event.id
+            finally:
+                db.close()
+
+            barrier = threading.Barrier(min(args.threads, args.attempts))
+
+            def attempt(index: int) -> tuple[bool, bool]:
+                if index < barrier.parties:
+                    barrier.wait()
+                session = SessionLocal()
+                try:
+                    reserved = reserve_seats(session, event_id)
+                    session.commit()
+                    released = False
+                    # Every fourth winner cancels right away to interleave decrements with increments.
+                    if reserved and index % 4 == 0:
+                        release_seats(session, event_id)
+                        session.commit()
+                        released = True
+                    return reserved, released
+                finally:
+                    session.close()
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.threads) as pool:
+                outcomes = list(pool.map(attempt, range(args.attempts)))
+            elapsed = time.perf_counter() - started
+
+            reserved_total = sum(1 for reserved, _ in outcomes if reserved)
+            released_total = sum(1 for _, released in outcomes if released)
+
+            db = SessionLocal()
+            try:
+                final = db.get(ScheduleEvent, event_id)
+                current = final.current_participants if final else -1
+            finally:
+                db.close()
+
+            expected = reserved_total - released_total
+            ok = current == expected and 0 <= current <= args.seats
+            failed = failed or not ok
+            print(
+                f"round {round_no}: attempts={args.attempts} reserved={reserved_total} released={released_total} "
+                f"counter={current}/{args.seats} elapsed={elapsed:.2f}s -> {'OK' if ok else 'OVERBOOKED/INCONSISTENT'}"
+            )
+    finally:
+        engine.dispose()
+        if temp_path:
+            os.remove(temp_path)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
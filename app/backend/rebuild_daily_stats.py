@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from app.analytics import rebuild_daily_stats
+from app.db import Base, SessionLocal, engine
+from app.db_migrations import ensure_declared_indexes
+
+
+def main() -> None:
+    Base.metadata.create_all(bind=engine)
+    ensure_declared_indexes(engine)
+
+    db = SessionLocal()
+    try:
+        written = rebuild_daily_stats(db)
+        print(f"Daily service stats rebuilt: {written} rows")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import argparse
+
+from app.db import Base, SessionLocal, engine
+from app.db_migrations import ensure_declared_indexes
+from app.search_index import rebuild_search_index
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the admin search token index from scratch.")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Сколько строк индексировать за один проход.")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    ensure_declared_indexes(engine)
+
+    db = SessionLocal()
+    try:
+        written = rebuild_search_index(db, batch_size=args.batch_size)
+        print(f"Search tokens written: {written}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ import CertificatePurchasePage from "./pages/CertificatePurchasePage";
 import CertificatePublicPage from "./pages/CertificatePublicPage";
 import AdminLayout from "./admin/AdminLayout";
 import AdminDashboardPage from "./admin/AdminDashboardPage";
+import AdminAnalyticsPage from "./admin/AdminAnalyticsPage";
 import AdminServicesPage from "./admin/AdminServicesPage";
 import AdminSchedulePage from "./admin/AdminSchedulePage";
 import AdminGalleryPage from "./admin/AdminGalleryPage";
@@ -110,6 +111,7 @@ export default function App() {
         <Route path="/admin" element={<AdminLayout />}>
           <Route index element={<Navigate to="/admin/dashboard" replace />} />
           <Route path="dashboard" element={<AdminDashboardPage />} />
+          <Route path="analytics" element={<AdminAnalyticsPage />} />
           <Route path="services" element={<AdminServicesPage />} />
           <Route path="schedule" element={<AdminSchedulePage />} />
           <Route path="gallery" element={<AdminGalleryPage />} />
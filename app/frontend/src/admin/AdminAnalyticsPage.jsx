@@ -0,0 +1,157 @@
+import { useEffect, useState } from "react";
+import { adminAnalytics, adminListServices } from "../api";
+import AdminSelect from "./AdminSelect";
+
+const GROUP_OPTIONS = [
+  { value: "month", label: "По месяцам" },
+  { value: "week", label: "По неделям" },
+  { value: "day", label: "По дням" }
+];
+
+function formatAmount(value) {
+  return `${new Intl.NumberFormat("ru-RU").format(Number(value || 0))} руб.`;
+}
+
+function formatRate(value) {
+  return value === null || value === undefined ? "-" : `${Math.round(value * 100)}%`;
+}
+
+function formatPeriod(value, groupBy) {
+  const date = new Date(`${value}T00:00:00`);
+  if (groupBy === "month") return date.toLocaleDateString("ru-RU", { month: "long", year: "numeric" });
+  if (groupBy === "week") return `неделя с ${date.toLocaleDateString("ru-RU")}`;
+  return date.toLocaleDateString("ru-RU");
+}
+
+export default function AdminAnalyticsPage() {
+  const [data, setData] = useState(null);
+  const [services, setServices] = useState([]);
+  const [filters, setFilters] = useState({ group_by: "month", service_id: "", date_from: "", date_to: "" });
+  const [loading, setLoading] = useState(true);
+  const [error, setError] = useState("");
+
+  async function load() {
+    setLoading(true);
+    try {
+      const [analyticsData, servicesData] = await Promise.all([adminAnalytics(filters), adminListServices()]);
+      setData(analyticsData);
+      setServices(servicesData);
+      setError("");
+    } catch (err) {
+      setError(err.message || "Не удалось загрузить аналитику.");
+    } finally {
+      setLoading(false);
+    }
+  }
+
+  useEffect(() => {
+    load();
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, []);
+
+  const totals = data?.totals;
+
+  return (
+    <section>
+      <header className="admin-head">
+        <div>
+          <h1>Аналитика</h1>
+          {data ? <p className="muted">{data.date_from} — {data.date_to}</p> : null}
+        </div>
+      </header>
+
+      <form
+        className="admin-toolbar"
+        onSubmit={(event) => {
+          event.preventDefault();
+          load();
+        }}
+      >
+        <AdminSelect
+          value={filters.group_by}
+          onChange={(nextValue) => setFilters((prev) => ({ ...prev, group_by: String(nextValue) }))}
+          options={GROUP_OPTIONS}
+        />
+        <AdminSelect
+          value={filters.service_id}
+          onChange={(nextValue) => setFilters((prev) => ({ ...prev, service_id: String(nextValue) }))}
+          options={[
+            { value: "", label: "Все услуги" },
+            ...services.map((service) => ({ value: String(service.id), label: service.title }))
+          ]}
+        />
+        <input
+          type="date"
+          value={filters.date_from}
+          onChange={(event) => setFilters((prev) => ({ ...prev, date_from: event.target.value }))}
+        />
+        <input
+          type="date"
+          value={filters.date_to}
+          onChange={(event) => setFilters((prev) => ({ ...prev, date_to: event.target.value }))}
+        />
+        <button type="submit" className="btn-main small">Применить</button>
+      </form>
+
+      {error ? <p className="err">{error}</p> : null}
+      {loading ? <p className="muted">Загрузка...</p> : null}
+
+      <div className="admin-kpi-grid">
+        <article className="admin-kpi-card">
+          <p>Оплачено</p>
+          <strong>{formatAmount(totals?.paid_amount)}</strong>
+        </article>
+        <article className="admin-kpi-card">
+          <p>Заполняемость</p>
+          <strong>{formatRate(totals?.fill_rate)}</strong>
+        </article>
+        <article className="admin-kpi-card">
+          <p>Брони / отмены</p>
+          <strong>{totals?.bookings ?? 0} / {totals?.cancelled_bookings ?? 0}</strong>
+        </article>
+        <article className="admin-kpi-card">
+          <p>События</p>
+          <strong>{totals?.events ?? 0}</strong>
+        </article>
+      </div>
+
+      {!loading && data ? (
+        <div className="admin-table-wrap">
+          <table className="admin-table">
+            <thead>
+              <tr>
+                <th>Период</th>
+                <th>Услуга</th>
+                <th>События</th>
+                <th>Места</th>
+                <th>Подтверждено</th>
+                <th>Заполняемость</th>
+                <th>Брони / отмены</th>
+                <th>Оплачено</th>
+              </tr>
+            </thead>
+            <tbody>
+              {data.rows.length === 0 ? (
+                <tr>
+                  <td colSpan={8} className="muted">Нет данных за период.</td>
+                </tr>
+              ) : null}
+              {data.rows.map((row) => (
+                <tr key={`${row.period}-${row.service_id}`}>
+                  <td>{formatPeriod(row.period, data.group_by)}</td>
+                  <td>{row.service_title}</td>
+                  <td>{row.events}</td>
+                  <td>{row.capacity}</td>
+                  <td>{row.confirmed_seats}</td>
+                  <td>{formatRate(row.fill_rate)}</td>
+                  <td>{row.bookings} / {row.cancelled_bookings}</td>
+                  <td>{formatAmount(row.paid_amount)}</td>
+                </tr>
+              ))}
+            </tbody>
+          </table>
+        </div>
+      ) : null}
+    </section>
+  );
+}
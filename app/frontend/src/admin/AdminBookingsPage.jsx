@@ -1,8 +1,12 @@
 import { useEffect, useMemo, useState } from "react";
 import {
+  adminBulkDeleteBookings,
+  adminBulkUpdateBookingStatus,
   adminDeleteBooking,
+  adminExportBookings,
   adminListBookings,
   adminListServices,
+  adminSubscribeEvents,
   adminUpdateBookingStatus
 } from "../api";
 import AdminSelect from "./AdminSelect";
@@ -25,6 +29,7 @@ export default function AdminBookingsPage() {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
   const [message, setMessage] = useState("");
+  const [freshCount, setFreshCount] = useState(0);
   const [filters, setFilters] = useState({
     status: "",
     service_id: "",
@@ -33,21 +38,29 @@ export default function AdminBookingsPage() {
     date_to: ""
   });
   const [statusDraft, setStatusDraft] = useState({});
+  const [checked, setChecked] = useState([]);
+  const [bulkStatus, setBulkStatus] = useState("confirmed");
+
+  function currentParams() {
+    return {
+      status: filters.status,
+      service_id: filters.service_id,
+      search: filters.search,
+      date_from: toApiDate(filters.date_from, false),
+      date_to: toApiDate(filters.date_to, true)
+    };
+  }
 
   async function load() {
     setLoading(true);
     try {
-      const params = {
-        status: filters.status,
-        service_id: filters.service_id,
-        search: filters.search,
-        date_from: toApiDate(filters.date_from, false),
-        date_to: toApiDate(filters.date_to, true)
-      };
+      const params = currentParams();
       const [bookingsData, servicesData] = await Promise.all([adminListBookings(params), adminListServices()]);
       setRows(bookingsData);
       setServices(servicesData);
       setStatusDraft(Object.fromEntries(bookingsData.map((item) => [item.id, item.status])));
+      setChecked([]);
+      setFreshCount(0);
       setError("");
     } catch (err) {
       setError(err.message || "Не удалось загрузить бронирования.");
@@ -61,6 +74,15 @@ export default function AdminBookingsPage() {
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, []);
 
+  // New rows are announced instead of reloaded so unsaved status drafts and selections survive.
+  useEffect(() => {
+    return adminSubscribeEvents((event) => {
+      if (event.type === "booking.created" || event.type === "booking.payment") {
+        setFreshCount((prev) => prev + 1);
+      }
+    });
+  }, []);
+
   const activeFiltersCount = useMemo(() => {
     return Object.values(filters).filter(Boolean).length;
   }, [filters]);
@@ -104,6 +126,43 @@ export default function AdminBookingsPage() {
     }
   }
 
+  function toggleChecked(id) {
+    setChecked((prev) => (prev.includes(id) ? prev.filter((item) => item !== id) : [...prev, id]));
+  }
+
+  function toggleAll() {
+    setChecked((prev) => (prev.length === rows.length ? [] : rows.map((item) => item.id)));
+  }
+
+  async function onBulkStatus() {
+    try {
+      await adminBulkUpdateBookingStatus(checked, bulkStatus);
+      setMessage(`Статус обновлен у ${checked.length} заявок.`);
+      await load();
+    } catch (err) {
+      setError(err.message || "Не удалось обновить статусы.");
+    }
+  }
+
+  async function onBulkDelete() {
+    if (!window.confirm(`Удалить выбранные бронирования (${checked.length})?`)) return;
+    try {
+      await adminBulkDeleteBookings(checked);
+      setMessage(`Удалено бронирований: ${checked.length}.`);
+      await load();
+    } catch (err) {
+      setError(err.message || "Не удалось удалить бронирования.");
+    }
+  }
+
+  async function onExport(format) {
+    try {
+      await adminExportBookings(currentParams(), format);
+    } catch (err) {
+      setError(err.message || "Не удалось выгрузить данные.");
+    }
+  }
+
   return (
     <section>
       <header className="admin-head">
@@ -111,6 +170,10 @@ export default function AdminBookingsPage() {
           <h1>Бронирования</h1>
           <p className="muted">Найдено: {rows.length}</p>
         </div>
+        <div className="admin-head-actions">
+          <button type="button" className="admin-ghost-btn" onClick={() => onExport("csv")}>CSV</button>
+          <button type="button" className="admin-ghost-btn" onClick={() => onExport("xlsx")}>Excel</button>
+        </div>
       </header>
 
       <form className="admin-toolbar admin-toolbar-bookings" onSubmit={applyFilters}>
@@ -156,13 +219,40 @@ export default function AdminBookingsPage() {
 
       {error ? <p className="err">{error}</p> : null}
       {message ? <p className="ok">{message}</p> : null}
+      {freshCount ? (
+        <div className="admin-bulk-bar">
+          <span className="muted">Новые события по записям: {freshCount}</span>
+          <button type="button" className="btn-main small" onClick={load}>Обновить</button>
+        </div>
+      ) : null}
       {loading ? <p className="muted">Загрузка...</p> : null}
 
+      {checked.length ? (
+        <div className="admin-bulk-bar">
+          <span className="muted">Выбрано: {checked.length}</span>
+          <AdminSelect
+            value={bulkStatus}
+            onChange={setBulkStatus}
+            options={BOOKING_STATUSES.map((status) => ({ value: status, label: status }))}
+          />
+          <button type="button" className="btn-main small" onClick={onBulkStatus}>Сменить статус</button>
+          <button type="button" className="danger" onClick={onBulkDelete}>Удалить выбранные</button>
+        </div>
+      ) : null}
+
       {!loading ? (
         <div className="admin-table-wrap">
           <table className="admin-table admin-bookings-table">
             <thead>
               <tr>
+                <th className="admin-check-cell">
+                  <input
+                    type="checkbox"
+                    checked={rows.length > 0 && checked.length === rows.length}
+                    onChange={toggleAll}
+                    aria-label="Выбрать все"
+                  />
+                </th>
                 <th>ID</th>
                 <th>Клиент</th>
                 <th>Услуга и дата</th>
@@ -174,6 +264,9 @@ export default function AdminBookingsPage() {
             <tbody>
               {rows.map((item) => (
                 <tr key={item.id}>
+                  <td className="admin-check-cell">
+                    <input type="checkbox" checked={checked.includes(item.id)} onChange={() => toggleChecked(item.id)} />
+                  </td>
                   <td>{item.id}</td>
                   <td>
                     <strong>{item.name}</strong>
@@ -1,5 +1,5 @@
 import { useEffect, useState } from "react";
-import { adminListCertificates, adminUpdateCertificate } from "../api";
+import { adminExportCertificates, adminListCertificates, adminUpdateCertificate } from "../api";
 import AdminSelect from "./AdminSelect";
 
 const STATUS_OPTIONS = [
@@ -120,6 +120,14 @@ export default function AdminCertificatesPage() {
     }
   }
 
+  async function onExport(format) {
+    try {
+      await adminExportCertificates({ status: statusFilter, search }, format);
+    } catch (err) {
+      setError(err.message || "Не удалось выгрузить данные.");
+    }
+  }
+
   return (
     <section>
       <header className="admin-head">
@@ -127,6 +135,10 @@ export default function AdminCertificatesPage() {
           <h1>Сертификаты</h1>
           <p className="muted">Всего: {rows.length}</p>
         </div>
+        <div className="admin-head-actions">
+          <button type="button" className="admin-ghost-btn" onClick={() => onExport("csv")}>CSV</button>
+          <button type="button" className="admin-ghost-btn" onClick={() => onExport("xlsx")}>Excel</button>
+        </div>
       </header>
 
       <form
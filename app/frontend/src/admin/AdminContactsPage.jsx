@@ -1,7 +1,10 @@
 import { useEffect, useState } from "react";
 import {
+  adminBulkUpdateContactStatus,
   adminDeleteContact,
+  adminExportContacts,
   adminListContacts,
+  adminSubscribeEvents,
   adminUpdateContactStatus
 } from "../api";
 import AdminSelect from "./AdminSelect";
@@ -27,22 +30,31 @@ export default function AdminContactsPage() {
     date_to: ""
   });
   const [statusDraft, setStatusDraft] = useState({});
+  const [checked, setChecked] = useState([]);
+  const [bulkStatus, setBulkStatus] = useState("read");
   const [selected, setSelected] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
   const [message, setMessage] = useState("");
+  const [freshCount, setFreshCount] = useState(0);
+
+  function currentParams() {
+    return {
+      status: filters.status,
+      search: filters.search,
+      date_from: toApiDate(filters.date_from, false),
+      date_to: toApiDate(filters.date_to, true)
+    };
+  }
 
   async function load() {
     setLoading(true);
     try {
-      const contactsData = await adminListContacts({
-        status: filters.status,
-        search: filters.search,
-        date_from: toApiDate(filters.date_from, false),
-        date_to: toApiDate(filters.date_to, true)
-      });
+      const contactsData = await adminListContacts(currentParams());
       setRows(contactsData);
       setStatusDraft(Object.fromEntries(contactsData.map((item) => [item.id, item.status])));
+      setChecked([]);
+      setFreshCount(0);
       setError("");
     } catch (err) {
       setError(err.message || "Не удалось загрузить сообщения.");
@@ -56,6 +68,15 @@ export default function AdminContactsPage() {
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, []);
 
+  // New rows are announced instead of reloaded so unsaved status drafts and selections survive.
+  useEffect(() => {
+    return adminSubscribeEvents((event) => {
+      if (event.type === "contact.created") {
+        setFreshCount((prev) => prev + 1);
+      }
+    });
+  }, []);
+
   async function applyFilters(event) {
     event.preventDefault();
     await load();
@@ -88,6 +109,32 @@ export default function AdminContactsPage() {
     }
   }
 
+  function toggleChecked(id) {
+    setChecked((prev) => (prev.includes(id) ? prev.filter((item) => item !== id) : [...prev, id]));
+  }
+
+  function toggleAll() {
+    setChecked((prev) => (prev.length === rows.length ? [] : rows.map((item) => item.id)));
+  }
+
+  async function onBulkStatus() {
+    try {
+      await adminBulkUpdateContactStatus(checked, bulkStatus);
+      setMessage(`Статус обновлен у ${checked.length} сообщений.`);
+      await load();
+    } catch (err) {
+      setError(err.message || "Не удалось обновить статусы.");
+    }
+  }
+
+  async function onExport(format) {
+    try {
+      await adminExportContacts(currentParams(), format);
+    } catch (err) {
+      setError(err.message || "Не удалось выгрузить данные.");
+    }
+  }
+
   return (
     <section>
       <header className="admin-head">
@@ -95,6 +142,10 @@ export default function AdminContactsPage() {
           <h1>Сообщения</h1>
           <p className="muted">Найдено: {rows.length}</p>
         </div>
+        <div className="admin-head-actions">
+          <button type="button" className="admin-ghost-btn" onClick={() => onExport("csv")}>CSV</button>
+          <button type="button" className="admin-ghost-btn" onClick={() => onExport("xlsx")}>Excel</button>
+        </div>
       </header>
 
       <form className="admin-toolbar admin-toolbar-contacts" onSubmit={applyFilters}>
@@ -128,13 +179,39 @@ export default function AdminContactsPage() {
 
       {error ? <p className="err">{error}</p> : null}
       {message ? <p className="ok">{message}</p> : null}
+      {freshCount ? (
+        <div className="admin-bulk-bar">
+          <span className="muted">Новые сообщения: {freshCount}</span>
+          <button type="button" className="btn-main small" onClick={load}>Обновить</button>
+        </div>
+      ) : null}
       {loading ? <p className="muted">Загрузка...</p> : null}
 
+      {checked.length ? (
+        <div className="admin-bulk-bar">
+          <span className="muted">Выбрано: {checked.length}</span>
+          <AdminSelect
+            value={bulkStatus}
+            onChange={setBulkStatus}
+            options={CONTACT_STATUSES.map((status) => ({ value: status, label: status }))}
+          />
+          <button type="button" className="btn-main small" onClick={onBulkStatus}>Сменить статус</button>
+        </div>
+      ) : null}
+
       {!loading ? (
         <div className="admin-table-wrap">
           <table className="admin-table admin-contacts-table">
             <thead>
               <tr>
+                <th className="admin-check-cell">
+                  <input
+                    type="checkbox"
+                    checked={rows.length > 0 && checked.length === rows.length}
+                    onChange={toggleAll}
+                    aria-label="Выбрать все"
+                  />
+                </th>
                 <th>ID</th>
                 <th>Контакт</th>
                 <th>Сообщение</th>
@@ -146,6 +223,9 @@ export default function AdminContactsPage() {
             <tbody>
               {rows.map((item) => (
                 <tr key={item.id}>
+                  <td className="admin-check-cell">
+                    <input type="checkbox" checked={checked.includes(item.id)} onChange={() => toggleChecked(item.id)} />
+                  </td>
                   <td>{item.id}</td>
                   <td>
                     <strong>{item.name}</strong>
@@ -1,5 +1,5 @@
 import { useEffect, useState } from "react";
-import { adminDashboardStats, adminListBookings, adminListContacts } from "../api";
+import { adminDashboardStats, adminListBookings, adminListContacts, adminSubscribeEvents } from "../api";
 
 function formatDateTime(value) {
   if (!value) return "-";
@@ -14,13 +14,15 @@ export default function AdminDashboardPage() {
   const [error, setError] = useState("");
 
   useEffect(() => {
-    async function load() {
-      setLoading(true);
+    let reloadTimer = null;
+
+    async function load(quiet = false) {
+      if (!quiet) setLoading(true);
       try {
         const [statsData, bookingsData, contactsData] = await Promise.all([
           adminDashboardStats(),
-          adminListBookings(),
-          adminListContacts({ status: "new" })
+          adminListBookings({ limit: 8 }),
+          adminListContacts({ status: "new", limit: 8 })
         ]);
         setStats(statsData);
         setBookings(bookingsData.slice(0, 8));
@@ -33,6 +35,15 @@ export default function AdminDashboardPage() {
       }
     }
     load();
+    // Coalesce bursts of events (e.g. a webhook right after a booking) into one refresh.
+    const unsubscribe = adminSubscribeEvents(() => {
+      clearTimeout(reloadTimer);
+      reloadTimer = setTimeout(() => load(true), 500);
+    });
+    return () => {
+      clearTimeout(reloadTimer);
+      unsubscribe();
+    };
   }, []);
 
   return (
@@ -180,6 +180,7 @@ export default function AdminLayout() {
 
         <nav className="admin-nav">
           <NavLink to="/admin/dashboard">Dashboard</NavLink>
+          <NavLink to="/admin/analytics">Аналитика</NavLink>
           <NavLink to="/admin/services">Услуги</NavLink>
           <NavLink to="/admin/schedule">Расписание</NavLink>
           <NavLink to="/admin/gallery">Галерея</NavLink>
@@ -6,6 +6,7 @@ import {
   adminUpdateSchedule,
   adminListServices
 } from "../api";
+import AdminScheduleSeriesModal from "./AdminScheduleSeriesModal";
 import AdminSelect from "./AdminSelect";
 
 const initialForm = {
@@ -55,6 +56,7 @@ export default function AdminSchedulePage() {
   const [form, setForm] = useState(initialForm);
   const [editingId, setEditingId] = useState(null);
   const [modalOpen, setModalOpen] = useState(false);
+  const [seriesOpen, setSeriesOpen] = useState(false);
   const [viewMode, setViewMode] = useState("cards");
   const [query, setQuery] = useState("");
   const [typeFilter, setTypeFilter] = useState("all");
@@ -237,9 +239,14 @@ export default function AdminSchedulePage() {
           <h1>Расписание</h1>
           <p className="muted">Показано: {filtered.length} из {rows.length}</p>
         </div>
-        <button className="btn-main small" type="button" onClick={openCreate}>
-          Новое событие
-        </button>
+        <div className="admin-head-actions">
+          <button className="admin-ghost-btn" type="button" onClick={() => setSeriesOpen(true)}>
+            Серия событий
+          </button>
+          <button className="btn-main small" type="button" onClick={openCreate}>
+            Новое событие
+          </button>
+        </div>
       </header>
 
       <div className="admin-toolbar">
@@ -489,6 +496,18 @@ export default function AdminSchedulePage() {
           </div>
         </div>
       ) : null}
+
+      {seriesOpen ? (
+        <AdminScheduleSeriesModal
+          services={services}
+          onClose={() => setSeriesOpen(false)}
+          onCreated={async (result) => {
+            setSeriesOpen(false);
+            setMessage(`Создано событий: ${result.created}.`);
+            await load();
+          }}
+        />
+      ) : null}
     </section>
   );
 }
@@ -0,0 +1,315 @@
+import { useState } from "react";
+import { adminCopySchedule, adminGenerateSchedule } from "../api";
+import AdminSelect from "./AdminSelect";
+
+const WEEKDAYS = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"];
+
+const initialSeries = {
+  service_id: "",
+  frequency: "weekly",
+  weekdays: [],
+  time_slots: "19:00-20:30",
+  date_from: "",
+  date_to: "",
+  exceptions: "",
+  max_participants: 10,
+  is_individual: false
+};
+
+const initialCopy = {
+  source_from: "",
+  source_to: "",
+  target_from: "",
+  service_id: ""
+};
+
+function parseSlots(raw) {
+  return raw
+    .split(/[,;\n]/)
+    .map((item) => item.trim())
+    .filter(Boolean)
+    .map((item) => {
+      const [start, end] = item.split("-").map((part) => part.trim());
+      if (!/^\d{1,2}:\d{2}$/.test(start || "") || !/^\d{1,2}:\d{2}$/.test(end || "")) {
+        throw new Error(`Некорректный слот: ${item}. Формат: 19:00-20:30`);
+      }
+      return { start, end };
+    });
+}
+
+function parseDates(raw) {
+  return raw
+    .split(/[,;\s]+/)
+    .map((item) => item.trim())
+    .filter(Boolean);
+}
+
+function toSeriesPayload(form, dryRun) {
+  if (!form.service_id) throw new Error("Выберите услугу.");
+  if (!form.weekdays.length) throw new Error("Выберите дни недели.");
+  if (!form.date_from || !form.date_to) throw new Error("Укажите период.");
+  return {
+    service_id: Number(form.service_id),
+    frequency: form.frequency,
+    weekdays: form.weekdays,
+    time_slots: parseSlots(form.time_slots),
+    date_from: form.date_from,
+    date_to: form.date_to,
+    exceptions: parseDates(form.exceptions),
+    max_participants: Number(form.max_participants),
+    is_individual: Boolean(form.is_individual),
+    dry_run: dryRun
+  };
+}
+
+function toCopyPayload(form, dryRun) {
+  if (!form.source_from || !form.source_to || !form.target_from) throw new Error("Укажите исходный период и дату начала копии.");
+  return {
+    source_from: form.source_from,
+    source_to: form.source_to,
+    target_from: form.target_from,
+    service_id: form.service_id ? Number(form.service_id) : null,
+    dry_run: dryRun
+  };
+}
+
+function formatSlot(value) {
+  return new Intl.DateTimeFormat("ru-RU", {
+    weekday: "short",
+    day: "2-digit",
+    month: "2-digit",
+    hour: "2-digit",
+    minute: "2-digit"
+  }).format(new Date(value));
+}
+
+export default function AdminScheduleSeriesModal({ services, onClose, onCreated }) {
+  const [mode, setMode] = useState("series");
+  const [series, setSeries] = useState(initialSeries);
+  const [copy, setCopy] = useState(initialCopy);
+  const [preview, setPreview] = useState(null);
+  const [error, setError] = useState("");
+  const [busy, setBusy] = useState(false);
+  const [allowConflicts, setAllowConflicts] = useState(false);
+
+  const serviceOptions = services.map((service) => ({ value: String(service.id), label: service.title }));
+
+  function toggleWeekday(day) {
+    setSeries((prev) => ({
+      ...prev,
+      weekdays: prev.weekdays.includes(day) ? prev.weekdays.filter((item) => item !== day) : [...prev.weekdays, day].sort()
+    }));
+    setPreview(null);
+  }
+
+  async function submit(dryRun) {
+    setBusy(true);
+    setError("");
+    try {
+      const result =
+        mode === "series"
+          ? await adminGenerateSchedule(toSeriesPayload(series, dryRun), { allowConflicts })
+          : await adminCopySchedule(toCopyPayload(copy, dryRun), { allowConflicts });
+      if (dryRun) {
+        setPreview(result);
+      } else {
+        onCreated(result);
+      }
+    } catch (err) {
+      setError(err.message);
+    } finally {
+      setBusy(false);
+    }
+  }
+
+  return (
+    <div className="admin-modal" onClick={onClose}>
+      <div className="admin-modal-panel" onClick={(event) => event.stopPropagation()}>
+        <button type="button" className="admin-modal-close" onClick={onClose} aria-label="Закрыть">×</button>
+        <div className="admin-form">
+          <h2>Серия событий</h2>
+          <div className="admin-view-toggle">
+            <button
+              type="button"
+              className={mode === "series" ? "is-active" : ""}
+              onClick={() => {
+                setMode("series");
+                setPreview(null);
+              }}
+            >
+              По правилу
+            </button>
+            <button
+              type="button"
+              className={mode === "copy" ? "is-active" : ""}
+              onClick={() => {
+                setMode("copy");
+                setPreview(null);
+              }}
+            >
+              Копировать период
+            </button>
+          </div>
+
+          {mode === "series" ? (
+            <>
+              <label>
+                Услуга
+                <AdminSelect
+                  value={series.service_id}
+                  onChange={(nextValue) => setSeries((prev) => ({ ...prev, service_id: String(nextValue) }))}
+                  options={[{ value: "", label: "Выберите услугу" }, ...serviceOptions]}
+                />
+              </label>
+              <label>
+                Повтор
+                <AdminSelect
+                  value={series.frequency}
+                  onChange={(nextValue) => setSeries((prev) => ({ ...prev, frequency: nextValue }))}
+                  options={[
+                    { value: "weekly", label: "Каждую неделю" },
+                    { value: "biweekly", label: "Через неделю" }
+                  ]}
+                />
+              </label>
+              <div className="admin-weekday-picker">
+                {WEEKDAYS.map((label, day) => (
+                  <label key={label} className="inline">
+                    <input type="checkbox" checked={series.weekdays.includes(day)} onChange={() => toggleWeekday(day)} />
+                    {label}
+                  </label>
+                ))}
+              </div>
+              <label>
+                Время (через запятую)
+                <input
+                  value={series.time_slots}
+                  onChange={(event) => setSeries((prev) => ({ ...prev, time_slots: event.target.value }))}
+                  placeholder="10:00-11:00, 19:00-20:30"
+                />
+              </label>
+              <label>
+                С
+                <input
+                  type="date"
+                  value={series.date_from}
+                  onChange={(event) => setSeries((prev) => ({ ...prev, date_from: event.target.value }))}
+                />
+              </label>
+              <label>
+                По
+                <input
+                  type="date"
+                  value={series.date_to}
+                  onChange={(event) => setSeries((prev) => ({ ...prev, date_to: event.target.value }))}
+                />
+              </label>
+              <label>
+                Исключения (даты через запятую)
+                <input
+                  value={series.exceptions}
+                  onChange={(event) => setSeries((prev) => ({ ...prev, exceptions: event.target.value }))}
+                  placeholder="2026-03-08, 2026-05-01"
+                />
+              </label>
+              <label>
+                Макс. участников
+                <input
+                  type="number"
+                  min={1}
+                  value={series.max_participants}
+                  onChange={(event) => setSeries((prev) => ({ ...prev, max_participants: Number(event.target.value) }))}
+                />
+              </label>
+              <label className="inline">
+                <input
+                  type="checkbox"
+                  checked={series.is_individual}
+                  onChange={(event) => setSeries((prev) => ({ ...prev, is_individual: event.target.checked }))}
+                />
+                Индивидуальные
+              </label>
+            </>
+          ) : (
+            <>
+              <label>
+                Исходный период: с
+                <input
+                  type="date"
+                  value={copy.source_from}
+                  onChange={(event) => setCopy((prev) => ({ ...prev, source_from: event.target.value }))}
+                />
+              </label>
+              <label>
+                по
+                <input
+                  type="date"
+                  value={copy.source_to}
+                  onChange={(event) => setCopy((prev) => ({ ...prev, source_to: event.target.value }))}
+                />
+              </label>
+              <label>
+                Начало копии
+                <input
+                  type="date"
+                  value={copy.target_from}
+                  onChange={(event) => setCopy((prev) => ({ ...prev, target_from: event.target.value }))}
+                />
+              </label>
+              <label>
+                Услуга
+                <AdminSelect
+                  value={copy.service_id}
+                  onChange={(nextValue) => setCopy((prev) => ({ ...prev, service_id: String(nextValue) }))}
+                  options={[{ value: "", label: "Все услуги" }, ...serviceOptions]}
+                />
+              </label>
+            </>
+          )}
+
+          {error ? <p className="err">{error}</p> : null}
+          {preview ? (
+            <div className="admin-series-preview">
+              <p className="muted">
+                Будет создано: {preview.events.length}
+                {preview.skipped_existing ? `, уже есть: ${preview.skipped_existing}` : ""}
+              </p>
+              <ul>
+                {preview.events.slice(0, 30).map((item) => (
+                  <li key={`${item.service_id}-${item.start_time}`}>{formatSlot(item.start_time)}</li>
+                ))}
+              </ul>
+              {preview.events.length > 30 ? <p className="muted">…и еще {preview.events.length - 30}</p> : null}
+              {preview.conflicts?.length ? (
+                <>
+                  <p className="err">Пересечения в расписании: {preview.conflicts.length}</p>
+                  <ul>
+                    {preview.conflicts.slice(0, 10).map((item) => (
+                      <li key={`${item.resource}-${item.start_time}-${item.conflicting_event_id ?? item.conflicting_start_time}`}>
+                        {formatSlot(item.start_time)} — {item.resource.replace(/^host:/, "ведущий ").replace(/^hall:/, "зал ")}
+                        {item.conflicting_event_id ? ` (событие #${item.conflicting_event_id})` : " (внутри серии)"}
+                      </li>
+                    ))}
+                  </ul>
+                  <label className="admin-check-cell">
+                    <input type="checkbox" checked={allowConflicts} onChange={(event) => setAllowConflicts(event.target.checked)} />
+                    Создать несмотря на пересечения
+                  </label>
+                </>
+              ) : null}
+            </div>
+          ) : null}
+
+          <div className="admin-actions-inline">
+            <button type="button" className="admin-ghost-btn" onClick={() => submit(true)} disabled={busy}>
+              Предпросмотр
+            </button>
+            <button type="button" className="btn-main" onClick={() => submit(false)} disabled={busy}>
+              Создать
+            </button>
+          </div>
+        </div>
+      </div>
+    </div>
+  );
+}
@@ -95,8 +95,10 @@ export default function AdminSettingsPage() {
         value: item.value ?? "",
         is_public: Boolean(item.is_public)
       }));
+      // The response carries only the written keys; merge it over the current list.
       const updated = await adminBulkUpdateSettings(payload);
-      setRows(sortSettings(updated));
+      const byKey = new Map(updated.map((item) => [item.key, item]));
+      setRows((prev) => sortSettings(prev.map((item) => byKey.get(item.key) || item)));
       setMessage("Настройки сохранены.");
     } catch (err) {
       setError(err.message || "Не удалось сохранить настройки.");
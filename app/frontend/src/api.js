@@ -3,7 +3,7 @@ const DEFAULT_ADMIN_TOKEN = import.meta.env.VITE_ADMIN_TOKEN || "";
 const ADMIN_AUTH_STORAGE_KEY = "atman_admin_auth";
 const ADMIN_TOKEN_STORAGE_KEY = "atman_admin_token";
 
-async function request(path, options = {}) {
+async function send(path, options = {}) {
   const response = await fetch(`${API_BASE}${path}`, {
     ...options,
     headers: {
@@ -26,6 +26,11 @@ async function request(path, options = {}) {
     throw new Error(message);
   }
 
+  return response;
+}
+
+async function request(path, options = {}) {
+  const response = await send(path, options);
   return response.json();
 }
 
@@ -112,6 +117,32 @@ function safeParseJSON(value) {
   }
 }
 
+const pendingIdempotencyKeys = new Map();
+
+function createIdempotencyKey() {
+  if (typeof crypto !== "undefined" && typeof crypto.randomUUID === "function") {
+    return crypto.randomUUID();
+  }
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+}
+
+// Retries of the same submission reuse one key, so the backend replays the first response.
+function idempotentPost(path, payload) {
+  const body = JSON.stringify(payload);
+  const previous = pendingIdempotencyKeys.get(path);
+  const key = previous && previous.body === body ? previous.key : createIdempotencyKey();
+  pendingIdempotencyKeys.set(path, { body, key });
+
+  return request(path, {
+    method: "POST",
+    headers: { "Idempotency-Key": key },
+    body
+  }).then((result) => {
+    pendingIdempotencyKeys.delete(path);
+    return result;
+  });
+}
+
 export function toMediaUrl(relativePath) {
   if (!relativePath) return "";
   return `${API_BASE}/media/${encodeURI(relativePath)}`;
@@ -155,17 +186,11 @@ export function submitContact(payload) {
 }
 
 export function submitBooking(payload) {
-  return request("/api/bookings", {
-    method: "POST",
-    body: JSON.stringify(payload)
-  });
+  return idempotentPost("/api/bookings", payload);
 }
 
 export function purchaseCertificate(payload) {
-  return request("/api/certificate-purchase", {
-    method: "POST",
-    body: JSON.stringify(payload)
-  });
+  return idempotentPost("/api/certificate-purchase", payload);
 }
 
 export function getCertificate(code) {
@@ -235,6 +260,50 @@ function adminRequest(path, options = {}) {
   });
 }
 
+function buildQuery(params = {}) {
+  const search = new URLSearchParams();
+  Object.entries(params).forEach(([key, value]) => {
+    if (value !== undefined && value !== null && value !== "") {
+      search.set(key, String(value));
+    }
+  });
+  return search.toString();
+}
+
+// Admin lists are cursor-paginated (X-Next-Cursor header). An explicit `limit` fetches one page,
+// otherwise pages are followed until the end so existing screens keep seeing the full list.
+async function adminListPaged(path, params = {}) {
+  const singlePage = params.limit !== undefined && params.limit !== null && params.limit !== "";
+  const rows = [];
+  let cursor = "";
+  do {
+    const query = buildQuery({ ...params, cursor });
+    const response = await send(`${path}${query ? `?${query}` : ""}`, {
+      headers: buildAdminHeaders()
+    });
+    rows.push(...(await response.json()));
+    cursor = singlePage ? "" : response.headers.get("X-Next-Cursor") || "";
+  } while (cursor);
+  return rows;
+}
+
+// Exports stream from the server; the blob is handed to the browser as a file download.
+async function adminDownload(path, params = {}) {
+  const query = buildQuery(params);
+  const response = await send(`${path}${query ? `?${query}` : ""}`, { headers: buildAdminHeaders() });
+  const disposition = response.headers.get("Content-Disposition") || "";
+  const match = disposition.match(/filename\*=UTF-8''([^;]+)/);
+  const filename = match ? decodeURIComponent(match[1]) : `export.${params.format || "csv"}`;
+  const url = URL.createObjectURL(await response.blob());
+  const link = document.createElement("a");
+  link.href = url;
+  link.download = filename;
+  document.body.appendChild(link);
+  link.click();
+  link.remove();
+  URL.revokeObjectURL(url);
+}
+
 export async function adminLogin(username, password) {
   const payload = await request("/api/auth/login", {
     method: "POST",
@@ -282,8 +351,8 @@ export function adminDeleteService(id) {
   });
 }
 
-export function adminListSchedule() {
-  return adminRequest("/api/admin/schedule");
+export function adminListSchedule(params = {}) {
+  return adminListPaged("/api/admin/schedule", params);
 }
 
 export function adminCreateSchedule(payload) {
@@ -306,8 +375,29 @@ export function adminDeleteSchedule(id) {
   });
 }
 
-export function adminListGallery() {
-  return adminRequest("/api/admin/gallery");
+export function adminGenerateSchedule(payload, { allowConflicts = false } = {}) {
+  const query = allowConflicts ? "?allow_conflicts=true" : "";
+  return adminRequest(`/api/admin/schedule/generate${query}`, {
+    method: "POST",
+    body: JSON.stringify(payload)
+  });
+}
+
+export function adminScheduleConflicts(params = {}) {
+  const query = buildQuery(params);
+  return adminRequest(`/api/admin/schedule/conflicts${query ? `?${query}` : ""}`);
+}
+
+export function adminCopySchedule(payload, { allowConflicts = false } = {}) {
+  const query = allowConflicts ? "?allow_conflicts=true" : "";
+  return adminRequest(`/api/admin/schedule/copy${query}`, {
+    method: "POST",
+    body: JSON.stringify(payload)
+  });
+}
+
+export function adminListGallery(params = {}) {
+  return adminListPaged("/api/admin/gallery", params);
 }
 
 export function adminCreateGallery(payload) {
@@ -334,15 +424,72 @@ export function adminDashboardStats() {
   return adminRequest("/api/admin/dashboard");
 }
 
-export function adminListBookings(params = {}) {
-  const search = new URLSearchParams();
-  Object.entries(params).forEach(([key, value]) => {
-    if (value !== undefined && value !== null && value !== "") {
-      search.set(key, String(value));
+// Live admin feed over SSE. fetch() instead of EventSource so the Authorization header can be sent;
+// the stream is reopened from the last seen event id whenever the server closes it, after the
+// server's `retry:` delay (longer when the server is out of streams and only replays).
+export function adminSubscribeEvents(onEvent) {
+  const controller = new AbortController();
+  let lastEventId = "";
+  let retryMs = 3000;
+
+  function dispatch(block) {
+    let type = "message";
+    const data = [];
+    block.split("\n").forEach((line) => {
+      if (line.startsWith("id:")) lastEventId = line.slice(3).trim();
+      else if (line.startsWith("retry:")) retryMs = Number(line.slice(6).trim()) || retryMs;
+      else if (line.startsWith("event:")) type = line.slice(6).trim();
+      else if (line.startsWith("data:")) data.push(line.slice(5).trim());
+    });
+    if (!data.length) return;
+    try {
+      onEvent({ type, ...JSON.parse(data.join("\n")) });
+    } catch (_) {
+      // Ignore malformed frames; the next event still arrives.
     }
-  });
-  const suffix = search.toString() ? `?${search.toString()}` : "";
-  return adminRequest(`/api/admin/bookings${suffix}`);
+  }
+
+  async function listen() {
+    while (!controller.signal.aborted) {
+      try {
+        const query = buildQuery({ last_event_id: lastEventId });
+        const response = await send(`/api/admin/events${query ? `?${query}` : ""}`, {
+          headers: buildAdminHeaders(),
+          signal: controller.signal
+        });
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+        for (;;) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true });
+          let boundary = buffer.indexOf("\n\n");
+          while (boundary !== -1) {
+            dispatch(buffer.slice(0, boundary));
+            buffer = buffer.slice(boundary + 2);
+            boundary = buffer.indexOf("\n\n");
+          }
+        }
+        await new Promise((resolve) => setTimeout(resolve, retryMs));
+      } catch (_) {
+        if (controller.signal.aborted) return;
+        await new Promise((resolve) => setTimeout(resolve, 3000));
+      }
+    }
+  }
+
+  listen();
+  return () => controller.abort();
+}
+
+export function adminAnalytics(params = {}) {
+  const query = buildQuery(params);
+  return adminRequest(`/api/admin/analytics${query ? `?${query}` : ""}`);
+}
+
+export function adminListBookings(params = {}) {
+  return adminListPaged("/api/admin/bookings", params);
 }
 
 export function adminUpdateBookingStatus(id, status) {
@@ -356,15 +503,26 @@ export function adminDeleteBooking(id) {
   return adminRequest(`/api/admin/bookings/${id}`, { method: "DELETE" });
 }
 
-export function adminListContacts(params = {}) {
-  const search = new URLSearchParams();
-  Object.entries(params).forEach(([key, value]) => {
-    if (value !== undefined && value !== null && value !== "") {
-      search.set(key, String(value));
-    }
+export function adminExportBookings(params = {}, format = "csv") {
+  return adminDownload("/api/admin/bookings/export", { ...params, format });
+}
+
+export function adminBulkUpdateBookingStatus(ids, status) {
+  return adminRequest("/api/admin/bookings/bulk/status", {
+    method: "POST",
+    body: JSON.stringify({ ids, status })
+  });
+}
+
+export function adminBulkDeleteBookings(ids) {
+  return adminRequest("/api/admin/bookings/bulk/delete", {
+    method: "POST",
+    body: JSON.stringify({ ids })
   });
-  const suffix = search.toString() ? `?${search.toString()}` : "";
-  return adminRequest(`/api/admin/contacts${suffix}`);
+}
+
+export function adminListContacts(params = {}) {
+  return adminListPaged("/api/admin/contacts", params);
 }
 
 export function adminUpdateContactStatus(id, status) {
@@ -374,6 +532,17 @@ export function adminUpdateContactStatus(id, status) {
   });
 }
 
+export function adminExportContacts(params = {}, format = "csv") {
+  return adminDownload("/api/admin/contacts/export", { ...params, format });
+}
+
+export function adminBulkUpdateContactStatus(ids, status) {
+  return adminRequest("/api/admin/contacts/bulk/status", {
+    method: "POST",
+    body: JSON.stringify({ ids, status })
+  });
+}
+
 export function adminDeleteContact(id) {
   return adminRequest(`/api/admin/contacts/${id}`, { method: "DELETE" });
 }
@@ -396,14 +565,11 @@ export function adminDeleteSetting(key) {
 }
 
 export function adminListCertificates(params = {}) {
-  const search = new URLSearchParams();
-  Object.entries(params).forEach(([key, value]) => {
-    if (value !== undefined && value !== null && value !== "") {
-      search.set(key, String(value));
-    }
-  });
-  const suffix = search.toString() ? `?${search.toString()}` : "";
-  return adminRequest(`/api/admin/certificates${suffix}`);
+  return adminListPaged("/api/admin/certificates", params);
+}
+
+export function adminExportCertificates(params = {}, format = "csv") {
+  return adminDownload("/api/admin/certificates/export", { ...params, format });
 }
 
 export function adminUpdateCertificate(id, payload) {